@@ -29,23 +29,16 @@ function M.add_to_favorites(reference, name)
     end
   end
   
-  -- Escape the pipe character and quotes for shell safety
-  local escaped_arg = reference .. "|" .. name
-  escaped_arg = escaped_arg:gsub('"', '\\"')
+  -- Arguments are passed to the process directly, no shell escaping needed
+  local favorite_arg = reference .. "|" .. name
   
-  -- Use single quotes around the entire argument to preserve special characters
-  local cmd = "rbible -f '" .. escaped_arg .. "'"
-  
-  -- Debug output to see what's being executed
-  vim.notify("Executing: " .. cmd, vim.log.levels.DEBUG)
-  
-  -- Execute the command
-  local output = vim.fn.system(cmd)
-  
-  -- Show the result
-  if vim.v.shell_error ~= 0 then
-    vim.notify("Error adding favorite: " .. output, vim.log.levels.ERROR)
-  else
-    vim.notify("Added to favorites: " .. reference, vim.log.levels.INFO)
-  end
+  -- Run the command without blocking the editor
+  require("rbible.job").run({"-f", favorite_arg}, function(ok, output)
+    -- Show the result
+    if not ok then
+      vim.notify("Error adding favorite: " .. output, vim.log.levels.ERROR)
+    else
+      vim.notify("Added to favorites: " .. reference, vim.log.levels.INFO)
+    end
+  end)
 end
\ No newline at end of file
@@ -0,0 +1,99 @@
+local M = {}
+
+-- Data written by `rbible completions generate`: books, lookup keys (names, codes
+-- and aliases, lowercased) and the versification of every version. It's read
+-- once, and again only when the file changes.
+local data = nil
+local data_stamp = nil
+
+function M.load()
+  local path = vim.fn.expand(require("rbible").config.completions_file)
+  local stat = vim.loop.fs_stat(path)
+  if not stat then
+    return nil
+  end
+
+  local stamp = stat.mtime.sec .. "." .. stat.mtime.nsec .. ":" .. stat.size
+  if stamp ~= data_stamp then
+    local ok, decoded = pcall(vim.json.decode, table.concat(vim.fn.readfile(path), "\n"))
+    data = ok and decoded or nil
+    data_stamp = stamp
+  end
+  return data
+end
+
+-- Verse count of every chapter of a book, in the plugin's version (or rbible's default)
+local function chapter_counts(d, book_id)
+  local version = require("rbible").config.default_version or d.default_version
+  local entry = d.versions[version or ""]
+  if not entry then
+    local _, first = next(d.versions)
+    entry = first
+  end
+  return entry and entry.versification[tostring(book_id)] or {}
+end
+
+local function numbers(count, prefix, format)
+  local result = {}
+  for i = 1, count do
+    local number = tostring(i)
+    if number:sub(1, #prefix) == prefix then
+      table.insert(result, format(number))
+    end
+  end
+  return result
+end
+
+-- Complete a partial reference: a book, then "book chapter", then "book chapter:verse".
+-- Chapters and verses keep the book as typed ("jn 3:16").
+function M.complete(partial)
+  local d = M.load()
+  if not d then
+    return {}
+  end
+
+  local typed, chapter, colon, verse = partial:match("^(.-%S)%s+(%d+)(:?)(%d*)$")
+  local book_id = typed and d.keys[vim.fn.tolower(typed)]
+  if book_id then
+    local counts = chapter_counts(d, book_id)
+    if colon ~= "" then
+      return numbers(counts[tonumber(chapter)] or 0, verse, function(n)
+        return typed .. " " .. chapter .. ":" .. n
+      end)
+    end
+    return numbers(#counts, chapter, function(n)
+      return typed .. " " .. n
+    end)
+  end
+
+  local lower = vim.fn.tolower(partial)
+  local found = {}
+  for key, id in pairs(d.keys) do
+    if key:sub(1, #lower) == lower then
+      found[id] = true
+    end
+  end
+  local candidates = {}
+  for _, book in ipairs(d.books) do
+    if found[book.id] then
+      table.insert(candidates, book.name)
+    end
+  end
+  return candidates
+end
+
+-- Completion for :RBible. The reference is everything after the command name, but
+-- Vim only replaces the word under the cursor, so the words before it are cut off.
+function M.complete_command(arglead, cmdline, cursorpos)
+  local reference = cmdline:sub(1, cursorpos):match("^%S+%s+(.*)$") or ""
+  local before = reference:sub(1, #reference - #arglead)
+  local matches = {}
+  for _, candidate in ipairs(M.complete(reference)) do
+    if candidate:sub(1, #before) == before then
+      table.insert(matches, candidate:sub(#before + 1))
+    end
+  end
+  return matches
+end
+
+return M
@@ -1,11 +1,20 @@
 local M = {}
 
+local job = require("rbible.job")
+
 -- Configuration with defaults
 M.config = {
+  cmd = "rbible",
   default_version = nil,
   use_markdown = true,
   copy_to_clipboard = true,
   enable_reference_detection = true,
+  -- Hover previews kept in memory, and looked up ahead for visible references
+  preview_cache_size = 200,
+  prefetch_previews = true,
+  max_prefetch = 50,
+  -- Written by `rbible completions generate`; completes :RBible without running rbible
+  completions_file = "~/.rbible/completions/completions.json",
   floating_window = {
     width = 0.6,
     height = 0.4,
@@ -34,6 +43,12 @@ function M.setup(opts)
   end
 end
 
+-- Change the default version; cached previews of the old one are dropped
+function M.set_default_version(version)
+  M.config.default_version = version
+  require("rbible.preview").invalidate()
+end
+
 -- Create a floating window
 -- Change the local function to be part of the module
 function M.create_floating_window(content)
@@ -107,34 +122,34 @@ function M.create_floating_window_with_title(content, reference, version)
 end
 
 -- Function to look up a Bible verse
-  function M.lookup_verse(reference, opts)
-    opts = opts or {}
-    local version = opts.version or M.config.default_version
-    local use_markdown = opts.markdown ~= nil and opts.markdown or M.config.use_markdown
-    local copy = opts.copy ~= nil and opts.copy or M.config.copy_to_clipboard
-    
-    -- Properly format the reference
-    reference = reference:gsub('"', ''):gsub("'", '')  -- Remove any existing quotes
-    reference = '"' .. reference .. '"'  -- Add quotes around the reference
-    
-    -- Build command arguments
-    local args = {"-v", reference}
-    
-    if version then
-      table.insert(args, "-b")
-      table.insert(args, version)
+function M.lookup_verse(reference, opts)
+  opts = opts or {}
+  local version = opts.version or M.config.default_version
+  local copy = opts.copy ~= nil and opts.copy or M.config.copy_to_clipboard
+  
+  -- Remove any quotes, arguments are passed to the process without a shell
+  reference = reference:gsub('"', ''):gsub("'", '')
+  
+  -- Build command arguments
+  local args = {"-v", reference}
+  
+  if version then
+    table.insert(args, "-b")
+    table.insert(args, version)
+  end
+  
+  -- Always use markdown for clipboard formatting
+  table.insert(args, "-m")
+  
+  -- Always use -n to prevent the CLI from copying to clipboard
+  table.insert(args, "-n")
+  
+  job.run(args, function(ok, output)
+    if not ok then
+      vim.notify("Error looking up verse: " .. output, vim.log.levels.ERROR)
+      return
     end
     
-    -- Always use markdown for clipboard formatting
-    table.insert(args, "-m")
-    
-    -- Always use -n to prevent the CLI from copying to clipboard
-    table.insert(args, "-n")
-    
-    -- Execute rbible command with properly escaped arguments
-    local command = "rbible " .. table.concat(args, " ")
-    local output = vim.fn.system(command)
-    
     -- Copy to clipboard if enabled
     if copy and M.config.copy_to_clipboard then
       local clipboard_text = output
@@ -147,9 +162,10 @@ end
       vim.fn.setreg('+', clipboard_text)
       vim.notify("Verse copied to clipboard", vim.log.levels.INFO)
     end
-  
-  -- Display in floating window with title
-  M.create_floating_window_with_title(output, ref, ver)
+    
+    -- Display in floating window with title
+    M.create_floating_window_with_title(output, reference, version)
+  end)
 end
 
 -- Function to show parallel verses
@@ -159,43 +175,54 @@ function M.parallel_verses(reference, versions)
     versions = {versions}
   end
   
-  -- Instead of using the -p flag, we'll look up the verse in each version separately
+  -- Instead of using the -p flag, we'll look up the verse in each version
+  -- separately, running all lookups at the same time
   local outputs = {}
+  local pending = #versions
   
-  -- Properly format the reference - ensure it's properly quoted
   reference = reference:gsub('"', '')  -- Remove any existing quotes
   
-  for _, version in ipairs(versions) do
-    -- Construct the command for each version - add -n to prevent clipboard copy
-    -- Use proper quoting for the reference
-    local cmd = string.format('rbible -v "%s" -b %s -m -n', reference, version)
+  local function show_results()
+    -- Keep the order in which the versions were selected
+    local sections = {}
+    for i = 1, #versions do
+      if outputs[i] then
+        table.insert(sections, outputs[i])
+      end
+    end
     
-    -- Execute the command
-    local output = vim.fn.system(cmd)
+    -- Combine the outputs with clear separation
+    local combined_output = table.concat(sections, "\n\n---\n\n")
     
-    -- Check if we got actual content
-    if vim.v.shell_error == 0 then
-      -- Add a header for each version
-      table.insert(outputs, "## " .. version .. "\n" .. output)
+    -- Copy to clipboard if enabled
+    if M.config.copy_to_clipboard and combined_output ~= "" then
+      vim.fn.setreg('+', combined_output)
+      vim.notify("Parallel verses copied to clipboard", vim.log.levels.INFO)
+    end
+    
+    -- Display the result
+    if combined_output ~= "" then
+      M.create_floating_window(combined_output)
     else
-      vim.notify("Error looking up verse in " .. version .. ": " .. output, vim.log.levels.WARN)
+      vim.notify("No results found for parallel verses", vim.log.levels.ERROR)
     end
   end
   
-  -- Combine the outputs with clear separation
-  local combined_output = table.concat(outputs, "\n\n---\n\n")
-  
-  -- Copy to clipboard if enabled
-  if M.config.copy_to_clipboard then
-    vim.fn.setreg('+', combined_output)
-    vim.notify("Parallel verses copied to clipboard", vim.log.levels.INFO)
-  end
-  
-  -- Display the result
-  if combined_output ~= "" then
-    M.create_floating_window(combined_output)
-  else
-    vim.notify("No results found for parallel verses", vim.log.levels.ERROR)
+  for i, version in ipairs(versions) do
+    -- Add -n to prevent clipboard copy
+    job.run({"-v", reference, "-b", version, "-m", "-n"}, function(ok, output)
+      if ok then
+        -- Add a header for each version
+        outputs[i] = "## " .. version .. "\n" .. output
+      else
+        vim.notify("Error looking up verse in " .. version .. ": " .. output, vim.log.levels.WARN)
+      end
+      
+      pending = pending - 1
+      if pending == 0 then
+        show_results()
+      end
+    end)
   end
 end
 
@@ -204,9 +231,7 @@ function M.search_bible(query, opts)
   opts = opts or {}
   local version = opts.version or M.config.default_version
   
-  -- Properly format the query
   query = query:gsub('"', ''):gsub("'", '')  -- Remove any existing quotes
-  query = '"' .. query .. '"'  -- Add quotes around the query
   
   -- Build command arguments
   local args = {"-s", query, "-m"}  -- Add -m flag for markdown formatting
@@ -216,28 +241,24 @@ function M.search_bible(query, opts)
     table.insert(args, version)
   end
   
-  -- Execute rbible command
-  local command = "rbible " .. table.concat(args, " ")
-  local output = vim.fn.system(command)
-  
   -- Create a search-specific title
   local search_title = "Search: " .. query
   if version then
     search_title = search_title .. " (" .. version .. ")"
   end
   
-  -- Display in floating window with title
-  M.create_floating_window_with_title(output, search_title, nil)
+  job.run(args, function(_, output)
+    -- Display in floating window with title
+    M.create_floating_window_with_title(output, search_title, nil)
+  end)
 end
 
 -- Function to show favorites
 function M.show_favorites()
-  -- Execute rbible command
-  local command = "rbible -F"
-  local output = vim.fn.system(command)
-  
-  -- Display in floating window with title
-  M.create_floating_window_with_title(output, "Favorites", nil)
+  job.run({"-F"}, function(_, output)
+    -- Display in floating window with title
+    M.create_floating_window_with_title(output, "Favorites", nil)
+  end)
 end
 
 -- Function to get a specific favorite
@@ -253,22 +274,21 @@ function M.get_favorite(index, opts)
     table.insert(args, "-m")
   end
   
-  if not copy then
-    table.insert(args, "-n")
-  end
-  
-  -- Execute rbible command
-  local command = "rbible " .. table.concat(args, " ")
-  local output = vim.fn.system(command)
-  
-  -- Extract reference and version from output if available
-  local ref, ver
-  if use_markdown then
-    ref, ver = output:match("> %*%*([^%)]+)%s%(([^%)]+)%)")
-  end
-  
-  -- Display in floating window with title
-  M.create_floating_window_with_title(output, ref, ver)
+  job.run_json(args, function(favorite, err)
+    if not favorite then
+      vim.notify("Error getting favorite: " .. err, vim.log.levels.ERROR)
+      return
+    end
+    
+    -- JSON output never touches the clipboard, copy it here if enabled
+    if copy then
+      vim.fn.setreg('+', favorite.formatted)
+      vim.notify("Verse copied to clipboard", vim.log.levels.INFO)
+    end
+    
+    -- Display in floating window with title
+    M.create_floating_window_with_title(favorite.formatted, favorite.reference, favorite.version)
+  end)
 end
 
 return M
\ No newline at end of file
@@ -0,0 +1,102 @@
+local M = {}
+
+-- Command used to run the CLI
+local function executable()
+  return require("rbible").config.cmd or "rbible"
+end
+
+-- Run rbible asynchronously with a list of arguments (no shell quoting needed).
+-- on_exit(ok, output) is called on the main loop once the process exits.
+-- Returns a handle; handle:cancel() stops the process and drops its result.
+function M.run(args, on_exit)
+  local cmd = vim.list_extend({ executable() }, args)
+  local handle = { cancelled = false }
+  function handle:cancel()
+    self.cancelled = true
+  end
+
+  local function finish(code, stdout, stderr)
+    vim.schedule(function()
+      if handle.cancelled then
+        return
+      end
+      -- The CLI reports most errors on stdout
+      local output = stdout or ""
+      if code ~= 0 and stderr and stderr ~= "" then
+        output = stderr
+      end
+      on_exit(code == 0, output)
+    end)
+  end
+
+  if vim.system then
+    local ok, process = pcall(vim.system, cmd, { text = true }, function(result)
+      finish(result.code, result.stdout, result.stderr)
+    end)
+    if not ok then
+      finish(-1, "", process)
+      return handle
+    end
+
+    function handle:cancel()
+      self.cancelled = true
+      pcall(process.kill, process, 15)
+    end
+  else
+    -- Neovim < 0.10
+    local stdout, stderr = {}, {}
+    local job_id = vim.fn.jobstart(cmd, {
+      stdout_buffered = true,
+      stderr_buffered = true,
+      on_stdout = function(_, data) stdout = data end,
+      on_stderr = function(_, data) stderr = data end,
+      on_exit = function(_, code)
+        finish(code, table.concat(stdout, "\n"), table.concat(stderr, "\n"))
+      end
+    })
+    if job_id <= 0 then
+      finish(-1, "", "Could not start " .. executable())
+      return handle
+    end
+
+    function handle:cancel()
+      self.cancelled = true
+      pcall(vim.fn.jobstop, job_id)
+    end
+  end
+
+  return handle
+end
+
+-- Like run(), but asks for --json output and decodes it.
+-- on_result(data, err) gets the decoded data or an error message.
+function M.run_json(args, on_result)
+  args = vim.list_extend(vim.deepcopy(args), { "--json" })
+  return M.run(args, function(ok, output)
+    if not ok then
+      on_result(nil, output)
+      return
+    end
+
+    local decoded, data = pcall(vim.json.decode, output)
+    if decoded then
+      on_result(data, nil)
+    else
+      on_result(nil, "Could not parse rbible output: " .. output)
+    end
+  end)
+end
+
+-- Wrap fn so it only runs once calls have stopped for `ms` milliseconds
+function M.debounce(ms, fn)
+  local timer = vim.loop.new_timer()
+  return function(...)
+    local args = { ... }
+    timer:stop()
+    timer:start(ms, 0, vim.schedule_wrap(function()
+      fn(unpack(args))
+    end))
+  end
+end
+
+return M
@@ -1,5 +1,18 @@
 local M = {}
 
+local job = require("rbible.job")
+
+-- Get the installed Bible versions and pass them to callback
+local function with_versions(callback)
+  job.run_json({"-l"}, function(versions, err)
+    if not versions then
+      vim.notify("Error listing Bible versions: " .. err, vim.log.levels.ERROR)
+      return
+    end
+    callback(versions)
+  end)
+end
+
 function M.setup()
   -- Define keybindings
   vim.keymap.set("n", "<leader>rb", function()
@@ -32,77 +45,70 @@ function M.setup()
     vim.ui.input({ prompt = "Bible verse: " }, function(verse)
       if verse then
         -- Get available versions and show them in a selection menu
-        local command = "rbible -l"
-        local output = vim.fn.system(command)
-        local versions = {}
-        for line in output:gmatch("[^\r\n]+") do
-          if line:match("^%s+%w+") then
-            table.insert(versions, line:match("^%s+(%w+)"))
-          end
-        end
+        with_versions(function(versions)
+          -- Create a custom multi-select UI
+          local selected_versions = {}
         
-        -- Create a custom multi-select UI
-        local selected_versions = {}
-        
-        -- Function to display the selection UI
-        local function display_selection_ui()
-          -- Create a formatted list with checkmarks for selected versions
-          local items = {}
-          for _, v in ipairs(versions) do
-            local is_selected = false
-            for _, sv in ipairs(selected_versions) do
-              if v == sv then
-                is_selected = true
-                break
+          -- Function to display the selection UI
+          local function display_selection_ui()
+            -- Create a formatted list with checkmarks for selected versions
+            local items = {}
+            for _, v in ipairs(versions) do
+              local is_selected = false
+              for _, sv in ipairs(selected_versions) do
+                if v == sv then
+                  is_selected = true
+                  break
+                end
               end
-            end
             
-            local display = is_selected and "✓ " .. v or "  " .. v
-            table.insert(items, {text = display, value = v, selected = is_selected})
-          end
+              local display = is_selected and "✓ " .. v or "  " .. v
+              table.insert(items, {text = display, value = v, selected = is_selected})
+            end
           
-          -- Add a "Done" option at the end
-          table.insert(items, {text = "✅ Done - Show parallel verses", value = "DONE"})
+            -- Add a "Done" option at the end
+            table.insert(items, {text = "✅ Done - Show parallel verses", value = "DONE"})
           
-          vim.ui.select(items, {
-            prompt = "Select Bible versions (current: " .. table.concat(selected_versions, ", ") .. ")",
-            format_item = function(item)
-              return item.text
-            end
-          }, function(item)
-            if item then
-              if item.value == "DONE" then
-                if #selected_versions > 0 then
-                  -- Execute the parallel verses lookup
-                  require("rbible").parallel_verses(verse, selected_versions)
+            vim.ui.select(items, {
+              prompt = "Select Bible versions (current: " .. table.concat(selected_versions, ", ") .. ")",
+              format_item = function(item)
+                return item.text
+              end
+            }, function(item)
+              if item then
+                if item.value == "DONE" then
+                  if #selected_versions > 0 then
+                    -- Execute the parallel verses lookup
+                    require("rbible").parallel_verses(verse, selected_versions)
+                  else
+                    vim.notify("Please select at least one version", vim.log.levels.WARN)
+                    display_selection_ui()
+                  end
                 else
-                  vim.notify("Please select at least one version", vim.log.levels.WARN)
-                  display_selection_ui()
-                end
-              else
-                -- Toggle selection
-                local found = false
-                for i, v in ipairs(selected_versions) do
-                  if v == item.value then
-                    table.remove(selected_versions, i)
-                    found = true
-                    break
+                  -- Toggle selection
+                  local found = false
+                  for i, v in ipairs(selected_versions) do
+                    if v == item.value then
+                      table.remove(selected_versions, i)
+                      found = true
+                      break
+                    end
                   end
-                end
                 
-                if not found then
-                  table.insert(selected_versions, item.value)
-                end
+                  if not found then
+                    table.insert(selected_versions, item.value)
+                  end
                 
-                -- Show the UI again
-                display_selection_ui()
+                  -- Show the UI again
+                  display_selection_ui()
+                end
               end
-            end
-          end)
-        end
+            end)
+          end
         
-        -- Start the selection process
-        display_selection_ui()
+          -- Start the selection process
+          display_selection_ui()
+        end)
       end
     end)
   end, { desc = "Show parallel verses" })
@@ -120,79 +126,64 @@ function M.setup()
 
   vim.keymap.set("n", "<leader>rf", function()
     -- First get the favorites list
-    local command = "rbible -F"
-    local output = vim.fn.system(command)
-    
-    -- Parse the favorites
-    local favorites = {}
-    local favorite_items = {}
-    for line in output:gmatch("[^\r\n]+") do
-      local index, desc = line:match("^(%d+)%. (.+)$")
-      if index and desc then
-        favorites[index] = desc
-        table.insert(favorite_items, { index = index, desc = desc })
+    job.run_json({"-F"}, function(favorites, err)
+      if not favorites then
+        vim.notify("Error loading favorites: " .. err, vim.log.levels.ERROR)
+        return
       end
-    end
-    
-    if #favorite_items == 0 then
-      vim.notify("No favorites found", vim.log.levels.INFO)
-      return
-    end
-    
-    -- Show selection menu
-    vim.ui.select(favorite_items, {
-      prompt = "Select a favorite verse:",
-      format_item = function(item)
-        return item.index .. ". " .. item.desc
+      
+      local favorite_items = {}
+      for i, favorite in ipairs(favorites) do
+        local desc = favorite.reference .. " (" .. (favorite.version or "unknown") .. ")"
+        if favorite.name and favorite.name ~= favorite.reference then
+          desc = favorite.name .. " - " .. desc
+        end
+        table.insert(favorite_items, { index = tostring(i), desc = desc })
       end
-    }, function(selected)
-      if selected then
-        require("rbible").get_favorite(selected.index)
+      
+      if #favorite_items == 0 then
+        vim.notify("No favorites found", vim.log.levels.INFO)
+        return
       end
+      
+      -- Show selection menu
+      vim.ui.select(favorite_items, {
+        prompt = "Select a favorite verse:",
+        format_item = function(item)
+          return item.index .. ". " .. item.desc
+        end
+      }, function(selected)
+        if selected then
+          require("rbible").get_favorite(selected.index)
+        end
+      end)
     end)
   end, { desc = "Show and select favorite verses" })
 
   vim.keymap.set("n", "<leader>rh", function()
     -- Get history
-    local command = "rbible -H"
-    local output = vim.fn.system(command)
-    
-    -- Parse history
-    local history_items = {}
-    for line in output:gmatch("[^\r\n]+") do
-      local index, ref = line:match("^(%d+)%. (.+)$")
-      if index and ref then
-        table.insert(history_items, { index = index, reference = ref })
+    job.run_json({"-H"}, function(history, err)
+      if not history then
+        vim.notify("Error loading history: " .. err, vim.log.levels.ERROR)
+        return
       end
-    end
-    
-    if #history_items == 0 then
-      vim.notify("No history found", vim.log.levels.INFO)
-      return
-    end
-    
-    -- Show selection menu
-    vim.ui.select(history_items, {
-      prompt = "Select a verse from history:",
-      format_item = function(item)
-        return item.index .. ". " .. item.reference
+      
+      if #history == 0 then
+        vim.notify("No history found", vim.log.levels.INFO)
+        return
       end
-    }, function(selected)
-      if selected then
-        -- Extract just the reference part - look for the book and reference format
-        local book_ref = selected.reference:match("([%w%s]+%s%d+:%d+[%-%d:]*)") 
-        if book_ref then
-          -- Clean up any trailing spaces and wrap in quotes to handle spaces in book names
-          local clean_ref = '"' .. book_ref:gsub("%s+$", "") .. '"'
-          -- Use lookup_verse instead of direct command
-          local opts = {
-            markdown = true
-          }
-          require("rbible").lookup_verse(book_ref, opts)
-        else
-          vim.notify("Could not parse reference: " .. selected.reference, vim.log.levels.ERROR)
+      
+      -- Show selection menu
+      vim.ui.select(history, {
+        prompt = "Select a verse from history:",
+        format_item = function(item)
+          return item.reference .. " (" .. (item.version or "unknown") .. ")"
         end
-      end
+      }, function(selected)
+        if selected then
+          require("rbible").lookup_verse(selected.reference, { markdown = true })
+        end
+      end)
     end)
   end, { desc = "Show verse history" })
 
@@ -200,49 +191,40 @@ function M.setup()
     vim.ui.input({ prompt = "Bible verse to add as favorite: " }, function(verse)
       if verse then
         -- Get available versions and show them in a selection menu
-        local command = "rbible -l"
-        local output = vim.fn.system(command)
-        local versions = {}
-        for line in output:gmatch("[^\r\n]+") do
-          if line:match("^%s+%w+") then
-            table.insert(versions, line:match("^%s+(%w+)"))
-          end
-        end
-        
-        vim.ui.select(versions, {
-          prompt = "Select Bible version:",
-          format_item = function(item)
-            return item
-          end
-        }, function(version)
-          if version then
-            vim.ui.input({ prompt = "Optional name for this favorite: " }, function(name)
-              -- Remove any quotation marks from the verse reference
-              verse = verse:gsub('"', ''):gsub("'", '')
-              
-              -- Check if verse contains a book name
-              if not verse:match("%a+%s+%d+:%d+") then
-                vim.notify("Invalid verse format. Should be 'Book Chapter:Verse' (e.g. Jos 1:9)", vim.log.levels.ERROR)
-                return
-              end
+        with_versions(function(versions)
+          vim.ui.select(versions, {
+            prompt = "Select Bible version:",
+            format_item = function(item)
+              return item
+            end
+          }, function(version)
+            if version then
+              vim.ui.input({ prompt = "Optional name for this favorite: " }, function(name)
+                -- Remove any quotation marks from the verse reference
+                verse = verse:gsub('"', ''):gsub("'", '')
               
-              -- Properly escape and quote the favorite argument
-              local favorite_arg = verse
-              if name and name ~= "" then
-                favorite_arg = favorite_arg .. "|" .. name
-              end
+                -- Check if verse contains a book name
+                if not verse:match("%a+%s+%d+:%d+") then
+                  vim.notify("Invalid verse format. Should be 'Book Chapter:Verse' (e.g. Jos 1:9)", vim.log.levels.ERROR)
+                  return
+                end
               
-              -- Construct the command with proper quoting
-              local favorite_cmd = "rbible -f '" .. favorite_arg .. "' -b " .. version
+                -- Build the favorite argument, no shell quoting needed
+                local favorite_arg = verse
+                if name and name ~= "" then
+                  favorite_arg = favorite_arg .. "|" .. name
+                end
               
-              local result = vim.fn.system(favorite_cmd)
-              if vim.v.shell_error ~= 0 then
-                vim.notify("Error adding favorite: " .. result, vim.log.levels.ERROR)
-              else
-                vim.notify("Added to favorites: " .. verse, vim.log.levels.INFO)
-              end
-            end)
-          end
+                job.run({"-f", favorite_arg, "-b", version}, function(ok, result)
+                  if not ok then
+                    vim.notify("Error adding favorite: " .. result, vim.log.levels.ERROR)
+                  else
+                    vim.notify("Added to favorites: " .. verse, vim.log.levels.INFO)
+                  end
+                end)
+              end)
+            end
+        end)
         end)
       end
     end)
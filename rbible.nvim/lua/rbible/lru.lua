@@ -0,0 +1,64 @@
+local M = {}
+
+-- A small least-recently-used cache: get/set are O(1), the oldest entry is
+-- evicted once capacity is reached
+local LRU = {}
+LRU.__index = LRU
+
+function M.new(capacity)
+  local head = {}
+  local tail = {}
+  head.next, tail.prev = tail, head
+  return setmetatable({ capacity = capacity, size = 0, nodes = {}, head = head, tail = tail }, LRU)
+end
+
+local function unlink(node)
+  node.prev.next, node.next.prev = node.next, node.prev
+end
+
+-- Insert node right after head (most recently used)
+local function push_front(self, node)
+  node.prev, node.next = self.head, self.head.next
+  self.head.next.prev = node
+  self.head.next = node
+end
+
+function LRU:get(key)
+  local node = self.nodes[key]
+  if node == nil then
+    return nil
+  end
+  unlink(node)
+  push_front(self, node)
+  return node.value
+end
+
+function LRU:set(key, value)
+  local node = self.nodes[key]
+  if node then
+    node.value = value
+    unlink(node)
+    push_front(self, node)
+    return
+  end
+
+  if self.size >= self.capacity then
+    local oldest = self.tail.prev
+    unlink(oldest)
+    self.nodes[oldest.key] = nil
+    self.size = self.size - 1
+  end
+
+  node = { key = key, value = value }
+  push_front(self, node)
+  self.nodes[key] = node
+  self.size = self.size + 1
+end
+
+function LRU:clear()
+  self.nodes = {}
+  self.size = 0
+  self.head.next, self.tail.prev = self.tail, self.head
+end
+
+return M
@@ -0,0 +1,143 @@
+local M = {}
+
+local job = require("rbible.job")
+local lru = require("rbible.lru")
+
+-- Rendered previews keyed by reference, for the version in cache_version.
+-- A failed lookup is cached as false so it isn't retried on every scroll.
+local cache = nil
+local cache_version = nil
+
+-- References with a lookup in flight
+local pending = {}
+
+local function config()
+  return require("rbible").config
+end
+
+-- Get the cache, starting a new one if the default version changed
+local function get_cache()
+  local cfg = config()
+  if not cache or cache_version ~= cfg.default_version then
+    cache = lru.new(cfg.preview_cache_size or 200)
+    cache_version = cfg.default_version
+    pending = {}
+  end
+  return cache
+end
+
+-- Drop every cached preview
+function M.invalidate()
+  cache = nil
+  pending = {}
+end
+
+-- Arguments to look up several references in one process, without touching history
+local function lookup_args(references)
+  local args = {}
+  for _, reference in ipairs(references) do
+    table.insert(args, "-v")
+    table.insert(args, reference)
+  end
+  vim.list_extend(args, {"-m", "--no-history"})
+
+  local version = config().default_version
+  if version then
+    table.insert(args, "-b")
+    table.insert(args, version)
+  end
+  return args
+end
+
+-- Look up references in one batch and store the results in the cache.
+-- on_done(previews) gets a table of reference -> preview (or false).
+local function fetch_batch(references, on_done)
+  local batch_cache = get_cache()
+  for _, reference in ipairs(references) do
+    pending[reference] = true
+  end
+
+  local handle = job.run_json(lookup_args(references), function(results)
+    -- A reference can yield several passages ("Juan 3:16, 18"), so they are
+    -- matched by the reference each one echoes, not by position
+    local found = {}
+    for _, result in ipairs(results or {}) do
+      if result.query and result.formatted then
+        found[result.query] = found[result.query] or {}
+        table.insert(found[result.query], result.formatted)
+      end
+    end
+
+    local previews = {}
+    for _, reference in ipairs(references) do
+      previews[reference] = found[reference] and table.concat(found[reference], "\n\n") or false
+      pending[reference] = nil
+    end
+
+    -- Results for a version that is no longer the default are dropped
+    if batch_cache == get_cache() then
+      for reference, preview in pairs(previews) do
+        batch_cache:set(reference, preview)
+      end
+    end
+
+    if on_done then
+      on_done(previews)
+    end
+  end)
+
+  -- A cancelled lookup can be started again later
+  local cancel = handle.cancel
+  function handle:cancel()
+    for _, reference in ipairs(references) do
+      pending[reference] = nil
+    end
+    cancel(self)
+  end
+
+  return handle
+end
+
+-- Get the preview of a reference if it's already cached
+function M.get(reference)
+  return get_cache():get(reference)
+end
+
+-- Get the preview of a reference, from the cache or a lookup.
+-- callback(preview) gets nil when the reference can't be looked up.
+-- Returns a job handle, or nil if the preview was cached.
+function M.fetch(reference, callback)
+  local preview = M.get(reference)
+  if preview ~= nil then
+    callback(preview or nil)
+    return nil
+  end
+
+  return fetch_batch({ reference }, function(previews)
+    callback(previews[reference] or nil)
+  end)
+end
+
+-- Look up, in a single background process, the references not cached yet
+function M.prefetch(references)
+  local cfg = config()
+  local preview_cache = get_cache()
+  local missing = {}
+  local seen = {}
+
+  for _, reference in ipairs(references) do
+    if not seen[reference] and not pending[reference] and preview_cache:get(reference) == nil then
+      seen[reference] = true
+      table.insert(missing, reference)
+      if #missing >= (cfg.max_prefetch or 50) then
+        break
+      end
+    end
+  end
+
+  if #missing > 0 then
+    fetch_batch(missing, nil)
+  end
+end
+
+return M
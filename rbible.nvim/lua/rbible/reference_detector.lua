@@ -1,40 +1,261 @@
 local M = {}
 
+local job = require("rbible.job")
+local preview = require("rbible.preview")
+
 -- Bible reference pattern with capture groups to exclude surrounding spaces
 local reference_pattern = "[%s]*([1-3]?%s*[A-Za-zÀ-ÿ]+%s+%d+:%d+[%-]?%d*)"
 
-function M.detect_references()
-  local bufnr = vim.api.nvim_get_current_buf()
-  local lines = vim.api.nvim_buf_get_lines(bufnr, 0, -1, false)
+-- Delay before re-highlighting lines after the buffer changes
+local highlight_delay_ms = 50
+
+-- Highlights live in their own namespace so other plugins' matches are left alone
+local namespace = vim.api.nvim_create_namespace("rbible_references")
+
+-- References found per line text, so unchanged lines are never scanned twice
+local line_cache = {}
+local line_cache_size = 0
+local max_line_cache_size = 5000
+
+-- Buffers we are attached to, with the line range waiting to be re-highlighted
+local attached = {}
+
+-- Delay before prefetching previews of the references that came into view
+local prefetch_delay_ms = 300
+local prefetch_previews = job.debounce(prefetch_delay_ms, preview.prefetch)
+
+-- Find the references in a single line (lnum is 0-based)
+function M.detect_line_references(line, lnum)
   local references = {}
-  
+  local start_idx = 1
+  while true do
+    local s, e, reference = line:find(reference_pattern, start_idx)
+    if not s then break end
+
+    -- Calculate actual reference position without spaces
+    local ref_start = line:find(reference, s, true)
+    local ref_length = #reference
+
+    -- Normalize spaces in reference
+    reference = reference:gsub("%s+", " "):match("^%s*(.-)%s*$")
+
+    table.insert(references, {
+      reference = reference,
+      lnum = lnum,
+      col_start = ref_start - 1,
+      col_end = ref_start + ref_length - 2
+    })
+
+    start_idx = s + ref_length
+  end
+
+  return references
+end
+
+-- Find the references in the given text, or in the current buffer
+function M.detect_references(text)
+  local lines
+  if text then
+    lines = vim.split(text, "\n")
+  else
+    lines = vim.api.nvim_buf_get_lines(vim.api.nvim_get_current_buf(), 0, -1, false)
+  end
+  local references = {}
+
   for lnum, line in ipairs(lines) do
-    local start_idx = 1
-    while true do
-      local s, e, reference = line:find(reference_pattern, start_idx)
-      if not s then break end
-      
-      -- Calculate actual reference position without spaces
-      local ref_start = line:find(reference, s, true)
-      local ref_length = #reference
-      
-      -- Normalize spaces in reference
-      reference = reference:gsub("%s+", " "):match("^%s*(.-)%s*$")
-      
-      table.insert(references, {
-        reference = reference,
-        lnum = lnum - 1,
-        col_start = ref_start - 1,
-        col_end = ref_start + ref_length - 2
-      })
-      
-      start_idx = s + ref_length
+    vim.list_extend(references, M.detect_line_references(line, lnum - 1))
+  end
+
+  return references
+end
+
+-- Get the references of a line, scanning it only if its text wasn't seen before
+local function cached_line_references(line)
+  local references = line_cache[line]
+  if not references then
+    if line_cache_size >= max_line_cache_size then
+      line_cache = {}
+      line_cache_size = 0
     end
+    references = M.detect_line_references(line, nil)
+    line_cache[line] = references
+    line_cache_size = line_cache_size + 1
   end
-  
   return references
 end
 
+-- Get the reference under the cursor, if any
+function M.reference_at_cursor()
+  local line = vim.api.nvim_get_current_line()
+  local col = vim.api.nvim_win_get_cursor(0)[2]
+
+  for _, ref in ipairs(cached_line_references(line)) do
+    if col >= ref.col_start and col <= ref.col_end then
+      return ref
+    end
+  end
+
+  return nil
+end
+
+-- Get the 0-based, end-exclusive line ranges of bufnr visible in any window
+local function visible_ranges(bufnr)
+  local ranges = {}
+  for _, win in ipairs(vim.fn.win_findbuf(bufnr)) do
+    local first, last = vim.api.nvim_win_call(win, function()
+      return vim.fn.line("w0"), vim.fn.line("w$")
+    end)
+    table.insert(ranges, { first - 1, last })
+  end
+  return ranges
+end
+
+-- Re-highlight the lines [first, last) of bufnr that are visible
+local function highlight_range(bufnr, first, last)
+  if not vim.api.nvim_buf_is_valid(bufnr) then
+    return
+  end
+
+  for _, range in ipairs(visible_ranges(bufnr)) do
+    local range_first = math.max(first, range[1])
+    local range_last = math.min(last, range[2])
+
+    if range_first < range_last then
+      vim.api.nvim_buf_clear_namespace(bufnr, namespace, range_first, range_last)
+
+      local visible_references = {}
+      local lines = vim.api.nvim_buf_get_lines(bufnr, range_first, range_last, false)
+      for i, line in ipairs(lines) do
+        for _, ref in ipairs(cached_line_references(line)) do
+          vim.api.nvim_buf_set_extmark(bufnr, namespace, range_first + i - 1, ref.col_start, {
+            end_col = ref.col_end + 1,
+            hl_group = "BibleReference"
+          })
+          table.insert(visible_references, ref.reference)
+        end
+      end
+
+      -- Look up what's on screen in the background so hovering is instant
+      if #visible_references > 0 and require("rbible").config.prefetch_previews then
+        prefetch_previews(visible_references)
+      end
+    end
+  end
+end
+
+-- Re-highlight the visible part of a buffer (e.g. after scrolling)
+function M.highlight_references(bufnr)
+  bufnr = bufnr or vim.api.nvim_get_current_buf()
+  highlight_range(bufnr, 0, vim.api.nvim_buf_line_count(bufnr))
+end
+
+local flush_dirty_lines = job.debounce(highlight_delay_ms, function()
+  for bufnr, state in pairs(attached) do
+    if state.dirty_first then
+      highlight_range(bufnr, state.dirty_first, state.dirty_last)
+      state.dirty_first, state.dirty_last = nil, nil
+    end
+  end
+end)
+
+-- Track which lines changed; extmarks on untouched lines move with the text by themselves
+local function on_lines(_, bufnr, _, first, last, new_last)
+  local state = attached[bufnr]
+  if not state then
+    return true  -- Detach
+  end
+
+  local delta = new_last - last
+  if state.dirty_first then
+    if state.dirty_last > first then
+      state.dirty_last = math.max(state.dirty_last + delta, new_last)
+    else
+      state.dirty_last = math.max(state.dirty_last, new_last)
+    end
+    state.dirty_first = math.min(state.dirty_first, first)
+  else
+    state.dirty_first, state.dirty_last = first, new_last
+  end
+
+  flush_dirty_lines()
+end
+
+-- Start following the changes of a buffer
+function M.attach(bufnr)
+  bufnr = bufnr or vim.api.nvim_get_current_buf()
+  if attached[bufnr] then
+    -- Already following changes, the window may just show other lines
+    M.highlight_references(bufnr)
+    return
+  end
+
+  -- Skip special buffers
+  local buftype = vim.bo[bufnr].buftype
+  if buftype == "prompt" or buftype == "nofile" or buftype == "terminal" then
+    return
+  end
+
+  attached[bufnr] = {}
+  vim.api.nvim_buf_attach(bufnr, false, {
+    on_lines = on_lines,
+    on_reload = function()
+      vim.schedule(function() M.highlight_references(bufnr) end)
+    end,
+    on_detach = function()
+      attached[bufnr] = nil
+    end
+  })
+  M.highlight_references(bufnr)
+end
+
+-- Stop highlighting a buffer and remove its highlights
+function M.detach(bufnr)
+  bufnr = bufnr or vim.api.nvim_get_current_buf()
+  attached[bufnr] = nil
+  if vim.api.nvim_buf_is_valid(bufnr) then
+    vim.api.nvim_buf_clear_namespace(bufnr, namespace, 0, -1)
+  end
+end
+
+-- The pending hover lookup, cancelled as soon as the cursor moves
+local hover_job = nil
+
+function M.cancel_hover()
+  if hover_job then
+    hover_job:cancel()
+    hover_job = nil
+  end
+end
+
+function M.show_hover()
+  M.cancel_hover()
+
+  local ref = M.reference_at_cursor()
+  if not ref then
+    return
+  end
+
+  local win = vim.api.nvim_get_current_win()
+  hover_job = preview.fetch(ref.reference, function(output)
+    hover_job = nil
+    if not output or output == "" then
+      return
+    end
+
+    -- Don't show a preview for a reference the cursor already left
+    local current = M.reference_at_cursor()
+    if vim.api.nvim_get_current_win() ~= win or not current or current.reference ~= ref.reference then
+      return
+    end
+
+    vim.lsp.util.open_floating_preview(
+      vim.split(output, "\n"),
+      "markdown",
+      { border = "rounded", focus = false }
+    )
+  end)
+end
+
 function M.setup()
   -- Set updatetime for faster hover response
   vim.o.updatetime = 300
@@ -42,55 +263,46 @@ function M.setup()
   -- Create highlight group for references
   vim.api.nvim_command('highlight default link BibleReference Underlined')
 
-  -- Setup hover handler and highlighting
-  vim.api.nvim_create_autocmd({"CursorHold", "BufEnter", "TextChanged", "TextChangedI"}, {
+  -- Highlight the visible lines of each buffer, then only the lines that change
+  vim.api.nvim_create_autocmd({"BufWinEnter", "BufEnter"}, {
     pattern = {"*"},
-    callback = function()
-      -- Skip special buffers
-      local buftype = vim.bo.buftype
-      if buftype == "prompt" or buftype == "nofile" then
+    callback = function(args)
+      M.attach(args.buf)
+    end
+  })
+
+  -- Lines scrolled into view may not have been highlighted yet
+  vim.api.nvim_create_autocmd("WinScrolled", {
+    pattern = {"*"},
+    callback = function(args)
+      local win = tonumber(args.match)
+      if not win or not vim.api.nvim_win_is_valid(win) then
         return
       end
-
-      -- Clear existing highlights
-      vim.fn.clearmatches()
-      
-      -- Get references and highlight them
-      local references = M.detect_references()
-      for _, ref in ipairs(references) do
-        vim.fn.matchaddpos("BibleReference", {{
-          ref.lnum + 1,
-          ref.col_start + 1,
-          ref.col_end - ref.col_start + 1
-        }})
+      local bufnr = vim.api.nvim_win_get_buf(win)
+      if attached[bufnr] then
+        M.highlight_references(bufnr)
       end
+    end
+  })
 
-      -- Check for hover
-      local line = vim.api.nvim_get_current_line()
-      local pos = vim.api.nvim_win_get_cursor(0)
-      local col = pos[2]
-
-      for reference in line:gmatch(reference_pattern) do
-        local start_pos = line:find(reference, 1, true)
-        if start_pos and col >= start_pos - 1 and col <= start_pos + #reference - 1 then
-          local command = string.format('rbible -v "%s" -m', reference)
-          local output = vim.fn.system(command)
-          
-          if output and output ~= "" then
-            local lines = vim.split(output, "\n")
-            if #lines > 0 then
-              vim.lsp.util.open_floating_preview(
-                lines,
-                "markdown",
-                { border = "rounded", focus = false }
-              )
-            end
-          end
-          break
-        end
+  -- Show a preview when the cursor rests on a reference
+  vim.api.nvim_create_autocmd("CursorHold", {
+    pattern = {"*"},
+    callback = function()
+      local buftype = vim.bo.buftype
+      if buftype == "prompt" or buftype == "nofile" then
+        return
       end
+      M.show_hover()
     end
   })
+
+  -- A lookup still running when the cursor moves is stale
+  vim.api.nvim_create_autocmd({"CursorMoved", "CursorMovedI", "BufLeave"}, {
+    pattern = {"*"},
+    callback = M.cancel_hover
+  })
 end
 
-return M
\ No newline at end of file
+return M
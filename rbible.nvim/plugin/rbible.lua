@@ -9,6 +9,9 @@ vim.api.nvim_create_user_command("RBible", function(opts)
   require("rbible").lookup_verse(opts.args)
 end, {
   nargs = 1,
+  complete = function(arglead, cmdline, cursorpos)
+    return require("rbible.completion").complete_command(arglead, cmdline, cursorpos)
+  end,
   desc = "Look up a Bible verse"
 })
 
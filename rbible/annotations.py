@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Personal notes and highlights on verse ranges, in SQLite with an R*Tree over their packed verse ids.
+"""
+
+import os
+import json
+import time
+import heapq
+import sqlite3
+
+ANNOTATIONS_FILE = os.path.join(os.path.expanduser("~"), ".rbible", "annotations.db")
+
+KINDS = ("note", "highlight")
+HIGHLIGHT_COLORS = ("yellow", "green", "blue", "pink", "orange")
+
+# Columns of an annotation, in table order (also the keys of exported annotations)
+FIELDS = ("id", "start", "end", "kind", "color", "text", "created", "updated")
+
+def connect_annotations(path=None):
+    """Open (creating it if needed) the annotations database."""
+    path = path or ANNOTATIONS_FILE
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS annotations (
+            id INTEGER PRIMARY KEY,
+            start INTEGER NOT NULL,
+            "end" INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            color TEXT,
+            text TEXT,
+            created REAL NOT NULL,
+            updated REAL NOT NULL
+        );
+        -- Packed ids fit in 32-bit integers, which rtree_i32 stores exactly (the default rtree rounds to floats)
+        CREATE VIRTUAL TABLE IF NOT EXISTS annotation_spans USING rtree_i32(id, start, "end");
+    """)
+    return conn
+
+def add_annotation(conn, start_id, end_id, kind, text=None, color=None, created=None, updated=None):
+    """Add a note or highlight over a verse id range, returning its id."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown annotation kind '{kind}', use one of: {', '.join(KINDS)}")
+    if end_id < start_id:
+        raise ValueError("The range ends before it starts")
+    now = time.time()
+    with conn:
+        cursor = conn.execute(
+            'INSERT INTO annotations (start, "end", kind, color, text, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (start_id, end_id, kind, color, text, created or now, updated or created or now)
+        )
+        conn.execute('INSERT INTO annotation_spans (id, start, "end") VALUES (?, ?, ?)', (cursor.lastrowid, start_id, end_id))
+    return cursor.lastrowid
+
+def remove_annotation(conn, annotation_id):
+    """Remove an annotation, returning True if it existed."""
+    with conn:
+        removed = conn.execute("DELETE FROM annotations WHERE id = ?", (annotation_id,)).rowcount
+        conn.execute("DELETE FROM annotation_spans WHERE id = ?", (annotation_id,))
+    return bool(removed)
+
+def _rows_to_dicts(rows):
+    return [dict(zip(FIELDS, row)) for row in rows]
+
+def get_annotations(conn, ranges=None):
+    """Get the annotations overlapping any of some (start id, end id) ranges (all of them without ranges).
+
+    Annotations are sorted by start, and only the R*Tree nodes near the ranges are read.
+    """
+    columns = ", ".join(f'a."{field}"' for field in FIELDS)
+    if ranges is None:
+        return _rows_to_dicts(conn.execute(f'SELECT {columns} FROM annotations a ORDER BY a.start, a."end", a.id'))
+
+    ranges = list(ranges)
+    if not ranges:
+        return []
+    # Two ranges overlap when each starts before the other ends
+    where = " OR ".join(['(s.start <= ? AND s."end" >= ?)'] * len(ranges))
+    params = [value for start, end in ranges for value in (end, start)]
+    return _rows_to_dicts(conn.execute(f"""
+        SELECT {columns} FROM annotation_spans s JOIN annotations a ON a.id = s.id
+        WHERE {where}
+        ORDER BY a.start, a."end", a.id
+    """, params))
+
+def merge_annotations(verses, annotations):
+    """Pair each (verse id, text) with the annotations covering it, in a single pass over both.
+
+    Both must be sorted by verse id (annotations by start). Yields (verse id, text, [annotations]).
+    """
+    annotations = iter(annotations)
+    upcoming = next(annotations, None)
+    active = []  # Heap of (end id, id, annotation) of the annotations started so far
+    for verse_id, text in verses:
+        while upcoming is not None and upcoming["start"] <= verse_id:
+            heapq.heappush(active, (upcoming["end"], upcoming["id"], upcoming))
+            upcoming = next(annotations, None)
+        while active and active[0][0] < verse_id:
+            heapq.heappop(active)
+        yield verse_id, text, sorted((entry[2] for entry in active), key=lambda annotation: (annotation["start"], annotation["id"]))
+
+def annotate_text(verse_id, text, covering):
+    """Mark a verse's text with its annotations: ==highlighted== and followed by the notes that start at it."""
+    if any(annotation["kind"] == "highlight" for annotation in covering):
+        text = f"=={text}=="
+    notes = [annotation["text"] for annotation in covering if annotation["kind"] == "note" and annotation["start"] == verse_id]
+    for note in notes:
+        text += f" [Note: {note}]"
+    return text
+
+def annotate_verses(verses, annotations):
+    """Get (verse id, text) tuples with the annotations marked in their text.
+
+    Notes of ranges starting before the verses are shown at the first verse.
+    """
+    annotated = []
+    for verse_id, text, covering in merge_annotations(verses, annotations):
+        if not annotated:
+            # Show notes that started earlier at the first verse shown
+            covering = [dict(annotation, start=max(annotation["start"], verse_id)) for annotation in covering]
+        annotated.append((verse_id, annotate_text(verse_id, text, covering)))
+    return annotated
+
+def export_annotations(conn, out):
+    """Write every annotation to a file-like object as JSON, returning how many were written."""
+    annotations = get_annotations(conn)
+    for annotation in annotations:
+        del annotation["id"]
+    json.dump(annotations, out, ensure_ascii=False, indent=2)
+    out.write("\n")
+    return len(annotations)
+
+def import_annotations(conn, items):
+    """Add exported annotations, skipping the ones already there. Returns the number added.
+
+    Raises ValueError for invalid items.
+    """
+    existing = {(a["start"], a["end"], a["kind"], a["color"], a["text"]) for a in get_annotations(conn)}
+    added = 0
+    for item in items:
+        try:
+            key = (int(item["start"]), int(item["end"]), item["kind"], item.get("color"), item.get("text"))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Invalid annotation: {item!r}")
+        if key in existing:
+            continue
+        add_annotation(conn, key[0], key[1], key[2], key[4], key[3], item.get("created"), item.get("updated"))
+        existing.add(key)
+        added += 1
+    return added
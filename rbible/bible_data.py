@@ -2,13 +2,18 @@
 import os
 import sqlite3
 import json
+import pathlib
 import urllib.request
 import sys
+import unicodedata
 
 # GitHub repository information
 GITHUB_REPO_OWNER = "robertoram"
 GITHUB_REPO_NAME = "rbible"
 
+# Indexed, read-only copies of downloaded versions built by "rbible optimize"
+OPTIMIZED_DIR = os.path.join(os.path.expanduser("~"), ".rbible", "cache", "optimized")
+
 # Book mapping for Spanish Bible books with short names
 BIBLE_BOOKS = {
     # Old Testament
@@ -85,8 +90,66 @@ BIBLE_BOOKS = {
 BOOK_BY_SHORT = {book_data["short"]: book_name for book_name, book_data in BIBLE_BOOKS.items()}
 BOOK_BY_ID = {book_data["id"]: book_name for book_name, book_data in BIBLE_BOOKS.items()}
 
-def load_bible_version(version):
-    """Load the specified Bible version from SQLite file."""
+# MyBible modules number books 10, 20, ... 730 instead of 1-66
+MYBIBLE_BOOK_NUMBERS = dict(zip(range(1, 67), [
+    10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110, 120, 130, 140, 150, 160,
+    190, 220, 230, 240, 250, 260, 290, 300, 310, 330, 340, 350, 360, 370,
+    380, 390, 400, 410, 420, 430, 440, 450, 460,
+    470, 480, 490, 500, 510, 520, 530, 540, 550, 560, 570, 580, 590, 600,
+    610, 620, 630, 640, 650, 660, 670, 680, 690, 700, 710, 720, 730
+]))
+BOOK_ID_BY_MYBIBLE_NUMBER = {number: book_id for book_id, number in MYBIBLE_BOOK_NUMBERS.items()}
+
+# OSIS book codes, used by cross-reference datasets such as OpenBible.info's
+OSIS_BOOK_CODES = dict(zip(range(1, 67), [
+    "Gen", "Exod", "Lev", "Num", "Deut", "Josh", "Judg", "Ruth", "1Sam", "2Sam",
+    "1Kgs", "2Kgs", "1Chr", "2Chr", "Ezra", "Neh", "Esth", "Job", "Ps", "Prov",
+    "Eccl", "Song", "Isa", "Jer", "Lam", "Ezek", "Dan", "Hos", "Joel", "Amos",
+    "Obad", "Jonah", "Mic", "Nah", "Hab", "Zeph", "Hag", "Zech", "Mal",
+    "Matt", "Mark", "Luke", "John", "Acts", "Rom", "1Cor", "2Cor", "Gal", "Eph",
+    "Phil", "Col", "1Thess", "2Thess", "1Tim", "2Tim", "Titus", "Phlm", "Heb", "Jas",
+    "1Pet", "2Pet", "1John", "2John", "3John", "Jude", "Rev"
+]))
+BOOK_ID_BY_OSIS_CODE = {code: book_id for book_id, code in OSIS_BOOK_CODES.items()}
+
+# Common abbreviations people type besides the short codes above
+BOOK_ALIASES = {
+    "Gn": "Génesis", "Ex": "Éxodo", "Lv": "Levítico", "Nm": "Números", "Dt": "Deuteronomio",
+    "Rt": "Rut", "1S": "1 Samuel", "2S": "2 Samuel", "1R": "1 Reyes", "2R": "2 Reyes",
+    "1Cro": "1 Crónicas", "2Cro": "2 Crónicas", "Prov": "Proverbios", "Pr": "Proverbios",
+    "Ec": "Eclesiastés", "Cnt": "Cantares", "Cantar de los Cantares": "Cantares",
+    "Is": "Isaías", "Jr": "Jeremías", "Lm": "Lamentaciones", "Ez": "Ezequiel", "Dn": "Daniel",
+    "Os": "Oseas", "Jl": "Joel", "Am": "Amós", "Mi": "Miqueas", "Na": "Nahúm", "Ha": "Habacuc",
+    "Ag": "Hageo", "Ml": "Malaquías",
+    "Mt": "Mateo", "Mc": "Marcos", "Mr": "Marcos", "Lc": "Lucas", "Jn": "Juan", "Hch": "Hechos",
+    "Ro": "Romanos", "Ga": "Gálatas", "Ef": "Efesios", "Flp": "Filipenses", "He": "Hebreos",
+    "Stg": "Santiago", "Sant": "Santiago", "1P": "1 Pedro", "2P": "2 Pedro", "1Jn": "1 Juan",
+    "2Jn": "2 Juan", "3Jn": "3 Juan", "Jds": "Judas", "Ap": "Apocalipsis",
+}
+
+def fold_accents(text):
+    """Lowercase text and strip accents, so 'Génesis' and 'genesis' compare equal."""
+    decomposed = unicodedata.normalize('NFD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+# Accent-folded names, short codes and aliases for exact lookups
+BOOK_ID_BY_KEY = {}
+for _book_name, _book_data in BIBLE_BOOKS.items():
+    BOOK_ID_BY_KEY[fold_accents(_book_name)] = _book_data["id"]
+    BOOK_ID_BY_KEY.setdefault(fold_accents(_book_data["short"]), _book_data["id"])
+for _alias, _book_name in BOOK_ALIASES.items():
+    BOOK_ID_BY_KEY.setdefault(fold_accents(_alias), BIBLE_BOOKS[_book_name]["id"])
+
+def pack_verse_id(book_id, chapter, verse):
+    """Pack a verse position into one sortable integer (BBCCCVVV)."""
+    return book_id * 1000000 + chapter * 1000 + verse
+
+def unpack_verse_id(verse_id):
+    """Unpack an integer from pack_verse_id() into (book_id, chapter, verse)."""
+    return verse_id // 1000000, verse_id // 1000 % 1000, verse_id % 1000
+
+def get_bible_path(version):
+    """Return the path of the SQLite file for a Bible version, or None if not found."""
     possible_paths = [
         # First check the current directory
         os.path.join(os.getcwd(), "bibles", f"{version}.mybible"),
@@ -98,14 +161,42 @@ def load_bible_version(version):
     
     for bible_path in possible_paths:
         if os.path.exists(bible_path):
-            try:
-                conn = sqlite3.connect(bible_path)
-                conn.row_factory = sqlite3.Row
-                return conn
-            except sqlite3.Error as e:
-                print(f"Error: Could not open Bible version file '{version}.mybible'.")
-                print(f"SQLite error: {e}")
-                sys.exit(1)
+            return bible_path
+    
+    return None
+
+def get_optimized_path(version):
+    """Return the path of the optimized copy of a version (which may not exist)."""
+    return os.path.join(OPTIMIZED_DIR, f"{version}.mybible")
+
+def read_only_uri(path):
+    """Get the SQLite URI that opens a file read-only (connect with uri=True), escaping any '#', '?' or '%' in the path."""
+    return pathlib.Path(os.path.abspath(path)).as_uri() + "?mode=ro"
+
+def get_read_path(version, bible_path):
+    """Return the file to read a version from: its optimized copy while it is newer than the source (bible_path), else the source."""
+    if bible_path:
+        optimized_path = get_optimized_path(version)
+        try:
+            if os.path.getmtime(optimized_path) >= os.path.getmtime(bible_path):
+                return optimized_path
+        except OSError:
+            pass  # Not optimized
+    return bible_path
+
+def load_bible_version(version):
+    """Load the specified Bible version from SQLite file."""
+    bible_path = get_read_path(version, get_bible_path(version))
+    
+    if bible_path:
+        try:
+            conn = sqlite3.connect(bible_path)
+            conn.row_factory = sqlite3.Row
+            return conn
+        except sqlite3.Error as e:
+            print(f"Error: Could not open Bible version file '{version}.mybible'.")
+            print(f"SQLite error: {e}")
+            sys.exit(1)
     
     # If we get here, the file wasn't found
     print(f"Error: Bible version '{version}' not found.")
@@ -134,19 +225,9 @@ def get_available_versions():
     return list(versions)
 
 def get_book_id(book):
-    """Get the book ID for a given book name or short code."""
-    # Try to match by full name (case-insensitive)
-    for full_name, data in BIBLE_BOOKS.items():
-        if full_name.lower() == book.lower():
-            return data["id"]
-    
-    # Try to match by short code (case-insensitive)
-    for full_name, data in BIBLE_BOOKS.items():
-        if data["short"].lower() == book.lower():
-            return data["id"]
-    
-    # Not found
-    return None
+    """Get the book ID for a given book name, short code or alias (case and accent-insensitive)."""
+    # Collapse repeated spaces so "1  Juan" matches "1 Juan"
+    return BOOK_ID_BY_KEY.get(fold_accents(' '.join(book.split())))
 
 def list_books():
     """List all available book names and their short codes in columns."""
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+from bisect import bisect_left
+
+from rbible.bible_data import BIBLE_BOOKS, BOOK_ALIASES, fold_accents
+
+# Match kinds, in ranking order
+EXACT_MATCH = 0
+NAME_PREFIX_MATCH = 1
+CODE_PREFIX_MATCH = 2
+FUZZY_MATCH = 3
+
+def _build_index():
+    """Build a sorted array of (folded key, book name, is full name) for prefix lookups."""
+    entries = set()
+    for book_name, book_data in BIBLE_BOOKS.items():
+        entries.add((fold_accents(book_name), book_name, True))
+        entries.add((fold_accents(book_data["short"]), book_name, False))
+    for alias, book_name in BOOK_ALIASES.items():
+        entries.add((fold_accents(alias), book_name, False))
+    return sorted(entries)
+
+# Built once at import, 66 books with their codes and aliases is a few hundred entries
+_INDEX = _build_index()
+_INDEX_KEYS = [entry[0] for entry in _INDEX]
+
+def edit_distance(a, b, max_distance):
+    """Levenshtein distance between a and b, or max_distance + 1 once it is exceeded."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        # No later row can be better than the best of this one
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+def _max_typos(query):
+    """Allowed edit distance for a query: none for very short input, up to 2 for longer."""
+    if len(query) < 3:
+        return 0
+    if len(query) < 5:
+        return 1
+    return 2
+
+def complete_book(prefix, limit=10):
+    """Get ranked book name suggestions for a partial, possibly unaccented or misspelled, name."""
+    query = fold_accents(' '.join(prefix.split()))
+    if not query:
+        return []
+
+    # Best (kind, distance) found for each book
+    matches = {}
+
+    def add_match(book_name, rank):
+        if book_name not in matches or rank < matches[book_name]:
+            matches[book_name] = rank
+
+    # Prefix matches are a contiguous slice of the sorted keys
+    position = bisect_left(_INDEX_KEYS, query)
+    while position < len(_INDEX) and _INDEX_KEYS[position].startswith(query):
+        key, book_name, is_name = _INDEX[position]
+        if key == query:
+            add_match(book_name, (EXACT_MATCH, 0))
+        else:
+            add_match(book_name, (NAME_PREFIX_MATCH if is_name else CODE_PREFIX_MATCH, 0))
+        position += 1
+
+    # Typo-tolerant matches only when nothing matched as typed, comparing
+    # against the full key and against a key prefix of the same length
+    max_typos = _max_typos(query)
+    if max_typos and not matches:
+        for key, book_name, _ in _INDEX:
+            distance = min(
+                edit_distance(query, key, max_typos),
+                edit_distance(query, key[:len(query)], max_typos)
+            )
+            if distance <= max_typos:
+                add_match(book_name, (FUZZY_MATCH, distance))
+
+    # Rank by match kind and distance, then in biblical order
+    ranked = sorted(matches, key=lambda name: (matches[name], BIBLE_BOOKS[name]["id"]))
+    return ranked[:limit] if limit else ranked
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+import os
+import json
+import sqlite3
+
+from rbible.bible_data import get_bible_path, get_book_id
+from rbible.schema import get_adapter
+from rbible.text_utils import strip_markup
+from rbible.user_data import write_json_atomic
+from rbible.verse_operations import iter_all_verses
+
+# Per-version metadata (versification, ...) cached between runs
+CATALOG_FILE = os.path.join(os.path.expanduser("~"), ".rbible", "cache", "catalog.json")
+
+# In-process caches so the catalog file is read at most once per run
+_catalog = None
+_versifications = {}
+
+def load_catalog():
+    """Load the catalog of per-version metadata."""
+    global _catalog
+    if _catalog is None:
+        try:
+            with open(CATALOG_FILE, 'r', encoding='utf-8') as f:
+                _catalog = json.load(f)
+        except (OSError, ValueError):
+            _catalog = {}
+    return _catalog
+
+def save_catalog(catalog):
+    """Save the catalog of per-version metadata, replacing the file at once so other processes never read it half-written."""
+    os.makedirs(os.path.dirname(CATALOG_FILE), exist_ok=True)
+    write_json_atomic(CATALOG_FILE, catalog)
+
+def get_catalog_entry(version):
+    """Get the catalog entry of a version, resetting it if the Bible file changed."""
+    bible_path = get_bible_path(version)
+    if not bible_path:
+        return None
+
+    stat = os.stat(bible_path)
+    catalog = load_catalog()
+    entry = catalog.get(version)
+
+    # The file was replaced (e.g. downloaded again), drop everything we knew about it
+    if not entry or entry.get("mtime") != stat.st_mtime or entry.get("size") != stat.st_size:
+        entry = {"path": bible_path, "mtime": stat.st_mtime, "size": stat.st_size}
+        catalog[version] = entry
+        _versifications.pop(version, None)
+
+    return entry
+
+def build_versification(bible_conn):
+    """Build the versification table of a Bible: the verse count of every chapter of every book."""
+    rows = get_adapter(bible_conn).verse_counts()
+
+    versification = {}
+    for book_id, chapter, max_verse in rows:
+        if book_id is None or chapter < 1:
+            continue
+
+        # Index chapters by position (chapter 1 is at index 0), padding any gaps with 0
+        chapters = versification.setdefault(book_id, [])
+        while len(chapters) < chapter:
+            chapters.append(0)
+        chapters[chapter - 1] = max_verse
+
+    return versification
+
+def get_versification(version, bible_conn=None):
+    """Get the versification table of a version, building and caching it on first use."""
+    entry = get_catalog_entry(version)
+    if entry is None:
+        return None
+
+    if version in _versifications:
+        return _versifications[version]
+
+    if "versification" in entry:
+        # JSON object keys are always strings
+        versification = {int(book_id): chapters for book_id, chapters in entry["versification"].items()}
+    else:
+        conn = bible_conn or sqlite3.connect(entry["path"])
+        try:
+            versification = build_versification(conn)
+        finally:
+            if bible_conn is None:
+                conn.close()
+
+        entry["versification"] = versification
+        try:
+            save_catalog(load_catalog())
+        except OSError as e:
+            print(f"Warning: Could not save catalog: {e}")
+
+    _versifications[version] = versification
+    return versification
+
+def build_word_counts(bible_conn):
+    """Count the words of every chapter of every book, in the same layout as the versification table."""
+    word_counts = {}
+    for book_id, chapter, verse, text in iter_all_verses(bible_conn):
+        chapters = word_counts.setdefault(book_id, [])
+        while len(chapters) < chapter:
+            chapters.append(0)
+        chapters[chapter - 1] += len(strip_markup(text).split())
+    return word_counts
+
+def get_word_counts(version):
+    """Get the per-chapter word counts of a version, counting them once and caching them in the catalog."""
+    entry = get_catalog_entry(version)
+    if entry is None:
+        return None
+
+    if "word_counts" not in entry:
+        conn = sqlite3.connect(entry["path"])
+        try:
+            entry["word_counts"] = build_word_counts(conn)
+        finally:
+            conn.close()
+        try:
+            save_catalog(load_catalog())
+        except OSError as e:
+            print(f"Warning: Could not save catalog: {e}")
+
+    return {int(book_id): chapters for book_id, chapters in entry["word_counts"].items()}
+
+def get_chapter_count(versification, book_id):
+    """Get the number of chapters of a book."""
+    return len(versification.get(book_id, []))
+
+def get_verse_count(versification, book_id, chapter):
+    """Get the number of verses of a chapter."""
+    chapters = versification.get(book_id, [])
+    if 1 <= chapter <= len(chapters):
+        return chapters[chapter - 1]
+    return 0
+
+def check_reference(versification, book, chapter, verse):
+    """Raise ValueError if a reference does not exist in the versification."""
+    book_id = get_book_id(book)
+
+    # Unknown books are left to the database lookup
+    if book_id is None or book_id not in versification:
+        return
+
+    chapter_count = get_chapter_count(versification, book_id)
+    if not 1 <= chapter <= chapter_count:
+        raise ValueError(f"{book} has {chapter_count} chapters, there is no chapter {chapter}")
+
+    if isinstance(verse, tuple):
+        start_verse, end_verse = verse
+    else:
+        start_verse = end_verse = verse
+
+    verse_count = get_verse_count(versification, book_id, chapter)
+    if not 1 <= start_verse <= verse_count:
+        raise ValueError(f"{book} {chapter} has {verse_count} verses, there is no verse {start_verse}")
+    if end_verse < start_verse:
+        raise ValueError(f"Invalid verse range {start_verse}-{end_verse}")
+
+def clamp_verse_range(versification, book, chapter, verse):
+    """Clamp the end of a verse range to the last verse of the chapter."""
+    book_id = get_book_id(book)
+    if not isinstance(verse, tuple) or book_id is None:
+        return verse
+
+    verse_count = get_verse_count(versification, book_id, chapter)
+    start_verse, end_verse = verse
+    if verse_count and end_verse > verse_count:
+        return (start_verse, verse_count)
+    return verse
+
+def first_warning(bible_path, warning):
+    """Record a warning about a version's Bible file, returning False if it was already shown for this file.
+
+    Kept in the version's catalog entry, so it is shown again once the file changes.
+    """
+    name = os.path.basename(bible_path)
+    if not name.endswith(".mybible"):
+        return True
+    entry = get_catalog_entry(name[:-len(".mybible")])
+    if entry is None or entry["path"] != bible_path:
+        return True
+
+    warnings = entry.setdefault("warnings", [])
+    if warning in warnings:
+        return False
+    warnings.append(warning)
+    try:
+        save_catalog(load_catalog())
+    except OSError:
+        pass  # Shown again next time
+    return True
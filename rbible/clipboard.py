@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Clipboard backends: detected once, cached, and fast enough to stay out of the way of lookups.
+"""
+
+import os
+import sys
+import json
+import base64
+import shutil
+import hashlib
+import subprocess
+
+from rbible.config import load_config
+
+CLIPBOARD_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".rbible", "cache", "clipboard.json")
+
+# Commands that read the text to copy from stdin
+CLIPBOARD_COMMANDS = {
+    "pbcopy": ["pbcopy"],
+    "wl-copy": ["wl-copy"],
+    "xclip": ["xclip", "-selection", "clipboard"],
+    "xsel": ["xsel", "--clipboard", "--input"],
+    "clip.exe": ["clip.exe"],
+    "termux": ["termux-clipboard-set"],
+}
+
+class ClipboardError(Exception):
+    """Raised when text can't be copied."""
+
+def _environment_key():
+    """Get a fingerprint of what the detection depends on, so the cached backend is redone when it changes."""
+    parts = [sys.platform] + [os.environ.get(name, "") for name in ("DISPLAY", "WAYLAND_DISPLAY", "SSH_TTY", "TMUX", "PATH")]
+    return hashlib.sha1("\0".join(parts).encode()).hexdigest()
+
+def detect_backend():
+    """Pick the clipboard backend for this environment (without the cache)."""
+    ssh = os.environ.get("SSH_TTY") or os.environ.get("SSH_CONNECTION")
+    display = os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")
+
+    # Over SSH the local machine's clipboard is only reachable through the terminal
+    if ssh and not display:
+        return "osc52"
+    if sys.platform == "win32":
+        return "pyperclip"
+    if sys.platform == "darwin" and shutil.which("pbcopy"):
+        return "pbcopy"
+    if os.environ.get("WAYLAND_DISPLAY") and shutil.which("wl-copy"):
+        return "wl-copy"
+    if os.environ.get("DISPLAY"):
+        for name in ("xclip", "xsel"):
+            if shutil.which(name):
+                return name
+    # WSL and Termux
+    for name in ("clip.exe", "termux"):
+        if shutil.which(CLIPBOARD_COMMANDS[name][0]):
+            return name
+    if os.environ.get("TERM") and os.path.exists("/dev/tty"):
+        return "osc52"
+    return "none"
+
+def get_backend():
+    """Get the clipboard backend: RBIBLE_CLIPBOARD or the config's clipboard if set, otherwise the cached detection."""
+    configured = os.environ.get("RBIBLE_CLIPBOARD") or load_config()["clipboard"]
+    if configured:
+        return configured
+
+    key = _environment_key()
+    try:
+        with open(CLIPBOARD_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get("key") == key:
+            return cached["backend"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    backend = detect_backend()
+    try:
+        os.makedirs(os.path.dirname(CLIPBOARD_CACHE_FILE), exist_ok=True)
+        # Written to a temp file, then renamed, so another rbible never reads it half-written
+        temp_path = f"{CLIPBOARD_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"key": key, "backend": backend}, f)
+        os.replace(temp_path, CLIPBOARD_CACHE_FILE)
+    except OSError:
+        pass  # Detecting again next time is fine
+    return backend
+
+def osc52_sequence(text):
+    """Get the OSC 52 escape sequence that asks the terminal to set its clipboard."""
+    sequence = f"\033]52;c;{base64.b64encode(text.encode('utf-8')).decode('ascii')}\a"
+    # tmux only passes escape sequences through when wrapped
+    if os.environ.get("TMUX"):
+        sequence = f"\033Ptmux;\033{sequence}\033\\"
+    return sequence
+
+def _copy_with_command(command, text):
+    """Hand the text to a clipboard command without waiting for it.
+
+    Commands like xclip stay alive to serve the selection, so they run in their own session.
+    """
+    encoding = "utf-16" if command[0] == "clip.exe" else "utf-8"
+    try:
+        process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        process.stdin.write(text.encode(encoding))
+        process.stdin.close()
+    except OSError as e:
+        raise ClipboardError(f"{command[0]}: {e}")
+
+def copy(text, backend=None):
+    """Copy text with the detected (or given) backend.
+
+    Backends: a clipboard command, "osc52", "pyperclip", "stdout", "file:PATH" or "none".
+    Raises ClipboardError if the text can't be copied.
+    """
+    backend = backend or get_backend()
+
+    if backend in CLIPBOARD_COMMANDS:
+        _copy_with_command(CLIPBOARD_COMMANDS[backend], text)
+    elif backend == "osc52":
+        # Written to the terminal itself, so redirected output stays clean
+        try:
+            with open("/dev/tty", 'w') as tty:
+                tty.write(osc52_sequence(text))
+        except OSError as e:
+            raise ClipboardError(f"No terminal for OSC 52: {e}")
+    elif backend.startswith("file:"):
+        try:
+            with open(os.path.expanduser(backend[5:]), 'w', encoding='utf-8') as f:
+                f.write(text)
+        except OSError as e:
+            raise ClipboardError(str(e))
+    elif backend == "stdout":
+        sys.stdout.write(text + "\n")
+    elif backend == "pyperclip":
+        # Only imported where it is the backend, it probes for tools when it loads
+        try:
+            import pyperclip
+            pyperclip.copy(text)
+        except Exception as e:
+            raise ClipboardError(str(e))
+    elif backend == "none":
+        raise ClipboardError("No clipboard found (set RBIBLE_CLIPBOARD to osc52, stdout or file:PATH, or use -n)")
+    else:
+        raise ClipboardError(f"Unknown clipboard backend '{backend}'")
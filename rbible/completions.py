@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Static completion files (rbible completions generate): bash, zsh and fish scripts with the
+books and versification built in, and a JSON file for the Neovim plugin, so completing a
+reference doesn't start Python.
+"""
+
+import os
+import json
+
+from rbible.bible_data import BIBLE_BOOKS, BOOK_ALIASES, fold_accents
+from rbible.catalog import get_catalog_entry, get_versification
+
+COMPLETIONS_DIR = os.path.join(os.path.expanduser("~"), ".rbible", "completions")
+DATA_FILE = "completions.json"
+SCRIPTS = {"bash": "rbible.bash", "zsh": "_rbible", "fish": "rbible.fish"}
+
+# Bumped when the generated files change, so older ones are regenerated
+COMPLETIONS_FORMAT = 1
+
+# Options followed by a reference or by versions
+REFERENCE_OPTIONS = ("-v", "--verse", "-c", "--complete")
+VERSION_OPTIONS = ("-b", "--bible", "-p", "--parallel")
+# Subcommands whose arguments are references
+REFERENCE_COMMANDS = ("tui", "similar", "xref", "diff")
+
+def get_data_path(directory=None):
+    """Get the path of the JSON completion data."""
+    return os.path.join(directory or COMPLETIONS_DIR, DATA_FILE)
+
+def book_names():
+    """Get the book names in biblical order."""
+    return sorted(BIBLE_BOOKS, key=lambda name: BIBLE_BOOKS[name]["id"])
+
+def book_keys():
+    """Get {lowercase key: book name} for every name, short code and alias, with and without accents."""
+    spellings = [(name, name) for name in book_names()]
+    spellings += [(BIBLE_BOOKS[name]["short"], name) for name in book_names()]
+    spellings += list(BOOK_ALIASES.items())
+    keys = {}
+    for spelling, name in spellings:
+        keys.setdefault(spelling.lower(), name)
+        keys.setdefault(fold_accents(spelling), name)
+    return keys
+
+def catalog_signature(versions, default_version):
+    """Identify the installed versions (with their file sizes and times) and the default one.
+
+    The files are generated again only when this changes.
+    """
+    entries = []
+    for version in sorted(versions):
+        entry = get_catalog_entry(version)
+        if entry is not None:
+            entries.append([version, entry["mtime"], entry["size"]])
+    return {"format": COMPLETIONS_FORMAT, "versions": entries, "default_version": default_version}
+
+def build_data(versions, default_version, signature):
+    """Build the JSON completion data: books with their aliases, lookup keys, and each version's versification."""
+    aliases = {}
+    for alias, name in BOOK_ALIASES.items():
+        aliases.setdefault(name, []).append(alias)
+    return {
+        "source": signature,
+        "default_version": default_version,
+        "books": [
+            {"id": BIBLE_BOOKS[name]["id"], "name": name, "short": BIBLE_BOOKS[name]["short"], "aliases": aliases.get(name, [])}
+            for name in book_names()
+        ],
+        "keys": {key: BIBLE_BOOKS[name]["id"] for key, name in book_keys().items()},
+        # JSON object keys are strings: {"43": [51, 25, ...]} is John's verse count per chapter
+        "versions": {
+            version: {"versification": {str(book_id): chapters for book_id, chapters in (get_versification(version) or {}).items()}}
+            for version in sorted(versions)
+        },
+    }
+
+def _quote(text):
+    """Quote a word for bash and zsh."""
+    return "'" + text.replace("'", "'\\''") + "'"
+
+def _fish_quote(text):
+    return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+def _words(items, quote=_quote):
+    return " ".join(quote(item) for item in items)
+
+def _verse_counts(data):
+    """Get {book name: "31 25 ..."} for the default version, which the shell scripts complete from."""
+    versification = data["versions"].get(data["default_version"] or "", {}).get("versification", {})
+    return {book["name"]: " ".join(str(count) for count in versification.get(str(book["id"]), [])) for book in data["books"]}
+
+def _header(data, shell):
+    versions = ", ".join(data["versions"]) or "no versions"
+    return (f"# {shell} completion for rbible, generated by \"rbible completions generate\" ({versions}).\n"
+            "# Regenerated when Bible versions are added or replaced; edits are lost.\n")
+
+def render_bash(data, options, commands):
+    """Render the bash completion script (bash 4+)."""
+    names = [book["name"] for book in data["books"]]
+    keys = {key: names[book_id - 1] for key, book_id in data["keys"].items()}
+    counts = _verse_counts(data)
+    option_names = [name for flags, *_ in options for name in flags]
+    return _header(data, "bash") + f"""# Load it from ~/.bashrc: source ~/.rbible/completions/rbible.bash
+
+_rbible_names=( {_words(names)} )
+declare -gA _rbible_keys=( {" ".join(f"[{_quote(key)}]={_quote(name)}" for key, name in keys.items())} )
+declare -gA _rbible_verses=( {" ".join(f"[{_quote(name)}]={_quote(count)}" for name, count in counts.items())} )
+_rbible_versions=( {_words(data["versions"])} )
+_rbible_options=( {_words(option_names)} )
+_rbible_commands=( {_words(commands)} )
+_rbible_reference_commands=( {_words(REFERENCE_COMMANDS)} )
+
+# Print the references that complete a partial one: a book, then "book chapter", then "book chapter:verse"
+_rbible_references() {{
+    local partial=$1 book key i IFS=$' \\t\\n'
+    local -a counts
+    if [[ $partial =~ ^(.*[^[:space:]])[[:space:]]+([0-9]+)(:([0-9]*))?$ ]]; then
+        local typed=${{BASH_REMATCH[1]}} chapter=${{BASH_REMATCH[2]}} colon=${{BASH_REMATCH[3]}} verse=${{BASH_REMATCH[4]}}
+        book=${{_rbible_keys[${{typed,,}}]}}
+        if [[ -n $book ]]; then
+            counts=( ${{_rbible_verses[$book]}} )
+            if [[ -n $colon ]]; then
+                (( chapter >= 1 && chapter <= ${{#counts[@]}} )) || return
+                for (( i = 1; i <= counts[chapter - 1]; i++ )); do
+                    [[ $i == "$verse"* ]] && echo "$typed $chapter:$i"
+                done
+            else
+                for (( i = 1; i <= ${{#counts[@]}}; i++ )); do
+                    [[ $i == "$chapter"* ]] && echo "$typed $i"
+                done
+            fi
+            return
+        fi
+    fi
+    local lower=${{partial,,}}
+    local -A found=()
+    for key in "${{!_rbible_keys[@]}}"; do
+        [[ $key == "$lower"* ]] && found[${{_rbible_keys[$key]}}]=1
+    done
+    for book in "${{_rbible_names[@]}}"; do
+        [[ -n ${{found[$book]}} ]] && echo "$book"
+    done
+}}
+
+_rbible() {{
+    local line=${{COMP_LINE:0:COMP_POINT}} partial before
+    local quotes=${{line//[^\\"]/}}
+    # Inside an open quote the whole quoted text is completed, spaces and ':' included
+    if (( ${{#quotes}} % 2 )); then
+        partial=${{line##*\\"}}
+        before=${{line%\\"*}}
+    else
+        partial=${{line##*[[:space:]]}}
+        before=${{line%"$partial"}}
+    fi
+    local -a words
+    read -ra words <<< "$before"
+    local previous=${{words[${{#words[@]}} - 1]}} command=${{words[1]}}
+    local references=${{_rbible_reference_commands[*]}}
+    local IFS=$'\\n'
+    case $previous in
+        -v|--verse|-c|--complete) COMPREPLY=( $(_rbible_references "$partial") ) ;;
+        -b|--bible|-p|--parallel) COMPREPLY=( $(compgen -W "${{_rbible_versions[*]}}" -- "$partial") ) ;;
+        *)
+            if [[ $partial == -* ]]; then
+                COMPREPLY=( $(compgen -W "${{_rbible_options[*]}}" -- "$partial") )
+            elif (( ${{#words[@]}} == 1 )); then
+                COMPREPLY=( $(compgen -W "${{_rbible_commands[*]}}" -- "$partial") )
+            elif [[ " $references " == *" $command "* ]]; then
+                COMPREPLY=( $(_rbible_references "$partial") )
+            fi
+            ;;
+    esac
+}}
+
+complete -o nosort -F _rbible rbible 2>/dev/null || complete -F _rbible rbible
+"""
+
+def render_zsh(data, options, commands):
+    """Render the zsh completion function (autoloaded from $fpath)."""
+    names = [book["name"] for book in data["books"]]
+    keys = {key: names[book_id - 1] for key, book_id in data["keys"].items()}
+    counts = _verse_counts(data)
+    described = [f"{name}:{help_text or ''}" for flags, help_text, *_ in options for name in flags]
+    return "#compdef rbible\n" + _header(data, "zsh") + f"""# Add the directory to fpath before compinit: fpath=(~/.rbible/completions $fpath)
+
+typeset -gA _rbible_keys _rbible_verses
+_rbible_names=( {_words(names)} )
+_rbible_keys=( {" ".join(f"{_quote(key)} {_quote(name)}" for key, name in keys.items())} )
+_rbible_verses=( {" ".join(f"{_quote(name)} {_quote(count)}" for name, count in counts.items())} )
+_rbible_versions=( {_words(data["versions"])} )
+_rbible_options=( {_words(described)} )
+_rbible_commands=( {_words(commands)} )
+_rbible_reference_commands=( {_words(REFERENCE_COMMANDS)} )
+
+# Complete a partial reference: a book, then "book chapter", then "book chapter:verse"
+_rbible_references() {{
+  local book key i
+  local -a counts candidates
+  if [[ $PREFIX =~ '^(.*[^[:space:]])[[:space:]]+([0-9]+)(:([0-9]*))?$' ]]; then
+    local typed=$match[1] chapter=$match[2] colon=$match[3] verse=$match[4]
+    book=${{_rbible_keys[${{(L)typed}}]}}
+    if [[ -n $book ]]; then
+      counts=( ${{=_rbible_verses[$book]}} )
+      if [[ -n $colon ]]; then
+        (( chapter >= 1 && chapter <= $#counts )) || return 1
+        for (( i = 1; i <= counts[chapter]; i++ )); do
+          [[ $i == $verse* ]] && candidates+=( "$typed $chapter:$i" )
+        done
+      else
+        for (( i = 1; i <= $#counts; i++ )); do
+          [[ $i == $chapter* ]] && candidates+=( "$typed $i" )
+        done
+      fi
+      compadd -U -V references -- $candidates
+      return
+    fi
+  fi
+  local lower=${{(L)PREFIX}}
+  local -A found
+  for key in ${{(k)_rbible_keys}}; do
+    if [[ $key == $lower* ]]; then
+      book=$_rbible_keys[$key]
+      found[$book]=1
+    fi
+  done
+  for book in $_rbible_names; do
+    (( ${{+found[$book]}} )) && candidates+=( $book )
+  done
+  compadd -U -V books -- $candidates
+}}
+
+_rbible() {{
+  local previous=$words[CURRENT-1] command=$words[2]
+  case $previous in
+    -v|--verse|-c|--complete) _rbible_references ;;
+    -b|--bible|-p|--parallel) compadd -a _rbible_versions ;;
+    *)
+      if [[ $PREFIX == -* ]]; then
+        _describe option _rbible_options
+      elif (( CURRENT == 2 )); then
+        compadd -a _rbible_commands
+      elif (( $_rbible_reference_commands[(Ie)$command] )); then
+        _rbible_references
+      fi
+      ;;
+  esac
+}}
+
+_rbible "$@"
+"""
+
+def render_fish(data, options, commands):
+    """Render the fish completion script."""
+    names = [book["name"] for book in data["books"]]
+    key_items = list(data["keys"].items())
+    counts = _verse_counts(data)
+    lines = [_header(data, "fish") + f"""# Link it into fish's completions: ln -s ~/.rbible/completions/rbible.fish ~/.config/fish/completions/
+
+set -g __rbible_names {_words(names, _fish_quote)}
+set -g __rbible_keys {_words([key for key, _ in key_items], _fish_quote)}
+set -g __rbible_key_books {" ".join(str(book_id) for _, book_id in key_items)}
+set -g __rbible_verses {_words([counts[name] for name in names], _fish_quote)}
+
+# Print the references that complete the current one: a book, then "book chapter", then "book chapter:verse"
+# (candidates keep the book as typed, since fish only shows candidates matching the token)
+function __rbible_references
+    set -l partial (commandline -ct | string trim -l -c '"\\'')
+    set -l found (string match -r '^(.*\\S)\\s+(\\d+)(:?)(\\d*)$' -- $partial)
+    if test (count $found) -ge 3
+        set -l typed $found[2]
+        set -l chapter $found[3]
+        set -l index (contains -i -- (string lower -- $typed) $__rbible_keys)
+        if test -n "$index"
+            set -l counts (string split -n ' ' -- $__rbible_verses[$__rbible_key_books[$index]])
+            if string match -q '*:*' -- $partial
+                test $chapter -ge 1 -a $chapter -le (count $counts); or return
+                for i in (seq $counts[$chapter])
+                    echo "$typed $chapter:$i"
+                end
+            else
+                for i in (seq (count $counts))
+                    echo "$typed $i"
+                end
+            end
+            return
+        end
+    end
+    set -l lower (string lower -- $partial)
+    set -l shown
+    for i in (seq (count $__rbible_keys))
+        if string match -q -- "$lower*" $__rbible_keys[$i]
+            # The book's name if it matches as typed, otherwise the key that does ("exodo" for "Éxodo")
+            set -l name $__rbible_names[$__rbible_key_books[$i]]
+            string match -q -- "$lower*" (string lower -- $name); or set name $__rbible_keys[$i]
+            contains -- $name $shown; or set -a shown $name
+        end
+    end
+    printf '%s\\n' $shown
+end
+
+function __rbible_reference_command
+    set -l tokens (commandline -opc)
+    test (count $tokens) -ge 2; and contains -- $tokens[2] {_words(REFERENCE_COMMANDS, _fish_quote)}
+end
+
+complete -c rbible -f
+complete -c rbible -n __fish_use_subcommand -a {_fish_quote(" ".join(commands))}
+complete -c rbible -n __rbible_reference_command -a '(__rbible_references)'
+"""]
+    for flags, help_text, takes_value, choices in options:
+        switches = [f"-l {name[2:]}" if name.startswith("--") else f"-s {name[1:]}" for name in flags]
+        arguments = ""
+        if set(flags) & set(REFERENCE_OPTIONS):
+            arguments = " -x -a '(__rbible_references)'"
+        elif set(flags) & set(VERSION_OPTIONS):
+            arguments = f" -x -a {_fish_quote(' '.join(data['versions']))}"
+        elif choices:
+            arguments = f" -x -a {_fish_quote(' '.join(choices))}"
+        elif takes_value:
+            arguments = " -r"
+        description = f" -d {_fish_quote(help_text)}" if help_text else ""
+        lines.append(f"complete -c rbible {' '.join(switches)}{arguments}{description}\n")
+    return "".join(lines)
+
+RENDERERS = {"bash": render_bash, "zsh": render_zsh, "fish": render_fish}
+
+def is_current(directory, signature):
+    """Check that every completion file exists and was generated for this signature."""
+    if not all(os.path.exists(os.path.join(directory, name)) for name in SCRIPTS.values()):
+        return False
+    try:
+        with open(get_data_path(directory), 'r', encoding='utf-8') as f:
+            return json.load(f).get("source") == signature
+    except (OSError, ValueError, AttributeError):
+        return False
+
+def _write(path, text):
+    """Write a file through a temp file, so a shell never sources a partial script."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+def generate(versions, default_version, options, commands, directory=None, force=False):
+    """Write the completion scripts and data unless they are current for the installed versions.
+
+    options are the lookup options as (option strings, help, takes a value, choices or None).
+    Returns True if files were written.
+    """
+    directory = directory or COMPLETIONS_DIR
+    signature = catalog_signature(versions, default_version)
+    if not force and is_current(directory, signature):
+        return False
+
+    os.makedirs(directory, exist_ok=True)
+    data = build_data(versions, default_version, signature)
+    for shell, name in SCRIPTS.items():
+        _write(os.path.join(directory, name), RENDERERS[shell](data, options, commands))
+    # Written last: until it matches, the scripts are regenerated
+    _write(get_data_path(directory), json.dumps(data, ensure_ascii=False))
+    return True
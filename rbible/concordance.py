@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+import os
+import sqlite3
+from collections import defaultdict
+
+from rbible.bible_data import get_bible_path, pack_verse_id, unpack_verse_id, fold_accents, BOOK_BY_ID
+from rbible.text_utils import tokenize, WORD
+from rbible.verse_operations import iter_all_verses
+
+CONCORDANCE_DIR = os.path.join(os.path.expanduser("~"), ".rbible", "cache", "concordance")
+
+# Book ids 1-39 are the Old Testament, 40-66 the New Testament
+NEW_TESTAMENT_START = 40
+
+def encode_postings(verse_ids):
+    """Encode a sorted list of packed verse ids as varint deltas."""
+    data = bytearray()
+    previous = 0
+    for verse_id in verse_ids:
+        delta = verse_id - previous
+        previous = verse_id
+        # 7 bits per byte, high bit set on all but the last byte
+        while delta >= 0x80:
+            data.append((delta & 0x7f) | 0x80)
+            delta >>= 7
+        data.append(delta)
+    return bytes(data)
+
+def decode_postings(data):
+    """Decode varint deltas from encode_postings() back into packed verse ids."""
+    verse_ids = []
+    value = 0
+    shift = 0
+    previous = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            previous += value
+            verse_ids.append(previous)
+            value = 0
+            shift = 0
+    return verse_ids
+
+def get_index_path(version):
+    """Get the path of a version's concordance index."""
+    return os.path.join(CONCORDANCE_DIR, f"{version}.db")
+
+def source_signature(bible_path):
+    """Identify the state of a Bible file, so indexes built from it can be checked for staleness."""
+    stat = os.stat(bible_path)
+    return f"{stat.st_mtime}:{stat.st_size}"
+
+def index_matches_source(index_path, bible_path):
+    """Check that an index exists and was built from the current Bible file."""
+    if not bible_path or not os.path.exists(index_path):
+        return False
+
+    conn = sqlite3.connect(index_path)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+    return row is not None and row[0] == source_signature(bible_path)
+
+def build_index(bible_conn, index_path, signature=""):
+    """Build the concordance index of a Bible: every word mapped to the verses it appears in.
+
+    A word appearing twice in a verse is listed twice, so postings also give occurrence counts.
+    """
+    postings = defaultdict(list)
+    for book_id, chapter, verse, text in iter_all_verses(bible_conn):
+        verse_id = pack_verse_id(book_id, chapter, verse)
+        for token in tokenize(text):
+            postings[token].append(verse_id)
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    temp_path = index_path + ".tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    index_conn = sqlite3.connect(temp_path)
+    try:
+        index_conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        index_conn.execute("""
+            CREATE TABLE tokens (
+                token TEXT PRIMARY KEY,
+                occurrences INTEGER NOT NULL,
+                postings BLOB NOT NULL
+            ) WITHOUT ROWID
+        """)
+        index_conn.execute("INSERT INTO meta VALUES ('source', ?)", (signature,))
+        index_conn.executemany(
+            "INSERT INTO tokens VALUES (?, ?, ?)",
+            ((token, len(verse_ids), encode_postings(sorted(verse_ids))) for token, verse_ids in postings.items())
+        )
+        index_conn.commit()
+    finally:
+        index_conn.close()
+
+    # Replace the old index only once the new one is complete
+    os.replace(temp_path, index_path)
+    return len(postings)
+
+def build_concordance(version, quiet=False):
+    """Build (or rebuild) the concordance index of a version."""
+    bible_path = get_bible_path(version)
+    if not bible_path:
+        print(f"Error: Bible version '{version}' not found.")
+        return False
+
+    if not quiet:
+        print(f"Building concordance index for {version}...")
+    bible_conn = sqlite3.connect(bible_path)
+    try:
+        token_count = build_index(bible_conn, get_index_path(version), source_signature(bible_path))
+    finally:
+        bible_conn.close()
+
+    if not quiet:
+        print(f"Indexed {token_count} distinct words in {version}.")
+    return True
+
+def is_index_current(version):
+    """Check that a version's concordance index exists and matches its Bible file."""
+    return index_matches_source(get_index_path(version), get_bible_path(version))
+
+def lookup_word(index_conn, word):
+    """Get the packed verse ids (one per occurrence) of a word; a trailing * matches a prefix."""
+    token = fold_accents(word.strip())
+    if token.endswith('*'):
+        prefix = token[:-1]
+        # All tokens in [prefix, prefix + highest character) share the prefix
+        rows = index_conn.execute(
+            "SELECT postings FROM tokens WHERE token >= ? AND token < ?",
+            (prefix, prefix + '\U0010ffff')
+        ).fetchall()
+        verse_ids = []
+        for row in rows:
+            verse_ids.extend(decode_postings(row[0]))
+        return sorted(verse_ids)
+
+    row = index_conn.execute("SELECT postings FROM tokens WHERE token = ?", (token,)).fetchone()
+    return decode_postings(row[0]) if row else []
+
+def query_concordance(index_conn, query):
+    """Find the occurrences of all the words of a query.
+
+    Returns (occurrence ids, verse ids): the packed verse id of every word
+    occurrence within the verses containing all the words, and those verses.
+    """
+    words = [word for word in query.split() if WORD.search(word)]
+    if not words:
+        return [], []
+
+    matches = [lookup_word(index_conn, word) for word in words]
+
+    # Verses containing every word
+    verse_ids = set(matches[0])
+    for word_ids in matches[1:]:
+        verse_ids &= set(word_ids)
+
+    occurrence_ids = sorted(verse_id for word_ids in matches for verse_id in word_ids if verse_id in verse_ids)
+    return occurrence_ids, sorted(verse_ids)
+
+def count_by_book(verse_ids):
+    """Count packed verse ids per book id, in biblical order."""
+    counts = defaultdict(int)
+    for verse_id in verse_ids:
+        counts[unpack_verse_id(verse_id)[0]] += 1
+    return dict(sorted(counts.items()))
+
+def count_by_testament(book_counts):
+    """Split per-book counts into Old and New Testament totals."""
+    old = sum(count for book_id, count in book_counts.items() if book_id < NEW_TESTAMENT_START)
+    new = sum(count for book_id, count in book_counts.items() if book_id >= NEW_TESTAMENT_START)
+    return {"Antiguo Testamento": old, "Nuevo Testamento": new}
+
+def format_verse_id(verse_id):
+    """Format a packed verse id as a reference."""
+    book_id, chapter, verse = unpack_verse_id(verse_id)
+    return f"{BOOK_BY_ID.get(book_id, f'Book {book_id}')} {chapter}:{verse}"
+
+def concordance(version, query, by_book=False, limit=20, quiet=False):
+    """Answer a concordance query, building the index first if needed.
+
+    Returns a dict with occurrence and verse counts, counts per testament
+    (and per book if requested) and the first `limit` references.
+    """
+    if not is_index_current(version):
+        if not build_concordance(version, quiet):
+            return None
+
+    index_conn = sqlite3.connect(get_index_path(version))
+    try:
+        occurrence_ids, verse_ids = query_concordance(index_conn, query)
+    finally:
+        index_conn.close()
+
+    book_counts = count_by_book(occurrence_ids)
+    result = {
+        "query": query,
+        "version": version,
+        "occurrences": len(occurrence_ids),
+        "verses": len(verse_ids),
+        "by_testament": count_by_testament(book_counts),
+        "references": [format_verse_id(verse_id) for verse_id in (verse_ids[:limit] if limit else verse_ids)],
+    }
+    if by_book:
+        result["by_book"] = {BOOK_BY_ID.get(book_id, f"Book {book_id}"): count for book_id, count in book_counts.items()}
+    return result
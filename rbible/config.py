@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+User profile (~/.rbible/config.toml): default version, version sets, output and daemon settings.
+"""
+
+import os
+import sys
+import copy
+import pickle
+
+CONFIG_FILE = os.path.join(os.path.expanduser("~"), ".rbible", "config.toml")
+# Parsed and validated config, reused while config.toml is unchanged
+SNAPSHOT_FILE = os.path.join(os.path.expanduser("~"), ".rbible", "cache", "config.pickle")
+
+# Bumped when the compiled form changes, so old snapshots are ignored
+SNAPSHOT_FORMAT = 1
+
+OUTPUT_FORMATS = ("plain", "markdown", "json", "html", "latex", "ansi")
+
+DEFAULTS = {
+    "version": None,          # Default Bible version (skips scanning the bibles directories)
+    "search_versions": [],    # Versions searched by -s without -b
+    "parallel": [],           # Versions shown by -p without a list
+    "format": "plain",        # Output format without -m, -j or --format
+    "copy": True,             # Copy looked up verses to the clipboard
+    "clipboard": None,        # Clipboard backend, like RBIBLE_CLIPBOARD
+    "history": True,          # Record looked up verses in history
+    "cache": {
+        "lookups": 4096,      # Verses and ranges kept in memory by the daemon
+        "connections": 4,     # Open Bible files kept by the daemon
+    },
+    "daemon": {
+        "host": "127.0.0.1",
+        "port": 8000,
+        "socket": None,       # Unix socket path, used instead of host and port
+    },
+}
+
+# Expected type of every setting, for validation
+TYPES = {
+    "version": str, "search_versions": list, "parallel": list, "format": str,
+    "copy": bool, "clipboard": str, "history": bool,
+    "cache.lookups": int, "cache.connections": int,
+    "daemon.host": str, "daemon.port": int, "daemon.socket": str,
+}
+
+_config = None
+
+def parse_toml(data):
+    """Parse TOML bytes with tomllib (Python 3.11+) or tomli.
+
+    Raises RuntimeError if neither is available and ValueError for invalid TOML.
+    """
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise RuntimeError("Reading config.toml needs Python 3.11+ or tomli: pip install tomli")
+    try:
+        return tomllib.loads(data.decode("utf-8"))
+    except (tomllib.TOMLDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(str(e))
+
+def compile_config(settings):
+    """Validate parsed settings and merge them over the defaults.
+
+    Raises ValueError for unknown settings or values of the wrong type.
+    """
+    config = copy.deepcopy(DEFAULTS)
+    for key, value in settings.items():
+        if isinstance(value, dict) and isinstance(DEFAULTS.get(key), dict):
+            items = [(f"{key}.{name}", config[key], name, item) for name, item in value.items()]
+        else:
+            items = [(key, config, key, value)]
+        for path, section, name, item in items:
+            expected = TYPES.get(path)
+            if expected is None:
+                raise ValueError(f"Unknown setting '{path}'")
+            # bool is an int in Python, but not in TOML
+            if not isinstance(item, expected) or (expected is int and isinstance(item, bool)):
+                raise ValueError(f"'{path}' must be a {expected.__name__}")
+            section[name] = item
+
+    if config["format"] not in OUTPUT_FORMATS:
+        raise ValueError(f"'format' must be one of: {', '.join(OUTPUT_FORMATS)}")
+    for key in ("search_versions", "parallel"):
+        if not all(isinstance(version, str) for version in config[key]):
+            raise ValueError(f"'{key}' must be a list of version names")
+    if config["daemon"]["socket"]:
+        config["daemon"]["socket"] = os.path.expanduser(config["daemon"]["socket"])
+    return config
+
+def _save_snapshot(signature, config):
+    """Save the compiled config with the signature of the file it came from."""
+    os.makedirs(os.path.dirname(SNAPSHOT_FILE), exist_ok=True)
+    temp_path = f"{SNAPSHOT_FILE}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        pickle.dump({"format": SNAPSHOT_FORMAT, "signature": signature, "config": config}, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, SNAPSHOT_FILE)
+
+def _load_snapshot(signature):
+    """Get the compiled config of the snapshot if it was made from the same file, or None."""
+    try:
+        with open(SNAPSHOT_FILE, 'rb') as f:
+            snapshot = pickle.load(f)
+    except Exception:
+        return None
+    if isinstance(snapshot, dict) and snapshot.get("format") == SNAPSHOT_FORMAT and snapshot.get("signature") == signature:
+        return snapshot["config"]
+    return None
+
+def load_config(reload=False):
+    """Get the user's config, parsing config.toml only when it changed since the last snapshot.
+
+    Errors in the file are reported (on stderr) and the defaults are used instead.
+    """
+    global _config
+    if _config is not None and not reload:
+        return _config
+
+    try:
+        stat = os.stat(CONFIG_FILE)
+    except OSError:
+        _config = copy.deepcopy(DEFAULTS)
+        return _config
+
+    signature = [stat.st_mtime_ns, stat.st_size]
+    config = _load_snapshot(signature)
+    if config is None:
+        try:
+            with open(CONFIG_FILE, 'rb') as f:
+                config = compile_config(parse_toml(f.read()))
+        except (OSError, RuntimeError, ValueError) as e:
+            print(f"Warning: Ignoring {CONFIG_FILE}: {e}", file=sys.stderr)
+            config = copy.deepcopy(DEFAULTS)
+        else:
+            try:
+                _save_snapshot(signature, config)
+            except OSError:
+                pass  # Parsed again next time
+    _config = config
+    return _config
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Word-level diffs between versions, verse by verse, with similarity scores per chapter.
+"""
+
+import sqlite3
+import difflib
+from concurrent.futures import ProcessPoolExecutor
+
+from rbible.bible_data import get_bible_path, get_read_path, read_only_uri, pack_verse_id, unpack_verse_id, BOOK_BY_ID
+from rbible.formatters import render_changes, DIFF_MARKUP
+from rbible.references import format_verse_range
+from rbible.schema import introspect_schema, BibleAdapter
+from rbible.text_utils import strip_markup
+
+def word_changes(old_text, new_text):
+    """Diff the words of two raw verse texts.
+
+    Returns (changes, matched words, total words), where changes are [op, text]
+    pairs with op "equal", "delete" or "insert" (a replacement is a delete then an insert).
+    """
+    old_words = strip_markup(old_text).split()
+    new_words = strip_markup(new_text).split()
+    matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+
+    changes = []
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            changes.append(["equal", " ".join(old_words[i1:i2])])
+            continue
+        if i2 > i1:
+            changes.append(["delete", " ".join(old_words[i1:i2])])
+        if j2 > j1:
+            changes.append(["insert", " ".join(new_words[j1:j2])])
+
+    matched = sum(block.size for block in matcher.get_matching_blocks())
+    return changes, matched, len(old_words) + len(new_words)
+
+def similarity(matched, total):
+    """Get the similarity (0-1) of texts with `matched` words in common out of `total`, like SequenceMatcher.ratio()."""
+    return 2 * matched / total if total else 1.0
+
+def split_by_chapter(ranges):
+    """Split sorted verse id ranges at chapter boundaries, grouped as [(book id, chapter, ranges)]."""
+    chapters = []
+    for start, end in ranges:
+        book_id, chapter, _ = unpack_verse_id(start)
+        end_chapter = unpack_verse_id(end)[1]
+        for current in range(chapter, end_chapter + 1):
+            part = (max(start, pack_verse_id(book_id, current, 1)), min(end, pack_verse_id(book_id, current, 999)))
+            if chapters and chapters[-1][:2] == (book_id, current):
+                chapters[-1][2].append(part)
+            else:
+                chapters.append((book_id, current, [part]))
+    return chapters
+
+def _open_adapter(path):
+    """Open a module read-only through its adapter (without the missing-index warning in every worker)."""
+    conn = sqlite3.connect(read_only_uri(path), uri=True)
+    return BibleAdapter(conn, introspect_schema(conn))
+
+def diff_chapter(task):
+    """Diff the verses of some ranges of one chapter between two modules.
+
+    Takes (old path, new path, ranges), so it can run in a worker process, and returns
+    a list of (verse id, changes or None, matched, total, missing version index or None).
+    """
+    old_path, new_path, ranges = task
+    old, new = _open_adapter(old_path), _open_adapter(new_path)
+    try:
+        old_verses = dict(old.fetch_ranges(ranges))
+        new_verses = dict(new.fetch_ranges(ranges))
+    finally:
+        old.conn.close()
+        new.conn.close()
+
+    verses = []
+    for verse_id in sorted(old_verses.keys() | new_verses.keys()):
+        if verse_id not in new_verses or verse_id not in old_verses:
+            verses.append((verse_id, None, 0, 0, 1 if verse_id not in new_verses else 0))
+            continue
+        changes, matched, total = word_changes(old_verses[verse_id], new_verses[verse_id])
+        verses.append((verse_id, changes, matched, total, None))
+    return verses
+
+def diff_chapters(old_version, new_version, ranges, jobs=None):
+    """Yield (book id, chapter, verse diffs) for every chapter of sorted ranges, in order.
+
+    Several chapters are diffed in a process pool (jobs=1 diffs them in this process).
+    Raises ValueError if a version doesn't exist.
+    """
+    paths = []
+    for version in (old_version, new_version):
+        bible_path = get_bible_path(version)
+        if not bible_path:
+            raise ValueError(f"Bible version '{version}' not found")
+        paths.append(get_read_path(version, bible_path))
+
+    chapters = split_by_chapter(ranges)
+    tasks = [(paths[0], paths[1], chapter_ranges) for _, _, chapter_ranges in chapters]
+    if jobs == 1 or len(tasks) < 2:
+        results = map(diff_chapter, tasks)
+        for (book_id, chapter, _), verses in zip(chapters, results):
+            yield book_id, chapter, verses
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # map() keeps the chapters in order while later ones are still being diffed
+        for (book_id, chapter, _), verses in zip(chapters, executor.map(diff_chapter, tasks)):
+            yield book_id, chapter, verses
+
+def verse_passages(chapter_diffs, old_version, new_version, changed_only=False):
+    """Turn chapter diffs into passages for the formatters, with the changes rendered as plain text."""
+    versions = (old_version, new_version)
+    for _, _, verses in chapter_diffs:
+        for verse_id, changes, matched, total, missing in verses:
+            passage = {"reference": format_verse_range(verse_id, verse_id), "version": f"{old_version}→{new_version}"}
+            if changes is None:
+                passage["error"] = f"Only in {versions[1 - missing]}"
+            else:
+                score = similarity(matched, total)
+                if changed_only and score == 1.0:
+                    continue
+                passage["text"] = render_changes(changes, DIFF_MARKUP["plain"])
+                passage["similarity"] = round(score, 4)
+                passage["changes"] = changes
+            yield passage
+
+def chapter_summaries(chapter_diffs):
+    """Summarize chapter diffs as {"reference", "similarity", "verses", "changed", "missing"} dicts."""
+    for book_id, chapter, verses in chapter_diffs:
+        compared = [verse for verse in verses if verse[1] is not None]
+        matched = sum(verse[2] for verse in compared)
+        total = sum(verse[3] for verse in compared)
+        yield {
+            "reference": f"{BOOK_BY_ID[book_id]} {chapter}",
+            "similarity": round(similarity(matched, total), 4),
+            "verses": len(compared),
+            "changed": sum(1 for verse in compared if verse[2] * 2 != verse[3]),
+            "missing": len(verses) - len(compared),
+        }
@@ -1,52 +1,263 @@
 #!/usr/bin/env python3
+import io
+import sys
+import json
+import html
+import shutil
+import unicodedata
+
+from rbible.bible_data import unpack_verse_id, BOOK_BY_ID
+
+# Output formats by name, each a writer(passages, out) that streams passages to a file-like object.
+# A passage is a dict with "reference", "text" (or "error") and optionally "version".
+FORMATTERS = {}
+
+def register_formatter(name):
+    """Register a writer function as an output format (used as a decorator)."""
+    def register(writer):
+        FORMATTERS[name] = writer
+        return writer
+    return register
+
+def _display_reference(passage):
+    """Get a passage's reference with its version, e.g. "Juan 3:16(RVR)"."""
+    version = passage.get("version")
+    return f"{passage['reference']}({version})" if version else passage["reference"]
+
+def _quote(text):
+    """Prefix every line of a text with a markdown blockquote marker."""
+    return "> " + text.replace("\n", "\n> ")
 
 def format_as_markdown(reference, text, include_reference=True, version=None):
     """Format verse text as markdown."""
-    if include_reference:
-        # Add version to reference if provided
-        ref_display = reference
-        if version:
-            ref_display = f"{reference}({version})"
-            
-        # Add blockquote to both reference and verse text
-        quoted_text = "\n".join([f"> {line}" for line in text.split("\n")])
-        return f"> **{ref_display}**\n>\n{quoted_text}"
-    else:
-        # Add blockquote to the verse text without reference
-        quoted_text = "\n".join([f"> {line}" for line in text.split("\n")])
-        return quoted_text
+    if not include_reference:
+        return _quote(text)
+    ref_display = f"{reference}({version})" if version else reference
+    return f"> **{ref_display}**\n>\n{_quote(text)}"
+
+# Markup around deleted and inserted words of a diff, by format: (delete start, delete end, insert start, insert end)
+DIFF_MARKUP = {
+    "plain": ("[-", "-]", "{+", "+}"),
+    "markdown": ("~~", "~~", "**", "**"),
+    "html": ("<del>", "</del>", "<ins>", "</ins>"),
+    "latex": ("\\sout{", "}", "\\uline{", "}"),  # ulem package
+    "ansi": ("\033[31m[-", "-]\033[0m", "\033[32m{+", "+}\033[0m"),
+}
+
+def render_changes(changes, markup, escape=None):
+    """Render word diff [op, text] pairs as inline text, marking deleted and inserted words."""
+    delete_start, delete_end, insert_start, insert_end = markup
+    parts = []
+    for op, text in changes:
+        text = escape(text) if escape else text
+        if op == "delete":
+            text = f"{delete_start}{text}{delete_end}"
+        elif op == "insert":
+            text = f"{insert_start}{text}{insert_end}"
+        parts.append(text)
+    return " ".join(parts)
+
+def _passage_text(passage, format_name, escape=None):
+    """Get a passage's text for a format, rendering word diffs ("changes") with the format's markup."""
+    if "changes" in passage:
+        return render_changes(passage["changes"], DIFF_MARKUP[format_name], escape)
+    return escape(passage["text"]) if escape else passage["text"]
+
+@register_formatter("plain")
+def write_plain(passages, out):
+    """Write passages as plain text, each preceded by a blank line."""
+    for passage in passages:
+        if "error" in passage:
+            out.write(f"\n{_display_reference(passage)}\nError: {passage['error']}\n")
+        else:
+            out.write(f"\n{_display_reference(passage)}\n{_passage_text(passage, 'plain')}\n")
+
+@register_formatter("markdown")
+def write_markdown(passages, out):
+    """Write passages as markdown blockquotes."""
+    for passage in passages:
+        if "error" in passage:
+            out.write(f"> **{_display_reference(passage)}**: Error - {passage['error']}\n")
+        else:
+            out.write(format_as_markdown(passage["reference"], _passage_text(passage, "markdown"), version=passage.get("version")) + "\n")
+
+@register_formatter("json")
+def write_json(passages, out):
+    """Write passages as a JSON array, one element at a time (same output as format_as_json)."""
+    separator = "[\n  "
+    for passage in passages:
+        out.write(separator)
+        out.write(format_as_json(passage).replace("\n", "\n  "))
+        separator = ",\n  "
+    out.write("[]\n" if separator == "[\n  " else "\n]\n")
+
+@register_formatter("html")
+def write_html(passages, out):
+    """Write passages as HTML blockquotes."""
+    for passage in passages:
+        reference = html.escape(_display_reference(passage))
+        if "error" in passage:
+            out.write(f'<p class="error"><strong>{reference}</strong>: {html.escape(passage["error"])}</p>\n')
+        else:
+            text = _passage_text(passage, "html", html.escape).replace("\n", "<br>\n")
+            out.write(f"<blockquote>\n<p><strong>{reference}</strong></p>\n<p>{text}</p>\n</blockquote>\n")
+
+LATEX_SPECIAL = {c: "\\" + c for c in "&%$#_{}"}
+LATEX_SPECIAL.update({"~": r"\textasciitilde{}", "^": r"\textasciicircum{}", "\\": r"\textbackslash{}"})
+
+def latex_escape(text):
+    """Escape the characters LaTeX treats specially."""
+    return "".join(LATEX_SPECIAL.get(c, c) for c in text)
+
+@register_formatter("latex")
+def write_latex(passages, out):
+    """Write passages as LaTeX quote environments."""
+    for passage in passages:
+        reference = latex_escape(_display_reference(passage))
+        if "error" in passage:
+            out.write(f"\\textbf{{{reference}}}: {latex_escape(passage['error'])}\n\n")
+        else:
+            text = _passage_text(passage, "latex", latex_escape).replace("\n", "\\\\\n")
+            out.write(f"\\begin{{quote}}\n\\textbf{{{reference}}}\\\\\n{text}\n\\end{{quote}}\n\n")
+
+@register_formatter("ansi")
+def write_ansi(passages, out):
+    """Write passages as plain text with bold, colored references for terminals."""
+    for passage in passages:
+        if "error" in passage:
+            out.write(f"\n\033[1;36m{_display_reference(passage)}\033[0m\n\033[31mError: {passage['error']}\033[0m\n")
+        else:
+            out.write(f"\n\033[1;36m{_display_reference(passage)}\033[0m\n{_passage_text(passage, 'ansi')}\n")
+
+def write_passages(format_name, passages, out=None):
+    """Stream passages (any iterable, e.g. a generator) to out (stdout by default) in a registered format."""
+    if format_name not in FORMATTERS:
+        raise ValueError(f"Unknown format '{format_name}', use one of: {', '.join(FORMATTERS)}")
+    FORMATTERS[format_name](passages, out or sys.stdout)
+
+def format_passages(format_name, passages):
+    """Format passages in a registered format as a string."""
+    out = io.StringIO()
+    write_passages(format_name, passages, out)
+    return out.getvalue()
 
 def format_parallel_verses(parallel_results, markdown=False):
     """Format parallel verses for display."""
     if not parallel_results:
         return "No results found."
-    
+
     # Get the reference from the first successful result
     reference = next((r["reference"] for r in parallel_results if "error" not in r), "Unknown reference")
-    
+
+    out = io.StringIO()
     if markdown:
         # Don't include version in main title for parallel view since we show multiple versions
-        output = [f"> **{reference}**\n>"]
-        
+        out.write(f"> **{reference}**\n>")
         for result in parallel_results:
-            version = result["version"]
             if "error" in result:
-                output.append(f"> *{version}*: Error - {result['error']}")
+                out.write(f"\n\n> *{result['version']}*: Error - {result['error']}")
             else:
-                # Add blockquote to each line of the verse text
-                verse_text = result["text"]
-                quoted_text = "\n".join([f"> {line}" for line in verse_text.split("\n")])
-                output.append(f"> *{version}*:\n{quoted_text}")
-        
-        return "\n\n".join(output)
+                out.write(f"\n\n> *{result['version']}*:\n{_quote(result['text'])}")
     else:
-        output = [f"\n{reference}"]
-        
+        out.write(f"\n{reference}")
         for result in parallel_results:
-            version = result["version"]
             if "error" in result:
-                output.append(f"\n[{version}] Error: {result['error']}")
+                out.write(f"\n\n[{result['version']}] Error: {result['error']}")
             else:
-                output.append(f"\n[{version}] {result['text']}")
-        
-        return "\n".join(output)
\ No newline at end of file
+                out.write(f"\n\n[{result['version']}] {result['text']}")
+    return out.getvalue()
+
+def display_width(text):
+    """Get the number of terminal cells a text takes (wide characters take 2, combining marks none)."""
+    return sum(
+        0 if unicodedata.combining(c) else 2 if unicodedata.east_asian_width(c) in ("W", "F") else 1
+        for c in text
+    )
+
+def wrap_text(text, width):
+    """Wrap a text into lines of at most `width` terminal cells, breaking words only if they don't fit a line."""
+    lines = []
+    line, line_width = "", 0
+    for word in text.split():
+        word_width = display_width(word)
+        if line and line_width + 1 + word_width <= width:
+            line, line_width = f"{line} {word}", line_width + 1 + word_width
+            continue
+        if line:
+            lines.append(line)
+        # Words wider than a whole line are cut
+        while word_width > width:
+            cut, cut_width = "", 0
+            for c in word:
+                if cut_width + display_width(c) > width:
+                    break
+                cut, cut_width = cut + c, cut_width + display_width(c)
+            lines.append(cut)
+            word = word[len(cut):]
+            word_width -= cut_width
+        line, line_width = word, word_width
+    if line:
+        lines.append(line)
+    return lines or [""]
+
+def wrap_verses(text, width):
+    """Wrap every line of a passage to `width` cells, indenting continued verses under their text ("16. ...")."""
+    wrapped = []
+    for line in text.split("\n"):
+        number, separator, rest = line.partition(". ")
+        if not (separator and number.replace(":", "").isdigit()):
+            number, separator, rest = "", "", line
+        indent = len(number) + len(separator)
+        lines = wrap_text(rest, max(width - indent, 1))
+        wrapped.append(number + separator + lines[0])
+        wrapped.extend(" " * indent + continued for continued in lines[1:])
+    return "\n".join(wrapped)
+
+def _verse_labels(rows):
+    """Pair every row with its verse label: "Juan 3:16" for the first verse of a book, "3:17" after it."""
+    book_id = None
+    for verse_id, texts in rows:
+        row_book_id, chapter, verse = unpack_verse_id(verse_id)
+        if row_book_id != book_id:
+            book_id = row_book_id
+            yield f"{BOOK_BY_ID.get(book_id, book_id)} {chapter}:{verse}", True, texts
+        else:
+            yield f"{chapter}:{verse}", False, texts
+
+def write_parallel_columns(rows, versions, out, width=None):
+    """Write (verse id, [text per version]) rows side by side, one wrapped column per version.
+
+    The columns fill the terminal width (or `width`); verses missing in a version are left blank.
+    """
+    width = width or shutil.get_terminal_size((100, 24)).columns
+    label_width = 7  # Room for "150:176"
+    column_width = max(10, (width - label_width - 2 * len(versions)) // len(versions))
+
+    def write_line(label, cells):
+        padded = [cell + " " * (column_width - display_width(cell)) for cell in cells]
+        out.write((label.ljust(label_width) + "  " + "  ".join(padded)).rstrip() + "\n")
+
+    write_line("", [version[:column_width] for version in versions])
+    write_line("", ["-" * column_width] * len(versions))
+    for label, new_book, texts in _verse_labels(rows):
+        if new_book:
+            # The book name goes on its own line, the label column only has room for chapter:verse
+            book, label = label.rsplit(" ", 1)
+            out.write(f"\n{book}\n")
+        columns = [wrap_text(text, column_width) if text is not None else [""] for text in texts]
+        for i in range(max(len(column) for column in columns)):
+            write_line(label if i == 0 else "", [column[i] if i < len(column) else "" for column in columns])
+
+def write_parallel_table(rows, versions, out):
+    """Write (verse id, [text per version]) rows as a markdown table, one column per version."""
+    def cell(text):
+        return "—" if text is None else text.replace("|", "\\|").replace("\n", " ")
+
+    out.write("| | " + " | ".join(versions) + " |\n")
+    out.write("|---|" + "---|" * len(versions) + "\n")
+    for label, _, texts in _verse_labels(rows):
+        out.write(f"| **{label}** | " + " | ".join(cell(text) for text in texts) + " |\n")
+
+def format_as_json(data):
+    """Format verses, search results or lists as JSON for machine consumers (e.g. the Neovim plugin)."""
+    return json.dumps(data, ensure_ascii=False, indent=2)
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+HTTP/JSON API server (rbible http) for editors, chat bots and other tools.
+"""
+
+import os
+import asyncio
+import functools
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from rbible.bible_data import get_available_versions
+from rbible.catalog import get_versification, check_reference, clamp_verse_range
+from rbible.config import load_config
+from rbible.formatters import format_as_markdown, format_as_json
+from rbible.pool import ConnectionPool
+from rbible.verse_operations import (
+    split_reference, format_reference, get_verse, get_verses, search_bible, complete_reference
+)
+
+# Verse text only changes when a Bible file is replaced
+IMMUTABLE_CACHE_CONTROL = "public, max-age=86400"
+NO_CACHE = "no-cache"
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+EXPORT_CONTENT_TYPES = {
+    "json": JSON_CONTENT_TYPE,
+    "markdown": "text/markdown; charset=utf-8",
+    "plain": "text/plain; charset=utf-8",
+}
+
+STATUS_TEXT = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+# Maximum size of a request line or header line
+MAX_LINE_LENGTH = 8192
+
+class HTTPError(Exception):
+    """An error reported to the client with an HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class BibleAPI:
+    """Request handlers of the HTTP API, backed by pooled connections and a verse cache."""
+
+    def __init__(self, default_version=None, max_connections=4, workers=4, cache_size=4096):
+        self.default_version = default_version
+        self.pool = ConnectionPool(max_connections)
+
+        # Separate executors so slow searches never hold up lookups
+        self.lookup_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rbible-lookup")
+        self.search_executor = ThreadPoolExecutor(max_workers=max(1, workers // 2), thread_name_prefix="rbible-search")
+
+        # The catalog is a shared file, build versification tables one at a time
+        self._catalog_lock = threading.Lock()
+
+        self._cached_lookup = functools.lru_cache(maxsize=cache_size)(self._lookup)
+        self._cached_range = functools.lru_cache(maxsize=cache_size)(self._range)
+
+        # path -> (handler, executor)
+        self.routes = {
+            "/versions": (self.versions, self.lookup_executor),
+            "/lookup": (self.lookup, self.lookup_executor),
+            "/range": (self.verse_range, self.lookup_executor),
+            "/parallel": (self.parallel, self.lookup_executor),
+            "/export": (self.export, self.lookup_executor),
+            "/complete": (self.complete, self.lookup_executor),
+            "/search": (self.search, self.search_executor),
+        }
+
+    def close(self):
+        """Stop the executors and close pooled connections."""
+        self.lookup_executor.shutdown(wait=False)
+        self.search_executor.shutdown(wait=False)
+        self.pool.close()
+
+    # Helpers
+
+    def _version(self, params):
+        """Get the requested version, falling back to the default or first available one."""
+        available_versions = get_available_versions()
+        version = params.get("version") or self.default_version
+        if not version:
+            if not available_versions:
+                raise HTTPError(404, "No Bible versions found")
+            return sorted(available_versions)[0]
+        if version not in available_versions:
+            raise HTTPError(404, f"Bible version '{version}' not found")
+        return version
+
+    def _versification(self, version):
+        with self._catalog_lock:
+            return get_versification(version)
+
+    def _reference(self, params):
+        """Parse the ref parameter."""
+        if "ref" not in params:
+            raise HTTPError(400, "Missing 'ref' parameter")
+        try:
+            return split_reference(params["ref"])
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+    def _lookup(self, version, book, chapter, verse):
+        """Look up a verse or verse range (cached by the callers through lru_cache)."""
+        versification = self._versification(version)
+        if versification:
+            try:
+                check_reference(versification, book, chapter, verse)
+            except ValueError as e:
+                raise HTTPError(404, str(e))
+            verse = clamp_verse_range(versification, book, chapter, verse)
+
+        with self.pool.connection(version) as conn:
+            try:
+                text = get_verse(conn, book, chapter, verse)
+            except Exception as e:
+                raise HTTPError(404, str(e))
+
+        return {"reference": format_reference(book, chapter, verse), "version": version, "text": text}
+
+    def _range(self, version, book, chapter, start_verse, end_verse):
+        """Get a verse range as separate verses."""
+        with self.pool.connection(version) as conn:
+            verses = get_verses(conn, book, chapter, start_verse, end_verse)
+        if not verses:
+            raise HTTPError(404, f"Verses not found: {format_reference(book, chapter, (start_verse, end_verse))}")
+
+        return {
+            "reference": format_reference(book, chapter, (verses[0][0], verses[-1][0])),
+            "version": version,
+            "verses": [{"verse": number, "text": text} for number, text in verses],
+        }
+
+    # Endpoints, each returning (data, content type, cache control)
+
+    def versions(self, params):
+        return sorted(get_available_versions()), JSON_CONTENT_TYPE, NO_CACHE
+
+    def lookup(self, params):
+        book, chapter, verse = self._reference(params)
+        return self._cached_lookup(self._version(params), book, chapter, verse), JSON_CONTENT_TYPE, IMMUTABLE_CACHE_CONTROL
+
+    def verse_range(self, params):
+        try:
+            book = params["book"]
+            chapter = int(params["chapter"])
+            start_verse = int(params.get("start", 1))
+            end_verse = int(params.get("end", start_verse if "start" in params else 999))
+        except KeyError as e:
+            raise HTTPError(400, f"Missing {e} parameter")
+        except ValueError:
+            raise HTTPError(400, "chapter, start and end must be numbers")
+
+        data = self._cached_range(self._version(params), book, chapter, start_verse, end_verse)
+        return data, JSON_CONTENT_TYPE, IMMUTABLE_CACHE_CONTROL
+
+    def parallel(self, params):
+        book, chapter, verse = self._reference(params)
+        if not params.get("versions"):
+            raise HTTPError(400, "Missing 'versions' parameter")
+
+        results = []
+        for version in params["versions"].split(","):
+            try:
+                results.append(self._cached_lookup(self._version({"version": version}), book, chapter, verse))
+            except HTTPError as e:
+                results.append({"reference": params["ref"], "version": version, "error": str(e)})
+
+        # A missing version may be installed later
+        if any("error" in result for result in results):
+            return results, JSON_CONTENT_TYPE, NO_CACHE
+        return results, JSON_CONTENT_TYPE, IMMUTABLE_CACHE_CONTROL
+
+    def export(self, params):
+        book, chapter, verse = self._reference(params)
+        export_format = params.get("format", "markdown")
+        if export_format not in EXPORT_CONTENT_TYPES:
+            raise HTTPError(400, f"Unknown format '{export_format}', use one of: {', '.join(EXPORT_CONTENT_TYPES)}")
+
+        result = self._cached_lookup(self._version(params), book, chapter, verse)
+        if export_format == "json":
+            body = result
+        elif export_format == "markdown":
+            body = format_as_markdown(result["reference"], result["text"], version=result["version"])
+        else:
+            body = f"{result['reference']}({result['version']})\n{result['text']}"
+        return body, EXPORT_CONTENT_TYPES[export_format], IMMUTABLE_CACHE_CONTROL
+
+    def complete(self, params):
+        version = self._version(params)
+        suggestions = complete_reference(params.get("q", ""), self._versification(version))
+        return suggestions, JSON_CONTENT_TYPE, NO_CACHE
+
+    def search(self, params):
+        query = params.get("q")
+        if not query:
+            raise HTTPError(400, "Missing 'q' parameter")
+        try:
+            limit = int(params.get("limit", 20))
+        except ValueError:
+            raise HTTPError(400, "limit must be a number")
+
+        with self.pool.connection(self._version(params)) as conn:
+            results = search_bible(conn, query, limit)
+        return [{"reference": r["reference"], "text": r["text"]} for r in results], JSON_CONTENT_TYPE, NO_CACHE
+
+    # HTTP handling
+
+    async def dispatch(self, method, target, headers):
+        """Handle a request, returning (status, headers, body)."""
+        url = urlsplit(target)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        cache_control = NO_CACHE
+
+        try:
+            if method not in ("GET", "HEAD"):
+                raise HTTPError(405, f"Method {method} not allowed")
+
+            route = self.routes.get(url.path.rstrip("/"))
+            if not route:
+                raise HTTPError(404, f"Unknown endpoint '{url.path}'")
+
+            handler, executor = route
+            loop = asyncio.get_running_loop()
+            data, content_type, cache_control = await loop.run_in_executor(executor, handler, params)
+            status = 200
+        except HTTPError as e:
+            status, content_type, data = e.status, JSON_CONTENT_TYPE, {"error": str(e)}
+        except Exception as e:
+            status, content_type, data = 500, JSON_CONTENT_TYPE, {"error": str(e)}
+
+        if isinstance(data, str):
+            body = data.encode("utf-8")
+        else:
+            body = format_as_json(data).encode("utf-8")
+
+        response_headers = {"Content-Type": content_type, "Cache-Control": cache_control if status == 200 else NO_CACHE}
+
+        # Immutable responses can be revalidated with their ETag
+        if status == 200 and cache_control == IMMUTABLE_CACHE_CONTROL:
+            etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+            response_headers["ETag"] = etag
+            if etag in headers.get("if-none-match", ""):
+                return 304, response_headers, b""
+
+        response_headers["Content-Length"] = str(len(body))
+        if method == "HEAD":
+            body = b""
+        return status, response_headers, body
+
+    async def handle_connection(self, reader, writer):
+        """Serve the requests of a (possibly keep-alive) connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line or len(request_line) > MAX_LINE_LENGTH:
+                    break
+
+                try:
+                    # Clients should percent-encode, but accept raw UTF-8 targets too
+                    method, target, http_version = request_line.decode("utf-8", "replace").split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b"") or len(line) > MAX_LINE_LENGTH:
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                # Request bodies are not used, but must be consumed to keep the connection usable
+                content_length = int(headers.get("content-length", 0) or 0)
+                if content_length:
+                    await reader.readexactly(content_length)
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" or (http_version == "HTTP/1.1" and connection != "close")
+
+                status, response_headers, body = await self.dispatch(method, target, headers)
+                response_headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+                head = f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                head += "".join(f"{name}: {value}\r\n" for name, value in response_headers.items())
+                writer.write(head.encode("latin-1") + b"\r\n" + body)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+async def start_server(api, host="127.0.0.1", port=8000, socket_path=None):
+    """Start serving the API on a TCP port, or on a Unix socket if socket_path is given, returning the asyncio server."""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # Left behind by a previous run
+        return await asyncio.start_unix_server(api.handle_connection, socket_path)
+    return await asyncio.start_server(api.handle_connection, host, port)
+
+def serve(host="127.0.0.1", port=8000, default_version=None, socket_path=None):
+    """Run the HTTP API until interrupted, sized by the cache settings of the user's config."""
+    cache = load_config()["cache"]
+    api = BibleAPI(default_version, max_connections=cache["connections"], cache_size=cache["lookups"])
+
+    async def run():
+        server = await start_server(api, host, port, socket_path)
+        print(f"rbible HTTP API listening on {f'unix:{socket_path}' if socket_path else f'http://{host}:{port}'}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
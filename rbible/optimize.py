@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Optimized copies of Bible modules: indexed, analyzed and vacuumed, next to the untouched downloads.
+"""
+
+import os
+import time
+import random
+import sqlite3
+
+from rbible.bible_data import get_bible_path, get_optimized_path, read_only_uri
+from rbible.schema import introspect_schema, BibleAdapter
+
+PAGE_SIZES = (1024, 2048, 4096, 8192, 16384, 32768, 65536)
+
+# Lookups timed before and after optimizing
+LATENCY_SAMPLES = 200
+
+def measure_lookup_latency(db_path, samples=LATENCY_SAMPLES):
+    """Time single-verse lookups of random existing verses, in milliseconds per lookup."""
+    conn = sqlite3.connect(read_only_uri(db_path), uri=True)
+    try:
+        adapter = BibleAdapter(conn, introspect_schema(conn))
+        chapters = adapter.verse_counts()
+        rng = random.Random(0)  # The same verses before and after
+        lookups = [
+            (book_id, chapter, rng.randint(1, last))
+            for book_id, chapter, last in (rng.choice(chapters) for _ in range(samples))
+            if book_id is not None
+        ]
+        start = time.perf_counter()
+        for book_id, chapter, verse in lookups:
+            adapter.fetch_verse(book_id, chapter, verse)
+        return (time.perf_counter() - start) * 1000 / max(len(lookups), 1)
+    finally:
+        conn.close()
+
+def build_optimized_copy(bible_path, optimized_path, page_size=None):
+    """Copy a module and give the copy a covering verse index, statistics and compacted pages."""
+    os.makedirs(os.path.dirname(optimized_path), exist_ok=True)
+    temp_path = optimized_path + ".tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    source = sqlite3.connect(read_only_uri(bible_path), uri=True)
+    copy = sqlite3.connect(temp_path)
+    try:
+        source.backup(copy)
+        schema = introspect_schema(copy)
+        if not schema.fts:
+            # Covering: lookups are answered from the index alone, without reading the table
+            copy.execute(
+                f'CREATE INDEX IF NOT EXISTS rbible_verse_lookup ON "{schema.table}" '
+                f'("{schema.book}", "{schema.chapter}", "{schema.verse}", "{schema.text}")'
+            )
+        copy.execute("ANALYZE")
+        copy.commit()
+        if page_size:
+            copy.execute(f"PRAGMA page_size = {int(page_size)}")
+        copy.execute("VACUUM")
+    finally:
+        copy.close()
+        source.close()
+
+    os.chmod(temp_path, 0o444)
+    os.replace(temp_path, optimized_path)
+
+def optimize_version(version, page_size=None, quiet=False):
+    """Build the optimized copy of a version, reporting the lookup latency before and after.
+
+    Returns (before ms, after ms), or None if the version doesn't exist.
+    """
+    bible_path = get_bible_path(version)
+    if not bible_path:
+        print(f"Error: Bible version '{version}' not found.")
+        return None
+
+    before = measure_lookup_latency(bible_path)
+    optimized_path = get_optimized_path(version)
+    build_optimized_copy(bible_path, optimized_path, page_size)
+    after = measure_lookup_latency(optimized_path)
+
+    if not quiet:
+        print(f"Optimized {version}: lookups {before:.3f} ms -> {after:.3f} ms ({optimized_path})")
+    return before, after
+
+def remove_optimized_copy(version):
+    """Remove the optimized copy of a version, returning True if there was one."""
+    optimized_path = get_optimized_path(version)
+    if not os.path.exists(optimized_path):
+        return False
+    os.remove(optimized_path)
+    return True
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+import bisect
+import datetime
+from itertools import accumulate
+
+from rbible.bible_data import pack_verse_id
+from rbible.references import coalesce_ranges, format_verse_range
+
+# Books in roughly the order their events happened (book level, not interleaved by chapter)
+CHRONOLOGICAL_ORDER = [
+    1, 18, 2, 3, 4, 5, 6, 7, 8, 9, 10, 13, 19, 11, 20, 21, 22, 12, 14,
+    32, 30, 28, 23, 33, 34, 36, 35, 24, 25, 29, 31, 26, 27,
+    15, 37, 38, 17, 16, 39,
+    40, 41, 42, 43, 44, 59, 48, 52, 53, 46, 47, 45, 49, 50, 51, 57,
+    54, 56, 60, 55, 61, 58, 65, 62, 63, 64, 66
+]
+
+# Each plan is a list of tracks, every track is spread over all the days of the plan
+PLAN_TYPES = {
+    "bible": [list(range(1, 67))],
+    "ot": [list(range(1, 40))],
+    "nt": [list(range(40, 67))],
+    "psalms-proverbs": [[19], [20]],
+    "chronological": [CHRONOLOGICAL_ORDER],
+}
+
+def partition(weights, days):
+    """Split a sequence of weights into `days` contiguous, non-empty segments of about equal weight.
+
+    Returns the index each segment starts at.
+    """
+    if len(weights) < days:
+        raise ValueError(f"Cannot split {len(weights)} readings into {days} days")
+
+    totals = list(accumulate(weights))
+    starts = [0]
+    for day in range(1, days):
+        target = totals[-1] * day / days
+        # Cut before or after the unit that crosses the target, whichever is closer
+        i = bisect.bisect_left(totals, target)
+        before = totals[i - 1] if i else 0
+        cut = i + 1 if totals[i] - target < target - before else i
+        # Every day gets at least one unit
+        cut = min(max(cut, starts[-1] + 1), len(weights) - (days - day))
+        starts.append(cut)
+    return starts
+
+def _track_units(books, days, versification, word_counts=None):
+    """Get the (start id, end id, weight) reading units of a track: chapters, or verses for short tracks."""
+    chapters = [
+        (book_id, chapter, verse_count)
+        for book_id in books
+        for chapter, verse_count in enumerate(versification.get(book_id, []), 1)
+        if verse_count
+    ]
+
+    def chapter_weight(book_id, chapter, verse_count):
+        counts = (word_counts or {}).get(book_id, [])
+        return counts[chapter - 1] if chapter <= len(counts) else verse_count
+
+    # Chapters are the natural unit of a reading, unless there are fewer chapters than days
+    if len(chapters) >= days:
+        return [
+            (pack_verse_id(book_id, chapter, 1), pack_verse_id(book_id, chapter, verse_count), chapter_weight(book_id, chapter, verse_count))
+            for book_id, chapter, verse_count in chapters
+        ]
+
+    units = []
+    for book_id, chapter, verse_count in chapters:
+        verse_weight = chapter_weight(book_id, chapter, verse_count) / verse_count
+        units.extend(
+            (pack_verse_id(book_id, chapter, verse), pack_verse_id(book_id, chapter, verse), verse_weight)
+            for verse in range(1, verse_count + 1)
+        )
+    return units
+
+def generate_plan(plan_type, days, versification, word_counts=None):
+    """Generate the daily readings of a plan, balancing verses (or words, given word counts).
+
+    Returns a list with, for every day, its list of [start id, end id] ranges.
+    """
+    if plan_type not in PLAN_TYPES:
+        raise ValueError(f"Unknown plan '{plan_type}', use one of: {', '.join(PLAN_TYPES)}")
+    if days < 1:
+        raise ValueError("A plan needs at least one day")
+
+    readings = [[] for _ in range(days)]
+    for books in PLAN_TYPES[plan_type]:
+        units = _track_units(books, days, versification, word_counts)
+        if not units:
+            raise ValueError(f"This version has none of the books of the '{plan_type}' plan")
+        starts = partition([unit[2] for unit in units], days) + [len(units)]
+        for day in range(days):
+            readings[day].extend(unit[:2] for unit in units[starts[day]:starts[day + 1]])
+
+    # Consecutive chapters read the same day become one range
+    return [[list(verse_range) for verse_range in coalesce_ranges(day_ranges, versification)] for day_ranges in readings]
+
+def format_day(day_ranges, versification):
+    """Format the ranges of a day as references, e.g. "Génesis 1-3; Mateo 1:1-17"."""
+    return "; ".join(format_verse_range(start, end, versification) for start, end in day_ranges)
+
+def get_plan_day(plan, date=None):
+    """Get the day of a plan (1-based) for a date, today by default."""
+    date = date or datetime.date.today()
+    start = datetime.date.fromisoformat(plan["start"])
+    return (date - start).days + 1
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from rbible.bible_data import get_bible_path, get_read_path, read_only_uri
+
+class ConnectionPool:
+    """Open, read-only Bible connections shared by the threads of a long-running process."""
+
+    def __init__(self, max_connections_per_version=4):
+        self.max_connections_per_version = max_connections_per_version
+        self._idle = {}
+        self._open_count = {}
+        self._lock = threading.Lock()
+
+    def _open(self, version):
+        bible_path = get_read_path(version, get_bible_path(version))
+        if not bible_path:
+            raise LookupError(f"Bible version '{version}' not found")
+
+        conn = sqlite3.connect(read_only_uri(bible_path), uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def acquire(self, version):
+        """Get a connection for a version, opening one if none is idle and the limit allows."""
+        with self._lock:
+            idle = self._idle.setdefault(version, queue.LifoQueue())
+            can_open = self._open_count.get(version, 0) < self.max_connections_per_version
+            if idle.empty() and can_open:
+                self._open_count[version] = self._open_count.get(version, 0) + 1
+            else:
+                can_open = False
+
+        if can_open:
+            try:
+                return self._open(version)
+            except Exception:
+                with self._lock:
+                    self._open_count[version] -= 1
+                raise
+
+        # Wait for another thread to release one
+        return idle.get()
+
+    def release(self, version, conn):
+        """Return a connection to the pool."""
+        self._idle[version].put(conn)
+
+    @contextmanager
+    def connection(self, version):
+        """Context manager that acquires and releases a connection."""
+        conn = self.acquire(version)
+        try:
+            yield conn
+        finally:
+            self.release(version, conn)
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            for version, idle in self._idle.items():
+                while not idle.empty():
+                    idle.get_nowait().close()
+                    self._open_count[version] -= 1
@@ -3,9 +3,10 @@
 rbible - Command-line Bible verse lookup tool
 """
 
+import os
 import sys
+import json
 import argparse
-import pyperclip
 
 # Fix imports to use relative imports within the package
 from rbible.bible_data import (
@@ -13,16 +14,804 @@ from rbible.bible_data import (
     list_available_online_versions, download_bible
 )
 from rbible.verse_operations import (
-    parse_reference, get_verse, search_bible, get_parallel_verses,
+    parse_reference, split_reference, get_verse, get_verses_in_ranges, search_bible, get_parallel_verses,
     complete_reference
 )
 from rbible.user_data import (
-    save_to_history, show_history, save_to_favorites,
-    show_favorites, remove_favorite
+    save_to_history, show_history, load_history, save_to_favorites,
+    show_favorites, load_favorites, remove_favorite
+)
+from rbible import clipboard
+from rbible.formatters import (
+    format_as_markdown, format_parallel_verses, format_as_json, write_passages, wrap_verses, FORMATTERS
+)
+from rbible.catalog import get_versification, check_reference, clamp_verse_range
+from rbible.config import load_config
+from rbible.references import (
+    is_reference_expression, parse_reference_expression, group_verses_by_range, format_verse_group
 )
-from rbible.formatters import format_as_markdown, format_parallel_verses
 
-def main():
+def default_version(available_versions):
+    """Get the configured default version if it is installed, otherwise the first available one (None without any)."""
+    configured = load_config()["version"]
+    if configured and configured in available_versions:
+        return configured
+    return (sorted(available_versions) or [None])[0]
+
+def http_command(argv):
+    """rbible http: serve lookups as a local HTTP/JSON API."""
+    daemon = load_config()['daemon']
+    parser = argparse.ArgumentParser(prog='rbible http', description='Serve Bible lookups as a local HTTP/JSON API')
+    parser.add_argument('--host', default=daemon['host'], help=f"Address to listen on (default: {daemon['host']})")
+    parser.add_argument('--port', type=int, default=daemon['port'], help=f"Port to listen on (default: {daemon['port']})")
+    parser.add_argument('--socket', default=daemon['socket'], help='Unix socket to listen on instead of a port')
+    parser.add_argument('-b', '--bible', help='Default Bible version')
+    args = parser.parse_args(argv)
+    
+    from rbible.http_server import serve
+    serve(args.host, args.port, args.bible or load_config()['version'], args.socket)
+    return 0
+
+def concordance_command(argv):
+    """rbible concordance: count and locate the occurrences of words."""
+    parser = argparse.ArgumentParser(prog='rbible concordance', description='Count and locate the occurrences of words in a Bible version')
+    parser.add_argument('query', nargs='+', help='Word(s) to look up (a trailing * matches a prefix), or "build VERSION|all" to (re)build indexes')
+    parser.add_argument('-b', '--bible', help='Bible version to use')
+    parser.add_argument('--by-book', action='store_true', help='Show the occurrences per book')
+    parser.add_argument('--limit', type=int, default=20, help='Number of references to show (0 for all)')
+    parser.add_argument('-j', '--json', action='store_true', help='Output machine-readable JSON')
+    args = parser.parse_args(argv)
+    
+    from rbible.concordance import build_concordance, concordance
+    
+    available_versions = get_available_versions()
+    if not available_versions:
+        print("No Bible versions found. Please add Bible SQLite files to the 'bibles' directory.")
+        return 1
+    
+    if args.query[0] == 'build':
+        targets = args.query[1:] or [args.bible or default_version(available_versions)]
+        if targets == ['all']:
+            targets = sorted(available_versions)
+        return 0 if all([build_concordance(version) for version in targets]) else 1
+    
+    version = args.bible or default_version(available_versions)
+    if version not in available_versions:
+        print(f"Error: Bible version '{version}' not found.")
+        return 1
+    
+    result = concordance(version, ' '.join(args.query), args.by_book, args.limit, quiet=args.json)
+    if result is None:
+        return 1
+    
+    if args.json:
+        print(format_as_json(result))
+        return 0
+    
+    print(f"'{result['query']}' ({version}): {result['occurrences']} occurrences in {result['verses']} verses")
+    for testament, count in result['by_testament'].items():
+        print(f"  {testament}: {count}")
+    
+    if args.by_book and result['by_book']:
+        print("\nBy book:")
+        for book, count in result['by_book'].items():
+            print(f"  {book}: {count}")
+    
+    if result['references']:
+        print("\nReferences:")
+        for reference in result['references']:
+            print(f"  {reference}")
+        if result['verses'] > len(result['references']):
+            print(f"  ... and {result['verses'] - len(result['references'])} more (use --limit 0 to show all)")
+    return 0
+
+def strongs_command(argv):
+    """rbible strongs: list the occurrences of a Strong's number in tagged versions."""
+    parser = argparse.ArgumentParser(prog='rbible strongs', description="List the occurrences of a Strong's number (e.g. H2617 or G26) in tagged versions")
+    parser.add_argument('number', help="Strong's number, H for Hebrew and G for Greek (a bare number matches both)")
+    parser.add_argument('-b', '--bible', help='Bible version to use (default: all tagged versions)')
+    parser.add_argument('--limit', type=int, default=20, help='Number of verses to show per version (0 for all)')
+    parser.add_argument('-j', '--json', action='store_true', help='Output machine-readable JSON')
+    args = parser.parse_args(argv)
+    
+    from rbible.strongs import normalize_strongs, strongs
+    
+    try:
+        number = normalize_strongs(args.number)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    
+    available_versions = get_available_versions()
+    if args.bible:
+        if args.bible not in available_versions:
+            print(f"Error: Bible version '{args.bible}' not found.")
+            return 1
+        versions = [args.bible]
+    else:
+        versions = sorted(available_versions)
+    
+    results = [result for result in (strongs(version, number, args.limit, quiet=args.json) for version in versions) if result]
+    
+    if args.json:
+        print(format_as_json(results))
+        return 0
+    
+    if not results:
+        print("No versions with Strong's numbers found." if not args.bible else f"{args.bible} has no Strong's numbers.")
+        return 1
+    
+    for result in results:
+        print(f"\n{number} ({result['version']}): {result['occurrences']} occurrences in {result['verses']} verses")
+        if result['renderings']:
+            print("Translated as: " + ", ".join(f"{word} ({count})" for word, count in result['renderings'].items()))
+        for verse in result['results']:
+            print(f"  {verse['reference']} - {verse['text']}")
+        if result['verses'] > len(result['results']):
+            print(f"  ... and {result['verses'] - len(result['results'])} more (use --limit 0 to show all)")
+    return 0
+
+def xref_command(argv):
+    """rbible xref: list the verses related to some references through cross-references."""
+    parser = argparse.ArgumentParser(prog='rbible xref', description='List verses related through cross-references, or import a cross-reference dataset')
+    parser.add_argument('reference', nargs='+', help='Bible verse reference(s), or "import FILE" to import a MyBible .crossreferences module or an OpenBible.info TSV')
+    parser.add_argument('--depth', type=int, default=1, help='Number of cross-reference steps to follow (default: 1)')
+    parser.add_argument('--limit', type=int, default=20, help='Number of related verses to show (0 for all)')
+    parser.add_argument('-t', '--text', action='store_true', help='Show the text of the related verses')
+    parser.add_argument('-b', '--bible', help='Bible version to use for --text')
+    parser.add_argument('-j', '--json', action='store_true', help='Output machine-readable JSON')
+    args = parser.parse_args(argv)
+    
+    import sqlite3
+    from rbible.bible_data import get_book_id, pack_verse_id, unpack_verse_id, BOOK_BY_ID
+    from rbible.references import format_verse_range
+    from rbible import xref
+    
+    if args.reference[0] == 'import':
+        if len(args.reference) != 2 or not os.path.exists(args.reference[1]):
+            print("Error: Use 'rbible xref import FILE' with an existing file.")
+            return 1
+        print(f"Importing cross-references from {args.reference[1]}...")
+        edge_count = xref.import_crossreferences(args.reference[1])
+        print(f"Imported {edge_count} cross-references.")
+        return 0 if edge_count else 1
+    
+    if not os.path.exists(xref.XREF_FILE):
+        print("No cross-references found. Import a dataset first with 'rbible xref import FILE'.")
+        return 1
+    
+    ranges = []
+    for reference in args.reference:
+        try:
+            book, chapter, verse = split_reference(reference)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        book_id = get_book_id(book)
+        if not book_id:
+            print(f"Error: Unknown book '{book}'.")
+            return 1
+        start_verse, end_verse = verse if isinstance(verse, tuple) else (verse, verse)
+        ranges.append((pack_verse_id(book_id, chapter, start_verse), pack_verse_id(book_id, chapter, end_verse)))
+    
+    conn = sqlite3.connect(xref.XREF_FILE)
+    try:
+        related = xref.related_verses(conn, ranges, args.depth, args.limit)
+    finally:
+        conn.close()
+    
+    # Keep the packed ids aside, the output only shows references
+    positions = [(entry.pop('start'), entry.pop('end')) for entry in related]
+    related = [{'reference': format_verse_range(start, end), **entry} for (start, end), entry in zip(positions, related)]
+    
+    if args.text and related:
+        version = args.bible or default_version(get_available_versions())
+        bible_conn = load_bible_version(version) if version else None
+        if not bible_conn:
+            print(f"Error: Bible version '{version}' not found.")
+            return 1
+        for entry, (start, end) in zip(related, positions):
+            book_id, chapter, start_verse = unpack_verse_id(start)
+            end_book_id, end_chapter, end_verse = unpack_verse_id(end)
+            # Ranges across chapters are shown from their first chapter
+            if (end_book_id, end_chapter) != (book_id, chapter):
+                end_verse = 999
+            try:
+                entry['text'] = get_verse(bible_conn, BOOK_BY_ID[book_id], chapter, (start_verse, end_verse) if end_verse != start_verse else start_verse)
+            except Exception as e:
+                entry['error'] = str(e)
+        bible_conn.close()
+    
+    if args.json:
+        print(format_as_json(related))
+        return 0
+    
+    if not related:
+        print("No cross-references found.")
+        return 0
+    
+    for i, entry in enumerate(related, 1):
+        print(f"{i}. {entry['reference']} (score {entry['score']:g}{', depth ' + str(entry['depth']) if entry['depth'] > 1 else ''})")
+        if 'text' in entry:
+            print(f"   {entry['text']}".replace('\n', '\n   '))
+        elif 'error' in entry:
+            print(f"   {entry['error']}")
+    return 0
+
+def plan_command(argv):
+    """rbible plan: create reading plans and show each day's reading."""
+    import datetime
+    from rbible import plans
+    from rbible.catalog import get_word_counts
+    from rbible.user_data import load_plans, update_plans
+    
+    def parse_date(value):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid date '{value}', use YYYY-MM-DD")
+    
+    parser = argparse.ArgumentParser(prog='rbible plan', description='Follow a reading plan')
+    subparsers = parser.add_subparsers(dest='action')
+    
+    new_parser = subparsers.add_parser('new', help='Create a reading plan and make it the active one')
+    new_parser.add_argument('type', choices=list(plans.PLAN_TYPES), help='What the plan reads')
+    new_parser.add_argument('--days', type=int, default=365, help='Length of the plan in days (default: 365)')
+    new_parser.add_argument('--by', choices=['verses', 'words'], default='verses', help='Balance days by verse or word count')
+    new_parser.add_argument('--start', type=parse_date, default=datetime.date.today(), help='First day of the plan (default: today)')
+    new_parser.add_argument('--name', help='Name of the plan (default: its type)')
+    new_parser.add_argument('-b', '--bible', help='Bible version to read')
+    
+    today_parser = subparsers.add_parser('today', help="Show today's reading (the default)")
+    today_parser.add_argument('--day', type=int, help='Show this day of the plan instead')
+    today_parser.add_argument('--date', type=parse_date, help='Show the reading of this date instead')
+    today_parser.add_argument('--refs', action='store_true', help='Show only the references')
+    
+    done_parser = subparsers.add_parser('done', help="Mark a day as read (default: today's)")
+    done_parser.add_argument('day', type=int, nargs='?', help='Day of the plan')
+    
+    subparsers.add_parser('show', help='List the readings of every day')
+    subparsers.add_parser('status', help='Show the progress of every plan')
+    use_parser = subparsers.add_parser('use', help='Make a plan the active one')
+    use_parser.add_argument('name')
+    delete_parser = subparsers.add_parser('delete', help='Delete a plan')
+    delete_parser.add_argument('name')
+    
+    for subparser in (today_parser, done_parser, subparsers.choices['show'], subparsers.choices['status']):
+        subparser.add_argument('-P', '--plan', help='Plan to use (default: the active one)')
+        subparser.add_argument('-j', '--json', action='store_true', help='Output machine-readable JSON')
+    
+    # "rbible plan" and "rbible plan --refs" show today's reading
+    if not argv or (argv[0].startswith('-') and argv[0] not in ('-h', '--help')):
+        argv = ['today'] + argv
+    args = parser.parse_args(argv)
+    data = load_plans()
+    
+    if args.action == 'new':
+        version = args.bible or default_version(get_available_versions())
+        versification = get_versification(version) if version else None
+        if not versification:
+            print(f"Error: Bible version '{version}' not found." if version else "No Bible versions found.")
+            return 1
+        
+        try:
+            word_counts = get_word_counts(version) if args.by == 'words' else None
+            segments = plans.generate_plan(args.type, args.days, versification, word_counts)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        
+        name = args.name or args.type
+        def add(data):
+            data["plans"][name] = {
+                "type": args.type,
+                "days": args.days,
+                "by": args.by,
+                "version": version,
+                "start": args.start.isoformat(),
+                "segments": segments,
+                "completed": [],
+            }
+            data["active"] = name
+            return data
+        update_plans(add)
+        print(f"Created plan '{name}': {args.days} days from {args.start.isoformat()}, starting with {plans.format_day(segments[0], versification)}")
+        return 0
+    
+    if args.action in ('use', 'delete'):
+        # Looked up again under the lock, in case another process changed the plans
+        found = []
+        def change(data):
+            if args.name in data["plans"]:
+                found.append(args.name)
+                if args.action == 'use':
+                    data["active"] = args.name
+                else:
+                    del data["plans"][args.name]
+                    if data["active"] == args.name:
+                        data["active"] = next(iter(data["plans"]), None)
+            return data
+        update_plans(change)
+        if not found:
+            print(f"Error: No plan named '{args.name}'.")
+            return 1
+        return 0
+    
+    if args.action == 'status':
+        status = []
+        for name, plan in data["plans"].items():
+            status.append({
+                "name": name,
+                "active": name == data["active"],
+                "type": plan["type"],
+                "version": plan["version"],
+                "day": min(max(plans.get_plan_day(plan), 0), plan["days"]),
+                "days": plan["days"],
+                "completed": len(plan["completed"]),
+            })
+        if args.json:
+            print(format_as_json(status))
+        elif not status:
+            print("No reading plans. Create one with 'rbible plan new bible'.")
+        else:
+            for entry in status:
+                marker = "*" if entry["active"] else " "
+                print(f"{marker} {entry['name']} ({entry['type']}, {entry['version']}): day {entry['day']} of {entry['days']}, {entry['completed']} read")
+        return 0
+    
+    name = args.plan or data["active"]
+    plan = data["plans"].get(name) if name else None
+    if not plan:
+        print(f"Error: No plan named '{name}'." if args.plan else "No active reading plan. Create one with 'rbible plan new bible'.")
+        return 1
+    versification = get_versification(plan["version"]) or {}
+    
+    if args.action == 'show':
+        days = [
+            {"day": day, "references": plans.format_day(segment, versification), "done": day in plan["completed"]}
+            for day, segment in enumerate(plan["segments"], 1)
+        ]
+        if args.json:
+            print(format_as_json(days))
+        else:
+            for entry in days:
+                print(f"{'x' if entry['done'] else ' '} {entry['day']:>3}. {entry['references']}")
+        return 0
+    
+    if args.action == 'done':
+        day = args.day or plans.get_plan_day(plan)
+        if not 1 <= day <= plan["days"]:
+            print(f"Error: Day {day} is not part of the plan (1-{plan['days']}).")
+            return 1
+        completed = []
+        def mark(data):
+            stored = data["plans"].get(name)
+            if stored is not None:
+                if day not in stored["completed"]:
+                    stored["completed"].append(day)
+                    stored["completed"].sort()
+                completed.extend(stored["completed"])
+            return data
+        update_plans(mark)
+        if not completed:
+            print(f"Error: No plan named '{name}'.")
+            return 1
+        print(f"Day {day} of {plan['days']} read ({len(completed)} done).")
+        return 0
+    
+    # Today's reading
+    day = args.day or plans.get_plan_day(plan, args.date)
+    if day < 1:
+        print(f"The plan '{name}' starts on {plan['start']}.")
+        return 1
+    if day > plan["days"]:
+        print(f"The plan '{name}' ended ({len(plan['completed'])} of {plan['days']} days read).")
+        return 1
+    
+    ranges = [tuple(verse_range) for verse_range in plan["segments"][day - 1]]
+    references = plans.format_day(ranges, versification)
+    if args.refs and not args.json:
+        print(f"Day {day} of {plan['days']}: {references}")
+        return 0
+    
+    bible_conn = load_bible_version(plan["version"])
+    if not bible_conn:
+        return 1
+    try:
+        # All of the day's ranges in one fetch per book
+        passages = [format_verse_group(group) for group in group_verses_by_range(sorted(ranges), get_verses_in_ranges(bible_conn, sorted(ranges)))]
+    finally:
+        bible_conn.close()
+    
+    if args.json:
+        print(format_as_json({
+            "plan": name,
+            "day": day,
+            "days": plan["days"],
+            "version": plan["version"],
+            "references": references,
+            "done": day in plan["completed"],
+            "passages": [] if args.refs else [{"reference": reference, "text": text} for reference, text in passages],
+        }))
+        return 0
+    
+    print(f"Day {day} of {plan['days']}: {references}")
+    for reference, text in passages:
+        print(f"\n{reference}({plan['version']})\n{text}")
+    return 0
+
+def votd_command(argv):
+    """rbible votd: show the verse of the day, or pre-render the next days."""
+    import datetime
+    from rbible import votd
+    
+    def parse_date(value):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid date '{value}', use YYYY-MM-DD")
+    
+    parser = argparse.ArgumentParser(prog='rbible votd', description='Show the verse of the day')
+    parser.add_argument('action', nargs='?', choices=['today', 'render'], default='today', help="Show the verse (default) or pre-render the next days into the cache")
+    parser.add_argument('--date', type=parse_date, default=datetime.date.today(), help='Date of the verse, or first day to render (default: today)')
+    parser.add_argument('--days', type=int, default=30, help='Number of days to render (default: 30)')
+    parser.add_argument('--source', choices=votd.SOURCES, help='Pick from curated verses, your favorites or the whole Bible (default: the cached source, or curated)')
+    parser.add_argument('-b', '--bible', help='Bible version to show')
+    parser.add_argument('-p', '--parallel', help='Comma-separated versions to render')
+    parser.add_argument('-m', '--markdown', action='store_true', help='Format output as markdown')
+    parser.add_argument('-j', '--json', action='store_true', help='Output machine-readable JSON')
+    args = parser.parse_args(argv)
+    
+    available_versions = get_available_versions()
+    if not available_versions:
+        print("No Bible versions found. Please add Bible SQLite files to the 'bibles' directory.")
+        return 1
+    
+    if args.action == 'render':
+        versions = [v.strip() for v in args.parallel.split(',')] if args.parallel else [args.bible or default_version(available_versions)]
+        missing = [version for version in versions if version not in available_versions]
+        if missing:
+            print(f"Error: Bible version '{missing[0]}' not found.")
+            return 1
+        cache = votd.render_cache(args.date, args.days, versions, args.source or "curated")
+        print(f"Rendered {len(cache['days'])} days of verses ({cache['source']}) in {', '.join(versions)}.")
+        return 0
+    
+    # Served from the pre-rendered cache when it has the day, computed otherwise
+    version = args.bible or (None if votd.load_votd_cache().get("versions") else default_version(available_versions))
+    if version and version not in available_versions:
+        print(f"Error: Bible version '{version}' not found.")
+        return 1
+    result = votd.get_verse_of_the_day(args.date, version, args.source)
+    if not result:
+        print("No verse of the day. Add favorites with 'rbible -f' or use another --source.")
+        return 1
+    if "error" in result and not args.json:
+        print(f"Error: {result['reference']}({result['version']}): {result['error']}")
+        return 1
+    
+    if args.json:
+        print(format_as_json(result))
+        return 1 if "error" in result else 0
+    if args.markdown:
+        print(format_as_markdown(result["reference"], result["text"], version=result["version"]))
+    else:
+        print(f"{result['reference']}({result['version']})\n{result['text']}")
+    return 0
+
+def optimize_command(argv):
+    """rbible optimize: build indexed, read-only copies of Bible versions."""
+    from rbible.optimize import optimize_version, remove_optimized_copy, PAGE_SIZES
+    
+    parser = argparse.ArgumentParser(prog='rbible optimize', description='Build indexed, read-only copies of Bible versions for faster lookups (the downloaded files are not changed)')
+    parser.add_argument('versions', nargs='+', help='Version(s) to optimize, or "all"')
+    parser.add_argument('--page-size', type=int, choices=PAGE_SIZES, help='SQLite page size of the copy')
+    parser.add_argument('--remove', action='store_true', help='Remove the optimized copies instead')
+    parser.add_argument('-j', '--json', action='store_true', help='Output machine-readable JSON')
+    args = parser.parse_args(argv)
+    
+    available_versions = get_available_versions()
+    versions = sorted(available_versions) if args.versions == ['all'] else args.versions
+    missing = [version for version in versions if version not in available_versions]
+    if missing:
+        print(f"Error: Bible version '{missing[0]}' not found.")
+        return 1
+    
+    if args.remove:
+        for version in versions:
+            print(f"Removed the optimized copy of {version}." if remove_optimized_copy(version) else f"{version} has no optimized copy.")
+        return 0
+    
+    results = []
+    for version in versions:
+        before, after = optimize_version(version, args.page_size, quiet=args.json)
+        results.append({"version": version, "before_ms": round(before, 4), "after_ms": round(after, 4)})
+    if args.json:
+        print(format_as_json(results))
+    return 0
+
+def similar_command(argv):
+    """rbible similar: list the verses whose wording is closest to a verse."""
+    parser = argparse.ArgumentParser(prog='rbible similar', description='List the verses most similar to a verse (TF-IDF over words and character n-grams, needs NumPy)')
+    parser.add_argument('reference', nargs='+', help='Bible verse reference, or "build VERSION|all" to (re)build indexes')
+    parser.add_argument('-b', '--bible', help='Bible version to use')
+    parser.add_argument('--limit', type=int, default=10, help='Number of verses to show (default: 10)')
+    parser.add_argument('-j', '--json', action='store_true', help='Output machine-readable JSON')
+    args = parser.parse_args(argv)
+    
+    from rbible import semantic
+    
+    available_versions = get_available_versions()
+    if not available_versions:
+        print("No Bible versions found. Please add Bible SQLite files to the 'bibles' directory.")
+        return 1
+    
+    try:
+        semantic.require_numpy()
+        if args.reference[0] == 'build':
+            targets = args.reference[1:] or [args.bible or default_version(available_versions)]
+            if targets == ['all']:
+                targets = sorted(available_versions)
+            return 0 if all([semantic.build_semantic_index(version) for version in targets]) else 1
+        
+        version = args.bible or default_version(available_versions)
+        book, chapter, verse = split_reference(' '.join(args.reference))
+        if isinstance(verse, tuple):
+            raise ValueError("Use a single verse, e.g. 'Juan 3:16'")
+        results = semantic.similar_verses(version, book, chapter, verse, args.limit, quiet=args.json)
+    except (RuntimeError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    if results is None:
+        return 1
+    
+    if args.json:
+        print(format_as_json(results))
+        return 0
+    print(f"Verses similar to {' '.join(args.reference)} ({version}):")
+    for result in results:
+        print(f"  {result['reference']} ({result['score']:.2f}) - {result['text']}")
+    return 0
+
+def diff_command(argv):
+    """rbible diff: show the words that changed between two versions, verse by verse."""
+    parser = argparse.ArgumentParser(prog='rbible diff', description='Show word-level differences between two Bible versions')
+    parser.add_argument('reference', nargs='+', help='Verses, chapters or books, e.g. "Rom 8:28", "Juan 3" or "Génesis"')
+    parser.add_argument('-p', '--parallel', required=True, help='The two versions to compare, e.g. RVR1909,RVR1960')
+    parser.add_argument('--summary', action='store_true', help='Only show the similarity of each chapter')
+    parser.add_argument('--changed', action='store_true', help='Only show the verses that changed')
+    parser.add_argument('--jobs', type=int, help='Worker processes for several chapters (default: one per CPU, 1 to disable)')
+    parser.add_argument('-m', '--markdown', action='store_true', help='Format output as markdown')
+    parser.add_argument('-j', '--json', action='store_true', help='Output machine-readable JSON')
+    parser.add_argument('--format', choices=list(FORMATTERS), help='Output format (-m and -j are short for markdown and json)')
+    args = parser.parse_args(argv)
+    
+    from rbible import diff
+    
+    versions = [v.strip() for v in args.parallel.split(',') if v.strip()]
+    if len(versions) != 2:
+        print("Error: Give exactly two versions to compare, e.g. -p RVR1909,RVR1960")
+        return 1
+    available_versions = get_available_versions()
+    for version in versions:
+        if version not in available_versions:
+            print(f"Error: Bible version '{version}' not found.")
+            return 1
+    
+    try:
+        ranges = parse_reference_expression(' '.join(args.reference), get_versification(versions[0]))
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    
+    output_format = args.format or ('json' if args.json else 'markdown' if args.markdown else 'plain')
+    chapter_diffs = diff.diff_chapters(versions[0], versions[1], ranges, args.jobs)
+    
+    if args.summary:
+        summaries = diff.chapter_summaries(chapter_diffs)
+        if output_format == 'json':
+            print(format_as_json(list(summaries)))
+            return 0
+        print(f"{versions[0]} → {versions[1]}")
+        for summary in summaries:
+            missing = f", {summary['missing']} only in one version" if summary['missing'] else ""
+            print(f"  {summary['reference']}: {summary['similarity']:.1%} similar ({summary['changed']} of {summary['verses']} verses changed{missing})")
+        return 0
+    
+    write_passages(output_format, diff.verse_passages(chapter_diffs, versions[0], versions[1], args.changed))
+    return 0
+
+def notes_command(argv):
+    """rbible notes: add, list, export and import personal notes and highlights."""
+    from rbible import annotations
+    from rbible.references import format_verse_range
+    
+    parser = argparse.ArgumentParser(prog='rbible notes', description='Personal notes and highlights, shown when verses are read')
+    subparsers = parser.add_subparsers(dest='action')
+    
+    add_parser = subparsers.add_parser('add', help='Add a note to a verse or range')
+    add_parser.add_argument('reference', help='e.g. "Rom 8:28-30" or "Salmos 23"')
+    add_parser.add_argument('text', nargs='+', help='Text of the note')
+    highlight_parser = subparsers.add_parser('highlight', help='Highlight a verse or range')
+    highlight_parser.add_argument('reference')
+    highlight_parser.add_argument('--color', choices=annotations.HIGHLIGHT_COLORS, default='yellow', help='Highlight color (default: yellow)')
+    list_parser = subparsers.add_parser('list', help='List the notes and highlights (overlapping a reference, if given)')
+    list_parser.add_argument('reference', nargs='?')
+    list_parser.add_argument('-j', '--json', action='store_true', help='Output machine-readable JSON')
+    remove_parser = subparsers.add_parser('remove', help='Remove a note or highlight by id')
+    remove_parser.add_argument('id', type=int)
+    export_parser = subparsers.add_parser('export', help='Export every note and highlight as JSON')
+    export_parser.add_argument('file', nargs='?', help='File to write (default: standard output)')
+    import_parser = subparsers.add_parser('import', help='Import notes and highlights exported with "rbible notes export"')
+    import_parser.add_argument('file')
+    
+    for subparser in (add_parser, highlight_parser, list_parser):
+        subparser.add_argument('-b', '--bible', help='Bible version whose versification is used for whole chapters')
+    
+    # "rbible notes" lists everything
+    args = parser.parse_args(argv or ['list'])
+    
+    versification = None
+    if args.action in ('add', 'highlight', 'list'):
+        version = args.bible or default_version(get_available_versions())
+        versification = get_versification(version) if version else None
+    
+    ranges = None
+    if getattr(args, 'reference', None):
+        try:
+            ranges = parse_reference_expression(args.reference, versification)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+    
+    conn = annotations.connect_annotations()
+    try:
+        if args.action in ('add', 'highlight'):
+            for start, end in ranges:
+                if args.action == 'add':
+                    annotation_id = annotations.add_annotation(conn, start, end, 'note', ' '.join(args.text))
+                else:
+                    annotation_id = annotations.add_annotation(conn, start, end, 'highlight', color=args.color)
+                print(f"Added {'note' if args.action == 'add' else args.color + ' highlight'} {annotation_id}: {format_verse_range(start, end, versification)}")
+            return 0
+        
+        if args.action == 'remove':
+            if not annotations.remove_annotation(conn, args.id):
+                print(f"Error: No note or highlight with id {args.id}.")
+                return 1
+            print(f"Removed {args.id}.")
+            return 0
+        
+        if args.action == 'export':
+            if args.file:
+                with open(args.file, 'w', encoding='utf-8') as f:
+                    count = annotations.export_annotations(conn, f)
+                print(f"Exported {count} notes and highlights to {args.file}.")
+            else:
+                annotations.export_annotations(conn, sys.stdout)
+            return 0
+        
+        if args.action == 'import':
+            try:
+                with open(args.file, 'r', encoding='utf-8') as f:
+                    count = annotations.import_annotations(conn, json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}")
+                return 1
+            print(f"Imported {count} notes and highlights.")
+            return 0
+        
+        found = annotations.get_annotations(conn, ranges)
+    finally:
+        conn.close()
+    
+    for annotation in found:
+        annotation['reference'] = format_verse_range(annotation['start'], annotation['end'], versification)
+    if args.json:
+        print(format_as_json(found))
+        return 0
+    if not found:
+        print("No notes or highlights found.")
+        return 0
+    for annotation in found:
+        detail = annotation['text'] if annotation['kind'] == 'note' else f"{annotation['color']} highlight"
+        print(f"{annotation['id']}. {annotation['reference']} - {detail}")
+    return 0
+
+def tui_command(argv):
+    """rbible tui: read chapters in a full-screen terminal reader."""
+    config = load_config()
+    parser = argparse.ArgumentParser(prog='rbible tui', description='Read chapters full screen, with parallel panes and search as you type')
+    parser.add_argument('reference', nargs='*', help='Chapter or verse to open (default: Génesis 1)')
+    parser.add_argument('-b', '--bible', help='Bible version to use')
+    parser.add_argument('-p', '--parallel', nargs='?', const='', help='Versions to show side by side (without a list, the configured ones)')
+    parser.add_argument('--no-history', action='store_true', help="Don't record the chapters read in history")
+    args = parser.parse_args(argv)
+    
+    from rbible import tui
+    if tui.curses is None:
+        print("Error: The reader needs curses (on Windows: pip install windows-curses).")
+        return 1
+    
+    available_versions = get_available_versions()
+    if not available_versions:
+        print("No Bible versions found. Please add Bible SQLite files to the 'bibles' directory.")
+        return 1
+    
+    if args.parallel is not None:
+        versions = [v.strip() for v in (args.parallel or ','.join(config['parallel'])).split(',') if v.strip()]
+        if not versions:
+            print("Error: List the versions for -p, or set 'parallel' in ~/.rbible/config.toml.")
+            return 1
+    else:
+        versions = [args.bible or default_version(available_versions)]
+    versions = list(dict.fromkeys(versions))
+    missing = [version for version in versions if version not in available_versions]
+    if missing:
+        print(f"Error: Bible version '{missing[0]}' not found.")
+        return 1
+    
+    try:
+        return tui.read(versions, ' '.join(args.reference) or 'Génesis 1', config['history'] and not args.no_history)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+def write_completions(force=False, directory=None):
+    """Generate the shell and editor completion files for the installed versions, unless they are current."""
+    from rbible import completions
+    
+    available_versions = get_available_versions()
+    options = [
+        (action.option_strings, action.help, action.nargs is None, action.choices)
+        for action in build_parser()._actions if action.option_strings
+    ]
+    return completions.generate(
+        available_versions, default_version(available_versions), options, sorted(COMMANDS), directory, force
+    )
+
+def completions_command(argv):
+    """rbible completions: write completion scripts that don't start Python."""
+    from rbible import completions
+    
+    parser = argparse.ArgumentParser(prog='rbible completions', description='Shell and editor completion files with the books and versification built in')
+    subparsers = parser.add_subparsers(dest='action')
+    generate_parser = subparsers.add_parser('generate', help='Write the bash, zsh and fish scripts and the Neovim data (only if versions changed)')
+    generate_parser.add_argument('--dir', help=f'Directory to write to (default: {completions.COMPLETIONS_DIR})')
+    generate_parser.add_argument('--force', action='store_true', help='Write them even if they are current')
+    args = parser.parse_args(argv)
+    
+    if args.action != 'generate':
+        parser.print_help()
+        return 1
+    
+    directory = args.dir or completions.COMPLETIONS_DIR
+    if write_completions(args.force, directory):
+        print(f"Wrote completions to {directory}")
+    else:
+        print(f"Completions in {directory} are up to date.")
+    for shell, name in completions.SCRIPTS.items():
+        print(f"  {shell}: {os.path.join(directory, name)}")
+    return 0
+
+# Subcommands, each parsing its own arguments
+COMMANDS = {
+    'http': http_command,
+    'concordance': concordance_command,
+    'strongs': strongs_command,
+    'xref': xref_command,
+    'plan': plan_command,
+    'votd': votd_command,
+    'optimize': optimize_command,
+    'similar': similar_command,
+    'diff': diff_command,
+    'notes': notes_command,
+    'tui': tui_command,
+    'completions': completions_command,
+}
+
+def build_parser():
+    """Build the parser of the lookup options (subcommands parse their own)."""
     parser = argparse.ArgumentParser(
         description='Command-line Bible verse lookup tool',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -31,9 +820,15 @@ Examples:
   rbible -v "Juan 3:16"                # Look up a verse
   rbible -v "Juan 3:16" -b LBLA        # Use specific version
   rbible -v "Salmos 23:1-6"            # Look up verse range
+  rbible -v "Juan 3:16-18, 20; Rom 8"  # Look up a list of references
   rbible -v "Juan 3:16" -m             # Format as markdown
   rbible -v "Juan 3:16" -p "LBLA,RVR"  # Show in multiple versions
+  rbible -v "Juan 3" -p "LBLA,RVR" --columns  # Side by side, verse by verse
+  rbible -v "Juan 3:16" --json         # Machine-readable output
+  rbible -v "Salmos 23" --format html  # Other output formats (latex, ansi, ...)
+  rbible -v "Juan 3:16" --no-history   # Don't record in history
   rbible -s "amor"                     # Search for text
+  rbible -s "no tengas miedo" --semantic  # Search by similar wording
   rbible -f "Juan 3:16|God's love"     # Add to favorites
   rbible -F                            # Show all favorites
   rbible -F 1                          # Show favorite #1
@@ -42,11 +837,23 @@ Examples:
   rbible -l                            # List available versions
   rbible -B                            # List Bible books
   rbible -d LBLA                       # Download a version
+  rbible http --port 8000              # Serve lookups as an HTTP/JSON API
+  rbible concordance "gracia"          # Count and locate a word
+  rbible strongs H2617                 # Occurrences of a Strong's number
+  rbible xref "Juan 3:16" --depth 2    # Related verses
+  rbible plan new bible --days 365     # Start a yearly reading plan
+  rbible votd                          # Verse of the day
+  rbible optimize all                  # Index versions for faster lookups
+  rbible similar "Juan 3:16"           # Verses with similar wording
+  rbible diff "Rom 8:28" -p RVR1909,RVR1960  # Words changed between versions
+  rbible notes add "Rom 8:28" "Text"   # Personal notes and highlights
+  rbible tui "Juan 3" -p LBLA,RVR      # Full-screen reader
+  rbible completions generate          # Shell completion scripts
 '''
     )
     
     parser.add_argument('-b', '--bible', help='Bible version to use')
-    parser.add_argument('-v', '--verse', action='append', help='Bible verse reference (e.g., "Juan 3:16" or "Juan 3:16-20"). Can be specified multiple times.')
+    parser.add_argument('-v', '--verse', action='append', help='Bible verse reference (e.g., "Juan 3:16", "Juan 3:16-20" or "Juan 3:16-18, 20; Rom 8"). Can be specified multiple times.')
     parser.add_argument('-l', '--list', action='store_true', help='List available Bible versions')
     parser.add_argument('-B', '--books', action='store_true', help='List all Bible books and their short codes')
     parser.add_argument('-d', '--download', help='Download a Bible version (use "all" to download all available versions)', nargs='?', const='all')
@@ -54,16 +861,51 @@ Examples:
     parser.add_argument('-n', '--no-copy', action='store_true', help='Do not copy verse to clipboard')
     parser.add_argument('-m', '--markdown', action='store_true', help='Format output as markdown')
     parser.add_argument('-s', '--search', help='Search for verses containing the specified text')
+    parser.add_argument('--semantic', action='store_true', help='Search by similar wording instead of exact text (needs NumPy)')
     parser.add_argument('-H', '--history', action='store_true', help='Show recently viewed verses')
     parser.add_argument('--history-count', type=int, default=10, help='Number of history items to show')
     parser.add_argument('-f', '--favorite', help='Add a verse to favorites with optional name (format: "reference|name")')
     parser.add_argument('-F', '--favorites', nargs='?', const=True, help='Show favorite verses or get a specific favorite by index')
     parser.add_argument('-r', '--remove-favorite', help='Remove a verse from favorites by index or reference')
     parser.add_argument('-c', '--complete', help='Get completion suggestions for a partial reference')
-    parser.add_argument('-p', '--parallel', help='Show verse in multiple translations (comma-separated versions)')
+    parser.add_argument('-p', '--parallel', nargs='?', const='', help='Show verse in multiple translations (comma-separated versions, or the configured ones)')
+    parser.add_argument('--columns', action='store_true', help='Show parallel versions side by side, verse by verse (a table with -m)')
+    parser.add_argument('-j', '--json', action='store_true', help='Output machine-readable JSON (implies --no-copy)')
+    parser.add_argument('--format', choices=list(FORMATTERS), help='Output format for verses and search results (-m and -j are short for markdown and json)')
+    parser.add_argument('--no-history', action='store_true', help='Do not record looked up verses in history (e.g. for previews)')
+    parser.add_argument('--width', type=int, help='Wrap verse text to this many columns')
+    return parser
+
+def main():
+    # Dispatch subcommands (e.g. "rbible http") before the lookup options
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(COMMANDS[sys.argv[1]](sys.argv[2:]))
     
+    parser = build_parser()
     args = parser.parse_args()
     
+    config = load_config()
+    
+    # --format overrides -m and -j, which are shortcuts for it; without any of them the configured format is used
+    output_format = args.format or ('json' if args.json else 'markdown' if args.markdown else config['format'])
+    # With --json, -m still picks markdown for each passage's "formatted" text
+    markdown_text = output_format == 'markdown' or (output_format == 'json' and args.markdown)
+    args.markdown = output_format == 'markdown'
+    args.json = output_format == 'json'
+    
+    # JSON output is meant for other programs, never touch the clipboard
+    if args.json or not config['copy']:
+        args.no_copy = True
+    if not config['history']:
+        args.no_history = True
+    
+    # -p without a list shows the configured versions
+    if args.parallel == '':
+        args.parallel = ','.join(config['parallel'])
+        if not args.parallel:
+            print("Error: List the versions for -p, or set 'parallel' in ~/.rbible/config.toml.")
+            sys.exit(1)
+    
     # Handle non-verse lookup actions first
     if args.online:
         list_available_online_versions()
@@ -71,6 +913,10 @@ Examples:
     
     if args.download:
         success = download_bible(args.download)
+        # Keep generated completion files in step with the installed versions
+        from rbible.completions import get_data_path
+        if success and os.path.exists(get_data_path()):
+            write_completions()
         sys.exit(0 if success else 1)
     
     if args.books:
@@ -79,7 +925,9 @@ Examples:
     
     if args.list:
         versions = get_available_versions()
-        if versions:
+        if args.json:
+            print(format_as_json(sorted(versions)))
+        elif versions:
             print("Available Bible versions:")
             for version in sorted(versions):
                 print(f"  {version}")
@@ -88,7 +936,10 @@ Examples:
         sys.exit(0)
     
     if args.history:
-        show_history(args.history_count)
+        if args.json:
+            print(format_as_json(load_history()[:args.history_count]))
+        else:
+            show_history(args.history_count)
         sys.exit(0)
     
     # In the favorites section of main()
@@ -96,7 +947,17 @@ Examples:
         # If a specific index is provided
         if args.favorites is not True:  # True is the default value when no argument is provided
             favorite = show_favorites(args.favorites)
-            if favorite:
+            if not favorite:
+                sys.exit(1)
+            
+            if args.json:
+                version = favorite.get('version', 'unknown')
+                if markdown_text:
+                    formatted_text = format_as_markdown(favorite['reference'], favorite['text'], version=version)
+                else:
+                    formatted_text = f"{favorite['reference']}({version})\n{favorite['text']}"
+                print(format_as_json(dict(favorite, formatted=formatted_text)))
+            else:
                 # Get the version
                 version = favorite.get('version', 'unknown')
                 
@@ -117,10 +978,12 @@ Examples:
                         clipboard_text = f"{favorite['reference']}({version})\n{favorite['text']}"
                     
                     try:
-                        pyperclip.copy(clipboard_text)
+                        clipboard.copy(clipboard_text)
                         print(f"\nVerse copied to clipboard!")
                     except Exception as e:
                         print(f"\nFailed to copy to clipboard: {e}")
+        elif args.json:
+            print(format_as_json(load_favorites()))
         else:
             # Just show all favorites
             show_favorites()
@@ -131,30 +994,61 @@ Examples:
         sys.exit(0)
     
     if args.complete:
-        suggestions = complete_reference(args.complete)
-        for suggestion in suggestions:
-            print(suggestion)
+        # Use the versification of the selected (or first available) version for exact suggestions
+        complete_version = args.bible or default_version(get_available_versions())
+        versification = get_versification(complete_version) if complete_version else None
+        suggestions = complete_reference(args.complete, versification)
+        if args.json:
+            print(format_as_json(suggestions))
+        else:
+            for suggestion in suggestions:
+                print(suggestion)
         sys.exit(0)
     
-    # Select the first available version if none specified
-    version = args.bible
+    # Select the configured version if it is installed, otherwise the first available one (as -c, plan and completions do)
+    version = args.bible or default_version(get_available_versions())
     if not version:
-        available_versions = get_available_versions()
-        if not available_versions:
-            print("No Bible versions found. Please add Bible SQLite files to the 'bibles' directory or download them with -d option.")
-            sys.exit(1)
-        version = available_versions[0]
+        print("No Bible versions found. Please add Bible SQLite files to the 'bibles' directory or download them with -d option.")
+        sys.exit(1)
     
     bible_conn = load_bible_version(version)
+    versification = get_versification(version, bible_conn)
     
     # Handle search
     if args.search:
-        results = search_bible(bible_conn, args.search)
-        if results:
+        if args.semantic:
+            from rbible.semantic import semantic_search
+            try:
+                results = semantic_search(version, args.search, quiet=args.json)
+            except RuntimeError as e:
+                print(f"Error: {e}")
+                bible_conn.close()
+                sys.exit(1)
+            for result in results or []:
+                result["highlighted"] = result["text"]
+            results = results or []
+        elif not args.bible and config['search_versions']:
+            # Search every configured version, labelling each result with its version
+            results = []
+            for search_version in config['search_versions']:
+                search_conn = load_bible_version(search_version)
+                try:
+                    results.extend(dict(result, version=search_version) for result in search_bible(search_conn, args.search))
+                finally:
+                    search_conn.close()
+        else:
+            results = search_bible(bible_conn, args.search)
+        if args.json:
+            print(format_as_json([{"reference": r["reference"], "text": r["text"], **({"version": r["version"]} if "version" in r else {})} for r in results]))
+        elif results and output_format != 'plain':
+            write_passages(output_format, ({"reference": r["reference"], "version": r.get("version", version), "text": r["text"]} for r in results))
+        elif results:
             print(f"Found {len(results)} verses containing '{args.search}':")
             for i, result in enumerate(results):
-                print(f"\n{i+1}. {result['reference']}")
+                print(f"\n{i+1}. {result['reference']}" + (f" ({result['version']})" if "version" in result else ""))
                 print(result['highlighted'])
+        else:
+            print(f"No verses found containing '{args.search}'.")
         bible_conn.close()
         sys.exit(0)
     
@@ -167,6 +1061,9 @@ Examples:
         
         try:
             book, chapter, verse = parse_reference(reference)
+            if versification:
+                check_reference(versification, book, chapter, verse)
+                verse = clamp_verse_range(versification, book, chapter, verse)
             verse_text = get_verse(bible_conn, book, chapter, verse)
             
             # Format the reference string
@@ -210,15 +1107,56 @@ Examples:
                 print("No valid versions specified.")
                 sys.exit(1)
         
+        if args.columns and not args.json:
+            import io
+            from rbible.verse_operations import iter_parallel_rows
+            from rbible.formatters import write_parallel_columns, write_parallel_table
+            
+            try:
+                ranges = parse_reference_expression(verse_ref, versification)
+            except ValueError as e:
+                print(f"Error: {e}")
+                bible_conn.close()
+                sys.exit(1)
+            
+            # One row per verse, merged from a stream of each version, written as it is read
+            out = sys.stdout if args.no_copy else io.StringIO()
+            parallel_conns = [load_bible_version(v) for v in versions]
+            try:
+                rows = iter_parallel_rows(parallel_conns, ranges)
+                if args.markdown:
+                    write_parallel_table(rows, versions, out)
+                else:
+                    write_parallel_columns(rows, versions, out)
+            finally:
+                for conn in parallel_conns:
+                    conn.close()
+            
+            if not args.no_copy:
+                print(out.getvalue(), end='')
+                try:
+                    clipboard.copy(out.getvalue())
+                    print("\nParallel verses copied to clipboard!")
+                except Exception as e:
+                    print(f"\nFailed to copy to clipboard: {e}")
+            
+            bible_conn.close()
+            sys.exit(0)
+        
         parallel_results = get_parallel_verses(verse_ref, versions)
         formatted_output = format_parallel_verses(parallel_results, args.markdown)
         
-        print(formatted_output)
+        if args.json:
+            print(format_as_json(parallel_results))
+        elif output_format not in ('plain', 'markdown'):
+            write_passages(output_format, parallel_results)
+        else:
+            print(formatted_output)
         
         # Copy to clipboard if not disabled
         if not args.no_copy:
             try:
-                pyperclip.copy(formatted_output)
+                clipboard.copy(formatted_output)
                 print("\nParallel verses copied to clipboard!")
             except Exception as e:
                 print(f"\nFailed to copy to clipboard: {e}")
@@ -226,59 +1164,154 @@ Examples:
         bible_conn.close()
         sys.exit(0)
     
+    def find_annotations(ranges):
+        """Get the notes and highlights of the user (if any) overlapping the verses read."""
+        from rbible import annotations
+        if args.json or not os.path.exists(annotations.ANNOTATIONS_FILE):
+            return []
+        conn = annotations.connect_annotations()
+        try:
+            return annotations.get_annotations(conn, ranges)
+        finally:
+            conn.close()
+    
+    def annotate_groups(ranges, verse_groups):
+        """Mark the notes and highlights of the user (if any) in the verses read."""
+        from rbible import annotations
+        found = find_annotations(ranges)
+        if not found:
+            return verse_groups
+        return [annotations.annotate_verses(group, found) for group in verse_groups]
+    
     # Process multiple verses if provided (only if not in parallel mode)
-    all_verses = []
-    for verse_ref in args.verse:
-        book, chapter, verse = parse_reference(verse_ref)
-        verse_text = get_verse(bible_conn, book, chapter, verse)
-        
-        # Format the reference string
-        if isinstance(verse, tuple):
-            start_verse, end_verse = verse
-            verse_str = f"{start_verse}-{end_verse}"
-        else:
-            verse_str = str(verse)
-        
-        ref_str = f"{book} {chapter}:{verse_str}"
-        
-        # Format according to preference
-        if args.markdown:
-            formatted_text = format_as_markdown(ref_str, verse_text, version=version)
-        else:
-            formatted_text = f"\n{ref_str}({version})\n{verse_text}"
+    def lookup_passages():
+        """Look up every -v reference, yielding one passage per verse or merged range."""
+        for verse_ref in args.verse:
+            # Lists like "Juan 3:16-18, 20; Rom 8" become one entry per merged range
+            if is_reference_expression(verse_ref):
+                try:
+                    ranges = parse_reference_expression(verse_ref, versification)
+                    verse_groups = group_verses_by_range(ranges, get_verses_in_ranges(bible_conn, ranges))
+                    if not verse_groups:
+                        raise ValueError(f"Verses not found: {verse_ref}")
+                    verse_groups = annotate_groups(ranges, verse_groups)
+                except Exception as e:
+                    if args.json:
+                        yield {"reference": verse_ref, "version": version, "error": str(e), "query": verse_ref}
+                        continue
+                    print(f"Error: {e}")
+                    bible_conn.close()
+                    sys.exit(1)
+                lookups = (format_verse_group(group) for group in verse_groups)
+            else:
+                try:
+                    book, chapter, verse = split_reference(verse_ref)
+                    
+                    # Reject references that don't exist in this version before querying
+                    if versification:
+                        check_reference(versification, book, chapter, verse)
+                        verse = clamp_verse_range(versification, book, chapter, verse)
+                    
+                    verse_text = get_verse(bible_conn, book, chapter, verse)
+                except Exception as e:
+                    # In JSON mode report the failed reference and keep going with the others
+                    if args.json:
+                        yield {"reference": verse_ref, "version": version, "error": str(e), "query": verse_ref}
+                        continue
+                    print(f"Error: {e}")
+                    bible_conn.close()
+                    sys.exit(1)
+                
+                # Format the reference string
+                if isinstance(verse, tuple):
+                    start_verse, end_verse = verse
+                    verse_str = f"{start_verse}-{end_verse}"
+                else:
+                    verse_str = str(verse)
+                
+                lookups = [(f"{book} {chapter}:{verse_str}", verse_text)]
+            
+            if args.width:
+                lookups = [(ref_str, wrap_verses(verse_text, args.width)) for ref_str, verse_text in lookups]
+            
+            for ref_str, verse_text in lookups:
+                # Format according to preference
+                if markdown_text:
+                    formatted_text = format_as_markdown(ref_str, verse_text, version=version)
+                else:
+                    formatted_text = f"\n{ref_str}({version})\n{verse_text}"
+                
+                # Save to history
+                if not args.no_history:
+                    save_to_history(ref_str, verse_text, version)
+                
+                yield {
+                    "reference": ref_str,
+                    "version": version,
+                    "text": verse_text,
+                    "formatted": formatted_text,
+                    # The -v argument it came from, since one can yield several passages
+                    "query": verse_ref
+                }
+    
+    # Passages are written as they are looked up; only the clipboard needs to keep them
+    copied = []
+    def keep_for_clipboard(passages):
+        for passage in passages:
+            copied.append(passage)
+            yield passage
+    
+    def read_cached_chapter():
+        """Write a single whole chapter (e.g. "Juan 3") from the render cache, returning its passage or None."""
+        from rbible import render_cache
+        from rbible.bible_data import pack_verse_id
+        # JSON passages also carry their formatted text and query, so they are looked up live
+        chapter_id = render_cache.whole_chapter(args.verse[0]) if len(args.verse) == 1 and not args.json else None
+        if not chapter_id:
+            return None
+        # Chapters with notes or highlights are rendered live
+        book_id, chapter = chapter_id
+        if find_annotations([(pack_verse_id(book_id, chapter, 1), pack_verse_id(book_id, chapter, 999))]):
+            return None
+        entry = render_cache.get_chapter(bible_conn, version, book_id, chapter, output_format, args.width)
+        if entry is None:
+            return None
         
-        all_verses.append({
-            "reference": ref_str,
-            "text": verse_text,
-            "formatted": formatted_text
-        })
+        sys.stdout.write(entry["rendered"])
+        # Page ahead: the previous and next chapters are rendered in the background
+        render_cache.warm_adjacent_in_background(version, book_id, chapter, output_format, args.width, versification)
         
-        # Save to history
-        save_to_history(ref_str, verse_text, version)
+        if not args.no_history:
+            save_to_history(entry["reference"], entry["text"], version)
+        formatted = format_as_markdown(entry["reference"], entry["text"], version=version) if markdown_text else f"\n{entry['reference']}({version})\n{entry['text']}"
+        return {"reference": entry["reference"], "version": version, "text": entry["text"], "formatted": formatted}
     
-        # Display all verses
-        for verse_data in all_verses:
-            print(verse_data["formatted"])
-        
-        # Copy to clipboard if not disabled
-        if not args.no_copy:
-            if len(all_verses) == 1:
-                # Single verse - copy reference and text
-                verse_data = all_verses[0]
-                if args.markdown:
-                    # Use the formatted text directly - it already has the > symbols
-                    clipboard_text = verse_data["formatted"]
-                else:
-                    clipboard_text = f"{verse_data['reference']}({version})\n{verse_data['text']}"
+    cached_passage = read_cached_chapter()
+    if cached_passage:
+        copied.append(cached_passage)
+    else:
+        passages = lookup_passages()
+        write_passages(output_format, passages if args.no_copy else keep_for_clipboard(passages))
+    
+    # Copy to clipboard if not disabled
+    if not args.no_copy and copied:
+        if len(copied) == 1:
+            # Single verse - copy reference and text
+            verse_data = copied[0]
+            if args.markdown:
+                # Use the formatted text directly - it already has the > symbols
+                clipboard_text = verse_data["formatted"]
             else:
-                # Multiple verses - copy all formatted output
-                clipboard_text = "\n\n".join([v["formatted"] for v in all_verses])
-            
-            try:
-                pyperclip.copy(clipboard_text)
-                print("\nVerse(s) copied to clipboard!")
-            except Exception as e:
-                print(f"\nFailed to copy to clipboard: {e}")
+                clipboard_text = f"{verse_data['reference']}({version})\n{verse_data['text']}"
+        else:
+            # Multiple verses - copy all formatted output
+            clipboard_text = "\n\n".join([v["formatted"] for v in copied])
+        
+        try:
+            clipboard.copy(clipboard_text)
+            print("\nVerse(s) copied to clipboard!")
+        except Exception as e:
+            print(f"\nFailed to copy to clipboard: {e}")
     
     bible_conn.close()
 
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+import re
+import bisect
+
+from rbible.bible_data import get_book_id, pack_verse_id, unpack_verse_id, BOOK_BY_ID
+from rbible.catalog import get_chapter_count, get_verse_count, check_reference
+
+# Stand-in for the last chapter or verse when the versification is unknown
+LAST = 999
+
+# A part of an expression starting with a book name, e.g. "1 Juan 4:7-12" or "Rom"
+BOOK_PART = re.compile(r'^(?P<book>(?:[1-3]\s*)?[^\W\d_][^\d]*?)\s*(?P<spec>\d.*)?$')
+# C, C-C, C:V, C:V-V or C:V-C:V
+ITEM = re.compile(r'^(\d+)(?::(\d+))?(?:-(\d+)(?::(\d+))?)?$')
+
+def is_reference_expression(reference):
+    """Check whether a reference needs the expression parser (lists, whole chapters or books)."""
+    return ',' in reference or ';' in reference or ':' not in reference
+
+def _chapter_end(versification, book_id, chapter):
+    if versification:
+        return get_verse_count(versification, book_id, chapter) or LAST
+    return LAST
+
+def _parse_item(item, book, book_id, verse_chapter, versification):
+    """Parse one comma-separated item into ((start, end), chapter for following bare verses)."""
+    match = ITEM.match(item.replace(' ', ''))
+    if not match:
+        raise ValueError(f"Invalid reference '{item}'. Use e.g. 'Juan 3:16-18, 20; 1 Juan 4:7-12; Rom 8'.")
+    first, first_verse, second, second_verse = (int(group) if group else None for group in match.groups())
+
+    if first_verse is not None:
+        # C:V, C:V-V or C:V-C:V
+        start_chapter, start_verse = first, first_verse
+        if second is None:
+            end_chapter, end_verse = first, first_verse
+        elif second_verse is None:
+            end_chapter, end_verse = first, second
+        else:
+            end_chapter, end_verse = second, second_verse
+    elif verse_chapter is not None and second_verse is None:
+        # Bare verses after a chapter:verse, e.g. the "20" in "Juan 3:16-18, 20"
+        start_chapter = end_chapter = verse_chapter
+        start_verse = first
+        end_verse = second if second is not None else first
+    else:
+        # Whole chapters, or C-C:V
+        start_chapter, start_verse = first, 1
+        end_chapter = second if second is not None else first
+        end_verse = second_verse if second_verse is not None else _chapter_end(versification, book_id, end_chapter)
+
+    if (end_chapter, end_verse) < (start_chapter, start_verse):
+        raise ValueError(f"Invalid range '{item}' in {book}")
+
+    if versification:
+        check_reference(versification, book, start_chapter, start_verse)
+        if end_chapter != start_chapter:
+            check_reference(versification, book, end_chapter, 1)
+        end_verse = min(end_verse, _chapter_end(versification, book_id, end_chapter))
+
+    verse_range = (pack_verse_id(book_id, start_chapter, start_verse), pack_verse_id(book_id, end_chapter, end_verse))
+    # Verse lists continue in the chapter the item ended in
+    return verse_range, end_chapter if (first_verse is not None or verse_chapter is not None) else None
+
+def _following_verse_id(verse_id, versification):
+    """Get the id right after a verse, moving to the next chapter at the end of one."""
+    book_id, chapter, verse = unpack_verse_id(verse_id)
+    if verse >= _chapter_end(versification, book_id, chapter):
+        return pack_verse_id(book_id, chapter + 1, 1)
+    return verse_id + 1
+
+def coalesce_ranges(ranges, versification=None):
+    """Join each verse id range with the previous one when they overlap or touch, keeping their order."""
+    merged = []
+    for start, end in ranges:
+        if merged and merged[-1][0] <= start <= _following_verse_id(merged[-1][1], versification):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def merge_ranges(ranges, versification=None):
+    """Sort verse id ranges and merge the ones that overlap or touch."""
+    return coalesce_ranges(sorted(ranges), versification)
+
+def parse_reference_expression(expression, versification=None):
+    """Parse references like "Juan 3:16-18, 20; 1 Juan 4:7-12; Rom 8" into sorted, merged verse id ranges.
+
+    Parts are separated by ';' and items within a part by ','. A part without a
+    book continues the previous one's. Raises ValueError for invalid expressions.
+    """
+    ranges = []
+    book = book_id = None
+
+    for part in expression.replace('–', '-').split(';'):
+        part = part.strip()
+        if not part:
+            continue
+
+        items = [item.strip() for item in part.split(',')]
+        match = BOOK_PART.match(items[0])
+        if match:
+            book = ' '.join(match.group('book').split())
+            book_id = get_book_id(book)
+            if book_id is None:
+                raise ValueError(f"Unknown book '{book}'")
+            items[0] = match.group('spec') or ''
+        elif book_id is None:
+            raise ValueError(f"Missing book name in '{part}'")
+
+        if items == ['']:
+            # A whole book
+            last_chapter = (get_chapter_count(versification, book_id) if versification else 0) or LAST
+            last_verse = _chapter_end(versification, book_id, last_chapter)
+            ranges.append((pack_verse_id(book_id, 1, 1), pack_verse_id(book_id, last_chapter, last_verse)))
+            continue
+
+        verse_chapter = None
+        for item in items:
+            if not item:
+                raise ValueError(f"Empty reference in '{part}'")
+            verse_range, verse_chapter = _parse_item(item, book, book_id, verse_chapter, versification)
+            ranges.append(verse_range)
+
+    if not ranges:
+        raise ValueError("No references given")
+    return merge_ranges(ranges, versification)
+
+def format_verse_range(start_id, end_id, versification=None):
+    """Format a range of packed verse ids as a reference.
+
+    With a versification, ranges of whole chapters are shown as chapters (e.g. "Génesis 1-3").
+    """
+    book_id, chapter, verse = unpack_verse_id(start_id)
+    end_book_id, end_chapter, end_verse = unpack_verse_id(end_id)
+    book = BOOK_BY_ID.get(book_id, f'Book {book_id}')
+
+    if versification and end_book_id == book_id and verse == 1 and end_verse == get_verse_count(versification, book_id, end_chapter):
+        if end_chapter == chapter:
+            return f"{book} {chapter}"
+        return f"{book} {chapter}-{end_chapter}"
+
+    reference = f"{book} {chapter}:{verse}"
+    if end_id == start_id:
+        return reference
+    if end_book_id != book_id:
+        return f"{reference}-{BOOK_BY_ID.get(end_book_id, f'Book {end_book_id}')} {end_chapter}:{end_verse}"
+    if end_chapter != chapter:
+        return f"{reference}-{end_chapter}:{end_verse}"
+    return f"{reference}-{end_verse}"
+
+def group_verses_by_range(ranges, verses):
+    """Split sorted (verse id, text) tuples into the sorted, merged ranges they were fetched for."""
+    groups = [[] for _ in ranges]
+    starts = [start for start, end in ranges]
+    for verse_id, text in verses:
+        groups[bisect.bisect_right(starts, verse_id) - 1].append((verse_id, text))
+    return [group for group in groups if group]
+
+def format_verse_group(verses):
+    """Format consecutive (verse id, text) tuples as a reference and text, numbering the verses of a range."""
+    first_id, last_id = verses[0][0], verses[-1][0]
+    reference = format_verse_range(first_id, last_id)
+    if len(verses) == 1:
+        return reference, verses[0][1]
+
+    # Ranges spanning chapters number their verses with the chapter too
+    spans_chapters = first_id // 1000 != last_id // 1000
+    lines = []
+    for verse_id, text in verses:
+        _, chapter, verse = unpack_verse_id(verse_id)
+        lines.append(f"{chapter}:{verse}. {text}" if spans_chapters else f"{verse}. {text}")
+    return reference, '\n'.join(lines)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Render cache for reading mode: whole chapters, fully rendered per format and width, zlib-compressed on disk.
+"""
+
+import os
+import sys
+import json
+import zlib
+import shutil
+import sqlite3
+import subprocess
+
+from rbible.bible_data import get_bible_path, get_read_path, pack_verse_id
+from rbible.catalog import get_chapter_count
+from rbible.concordance import source_signature
+from rbible.formatters import format_passages, wrap_verses
+from rbible.references import parse_reference_expression, format_verse_group, LAST
+from rbible.verse_operations import get_verses_in_ranges
+
+RENDER_DIR = os.path.join(os.path.expanduser("~"), ".rbible", "cache", "render")
+
+# Signature of the Bible file the chapters of a version were rendered from
+SOURCE_FILE = "source"
+
+def whole_chapter(reference):
+    """Get (book id, chapter) if a reference is exactly one whole chapter, like "Juan 3", otherwise None."""
+    try:
+        ranges = parse_reference_expression(reference)
+    except ValueError:
+        return None
+    if len(ranges) != 1:
+        return None
+    start, end = ranges[0]
+    if start % 1000 != 1 or end != start - 1 + LAST:
+        return None
+    return start // 1000000, start // 1000 % 1000
+
+def get_entry_path(version, book_id, chapter, format_name, width=None):
+    """Get the cache file of a rendered chapter."""
+    return os.path.join(RENDER_DIR, version, f"{book_id}-{chapter}-{format_name}-{width or 0}.z")
+
+def check_source(version, bible_path):
+    """Drop the rendered chapters of a version if its Bible file changed since they were rendered."""
+    version_dir = os.path.join(RENDER_DIR, version)
+    signature = source_signature(bible_path)
+    try:
+        with open(os.path.join(version_dir, SOURCE_FILE), 'r', encoding='utf-8') as f:
+            if f.read() == signature:
+                return
+    except OSError:
+        pass
+    shutil.rmtree(version_dir, ignore_errors=True)
+    os.makedirs(version_dir, exist_ok=True)
+    # Written to a temp file, then renamed: a half-written signature would make a warmer drop everything again
+    source_path = os.path.join(version_dir, SOURCE_FILE)
+    temp_path = f"{source_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(signature)
+    os.replace(temp_path, source_path)
+
+def render_chapter(bible_conn, version, book_id, chapter, format_name, width=None):
+    """Render a whole chapter as {"reference", "text", "rendered"}, or None if the chapter doesn't exist."""
+    ranges = [(pack_verse_id(book_id, chapter, 1), pack_verse_id(book_id, chapter, LAST))]
+    verses = get_verses_in_ranges(bible_conn, ranges)
+    if not verses:
+        return None
+    reference, text = format_verse_group(verses)
+    if width:
+        text = wrap_verses(text, width)
+    rendered = format_passages(format_name, [{"reference": reference, "version": version, "text": text}])
+    return {"reference": reference, "text": text, "rendered": rendered}
+
+def load_chapter(version, book_id, chapter, format_name, width=None):
+    """Get a rendered chapter from the cache, or None."""
+    try:
+        with open(get_entry_path(version, book_id, chapter, format_name, width), 'rb') as f:
+            return json.loads(zlib.decompress(f.read()).decode('utf-8'))
+    except (OSError, ValueError, zlib.error):
+        return None
+
+def save_chapter(version, book_id, chapter, format_name, width, entry):
+    """Store a rendered chapter in the cache (written to a temp file, then renamed)."""
+    path = get_entry_path(version, book_id, chapter, format_name, width)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(zlib.compress(json.dumps(entry, ensure_ascii=False).encode('utf-8')))
+    os.replace(temp_path, path)
+
+def get_chapter(bible_conn, version, book_id, chapter, format_name, width=None):
+    """Get a rendered chapter, rendering and caching it on a miss. Returns None if it doesn't exist."""
+    bible_path = get_bible_path(version)
+    if not bible_path:
+        return None
+    check_source(version, bible_path)
+
+    entry = load_chapter(version, book_id, chapter, format_name, width)
+    if entry is None:
+        entry = render_chapter(bible_conn, version, book_id, chapter, format_name, width)
+        if entry is not None:
+            try:
+                save_chapter(version, book_id, chapter, format_name, width, entry)
+            except OSError:
+                pass  # Rendered again next time
+    return entry
+
+def adjacent_chapters(book_id, chapter, versification=None):
+    """Get the chapters before and after one, within its book."""
+    last = get_chapter_count(versification, book_id) if versification else None
+    return [(book_id, c) for c in (chapter - 1, chapter + 1) if c >= 1 and (not last or c <= last)]
+
+def warm_chapters(version, chapters, format_name, width=None):
+    """Render and cache chapters that are not cached yet."""
+    bible_path = get_bible_path(version)
+    if not bible_path:
+        return
+    check_source(version, bible_path)
+    bible_conn = sqlite3.connect(get_read_path(version, bible_path))
+    try:
+        for book_id, chapter in chapters:
+            if load_chapter(version, book_id, chapter, format_name, width) is None:
+                entry = render_chapter(bible_conn, version, book_id, chapter, format_name, width)
+                if entry is not None:
+                    save_chapter(version, book_id, chapter, format_name, width, entry)
+    finally:
+        bible_conn.close()
+
+def warm_adjacent_in_background(version, book_id, chapter, format_name, width=None, versification=None):
+    """Render the previous and next chapters in a detached process, so paging to them is instant.
+
+    Nothing is started when they are already cached.
+    """
+    missing = [
+        (b, c) for b, c in adjacent_chapters(book_id, chapter, versification)
+        if not os.path.exists(get_entry_path(version, b, c, format_name, width))
+    ]
+    if not missing:
+        return
+    arguments = [version, format_name, str(width or 0)] + [f"{b}:{c}" for b, c in missing]
+    try:
+        subprocess.Popen(
+            [sys.executable, "-m", "rbible.render_cache"] + arguments,
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass  # Rendered when they are read instead
+
+if __name__ == "__main__":
+    # python -m rbible.render_cache VERSION FORMAT WIDTH BOOK:CHAPTER...
+    version, format_name, width = sys.argv[1], sys.argv[2], int(sys.argv[3])
+    warm_chapters(version, [tuple(int(n) for n in item.split(":")) for item in sys.argv[4:]], format_name, width)
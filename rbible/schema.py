@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Schema adapters: every .mybible variant is introspected once and read through the same methods.
+"""
+
+import os
+import sys
+import sqlite3
+from collections import namedtuple
+
+from rbible.bible_data import pack_verse_id, unpack_verse_id, MYBIBLE_BOOK_NUMBERS, BOOK_ID_BY_MYBIBLE_NUMBER
+
+# Accepted column names for each role, in order of preference (matched case-insensitively)
+COLUMN_NAMES = {
+    "book": ("book_number", "book", "book_id", "b"),
+    "chapter": ("chapter", "c"),
+    "verse": ("verse", "v"),
+    "text": ("text", "scripture", "content", "t"),
+}
+
+# Tables tried first; any other table with the four columns is accepted after them
+PREFERRED_TABLES = ("verses", "bible")
+
+# Where a module keeps its verses and how to read them
+BibleSchema = namedtuple("BibleSchema", [
+    "table", "book", "chapter", "verse", "text",
+    "mybible_numbers",  # Books numbered 10, 20, ... 730 instead of 1-66
+    "indexed",          # Has an index starting with (book, chapter)
+    "fts",              # The table is a full-text search table
+    "info",             # The module's info table as a dict
+])
+
+_schemas = {}
+_warned = set()
+
+def _database_path(bible_conn):
+    """Get the file a connection reads, or "" for in-memory databases."""
+    for row in bible_conn.execute("PRAGMA database_list"):
+        if row[1] == "main":
+            return row[2] or ""
+    return ""
+
+def _find_columns(columns):
+    """Map each role to one of the table's columns, or None if a role has no column."""
+    by_name = {name.lower(): name for name in columns}
+    mapping = {}
+    for role, names in COLUMN_NAMES.items():
+        mapping[role] = next((by_name[name] for name in names if name in by_name), None)
+        if mapping[role] is None:
+            return None
+    return mapping
+
+def _has_verse_index(bible_conn, table, book, chapter):
+    """Check if some index (or the primary key) of a table starts with (book, chapter)."""
+    for index in bible_conn.execute(f'PRAGMA index_list("{table}")').fetchall():
+        columns = [row[2] for row in bible_conn.execute(f'PRAGMA index_info("{index[1]}")').fetchall()]
+        if [c.lower() for c in columns[:2]] == [book.lower(), chapter.lower()]:
+            return True
+    return False
+
+def introspect_schema(bible_conn):
+    """Find the verse table of a module, its columns, book numbering, indexes and info.
+
+    Raises ValueError if no table looks like a Bible.
+    """
+    tables = {name: sql or "" for name, sql in bible_conn.execute("SELECT name, sql FROM sqlite_master WHERE type='table'")}
+    ordered = sorted(tables, key=lambda name: (PREFERRED_TABLES.index(name.lower()) if name.lower() in PREFERRED_TABLES else len(PREFERRED_TABLES), name))
+
+    for table in ordered:
+        columns = _find_columns([row[1] for row in bible_conn.execute(f'PRAGMA table_info("{table}")')])
+        if not columns:
+            continue
+
+        if columns["book"].lower() == "book_number":
+            mybible_numbers = True
+        else:
+            highest = bible_conn.execute(f'SELECT MAX("{columns["book"]}") FROM "{table}"').fetchone()[0]
+            mybible_numbers = bool(highest and highest > 66)
+
+        info = {}
+        info_table = next((name for name in tables if name.lower() == "info"), None)
+        if info_table:
+            try:
+                info = {name: value for name, value in bible_conn.execute(f'SELECT name, value FROM "{info_table}"')}
+            except Exception:
+                pass  # Info tables without name/value columns are just ignored
+
+        return BibleSchema(
+            table, columns["book"], columns["chapter"], columns["verse"], columns["text"],
+            mybible_numbers,
+            _has_verse_index(bible_conn, table, columns["book"], columns["chapter"]),
+            "USING FTS" in tables[table].upper(),
+            info,
+        )
+
+    raise ValueError("Unrecognized Bible module: no table with book, chapter, verse and text columns")
+
+def get_schema(bible_conn):
+    """Get the schema of a module, introspecting each file only once per process (and again if it changes)."""
+    path = _database_path(bible_conn)
+    if not path:
+        return introspect_schema(bible_conn)
+
+    key = (path, os.path.getmtime(path))
+    if key not in _schemas:
+        _schemas[key] = introspect_schema(bible_conn)
+    return _schemas[key]
+
+class BibleAdapter:
+    """Uniform, index-friendly reads over any module schema. Texts are returned raw."""
+
+    def __init__(self, bible_conn, schema):
+        self.conn = bible_conn
+        self.schema = schema
+        s = schema
+        self._columns = f'"{s.book}", "{s.chapter}", "{s.verse}", "{s.text}"'
+        self._table = f'"{s.table}"'
+
+    def book_number(self, book_id):
+        """Get the module's number for a book id."""
+        return MYBIBLE_BOOK_NUMBERS.get(book_id) if self.schema.mybible_numbers else book_id
+
+    def book_id(self, book_number):
+        """Get the book id of a module's book number (None for books outside the 66)."""
+        if self.schema.mybible_numbers:
+            return BOOK_ID_BY_MYBIBLE_NUMBER.get(book_number)
+        return book_number if 1 <= book_number <= 66 else None
+
+    def fetch_verse(self, book_id, chapter, verse):
+        """Get the text of a verse, or None if it doesn't exist."""
+        s = self.schema
+        row = self.conn.execute(
+            f'SELECT "{s.text}" FROM {self._table} WHERE "{s.book}" = ? AND "{s.chapter}" = ? AND "{s.verse}" = ?',
+            (self.book_number(book_id), chapter, verse)
+        ).fetchone()
+        return row[0] if row else None
+
+    def fetch_ranges(self, ranges):
+        """Yield (verse id, text) for sorted (start id, end id) ranges, with one query per book."""
+        s = self.schema
+        ranges_by_book = {}
+        for start, end in ranges:
+            ranges_by_book.setdefault(unpack_verse_id(start)[0], []).append((start, end))
+
+        cursor = self.conn.cursor()
+        try:
+            for book_id, book_ranges in ranges_by_book.items():
+                # Row values compare (chapter, verse) pairs and still use the verse index
+                condition = " OR ".join([f'("{s.chapter}", "{s.verse}") BETWEEN (?, ?) AND (?, ?)'] * len(book_ranges))
+                params = []
+                for start, end in book_ranges:
+                    params.extend(unpack_verse_id(start)[1:] + unpack_verse_id(end)[1:])
+
+                cursor.execute(f"""
+                    SELECT "{s.chapter}", "{s.verse}", "{s.text}" FROM {self._table}
+                    WHERE "{s.book}" = ? AND ({condition})
+                    ORDER BY "{s.chapter}", "{s.verse}"
+                """, [self.book_number(book_id)] + params)
+                for chapter, verse, text in cursor:
+                    yield pack_verse_id(book_id, chapter, verse), text or ""
+        finally:
+            cursor.close()
+
+    def fetch_range(self, start_id, end_id):
+        """Yield (verse id, text) for the verses from start_id to end_id."""
+        return self.fetch_ranges([(start_id, end_id)])
+
+    def fetch_chapter(self, book_id, chapter, start_verse=1, end_verse=None):
+        """Get the (verse number, text) tuples of a chapter, or of part of it."""
+        s = self.schema
+        rows = self.conn.execute(f"""
+            SELECT "{s.verse}", "{s.text}" FROM {self._table}
+            WHERE "{s.book}" = ? AND "{s.chapter}" = ? AND "{s.verse}" BETWEEN ? AND ?
+            ORDER BY "{s.verse}"
+        """, (self.book_number(book_id), chapter, start_verse, end_verse if end_verse is not None else sys.maxsize)).fetchall()
+        return [(verse, text or "") for verse, text in rows]
+
+    def iter_all(self):
+        """Yield every verse as (book id, chapter, verse, text), in biblical order."""
+        s = self.schema
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f'SELECT {self._columns} FROM {self._table} ORDER BY "{s.book}", "{s.chapter}", "{s.verse}"')
+            for book_number, chapter, verse, text in cursor:
+                book_id = self.book_id(book_number)
+                # Skip deuterocanonical books, which have no id in BIBLE_BOOKS
+                if book_id is not None:
+                    yield book_id, chapter, verse, text or ""
+        finally:
+            cursor.close()
+
+    def search(self, query, limit=20):
+        """Get up to `limit` (book id, chapter, verse, text) verses containing the query."""
+        s = self.schema
+        like = (f'SELECT {self._columns} FROM {self._table} WHERE "{s.text}" LIKE ? LIMIT ?', (f"%{query}%", limit))
+        if s.fts:
+            try:
+                rows = self.conn.execute(f'SELECT {self._columns} FROM {self._table} WHERE "{s.text}" MATCH ? LIMIT ?', (query, limit)).fetchall()
+            except sqlite3.OperationalError:
+                # Quotes, "-", "*" or ":" are FTS query syntax; search for the plain text instead
+                rows = self.conn.execute(*like)
+        else:
+            rows = self.conn.execute(*like)
+        results = []
+        for book_number, chapter, verse, text in rows:
+            book_id = self.book_id(book_number)
+            if book_id is not None:
+                results.append((book_id, chapter, verse, text or ""))
+        return results
+
+    def verse_counts(self):
+        """Get (book id, chapter, last verse) for every chapter."""
+        s = self.schema
+        rows = self.conn.execute(f'SELECT "{s.book}", "{s.chapter}", MAX("{s.verse}") FROM {self._table} GROUP BY "{s.book}", "{s.chapter}"')
+        return [(self.book_id(book_number), chapter, last) for book_number, chapter, last in rows]
+
+def get_adapter(bible_conn):
+    """Get the adapter of an open module, warning once per file if it lacks a verse index."""
+    schema = get_schema(bible_conn)
+    if not schema.indexed:
+        path = _database_path(bible_conn)
+        if path and path not in _warned:
+            _warned.add(path)
+            # The catalog remembers the warning between runs (it imports this module)
+            from rbible.catalog import first_warning
+            if first_warning(path, "unindexed"):
+                print(f"Warning: {os.path.basename(path)} has no ({schema.book}, {schema.chapter}, {schema.verse}) index, "
+                      "lookups read the whole table. Run 'rbible optimize all' to build indexed copies.", file=sys.stderr)
+    return BibleAdapter(bible_conn, schema)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Semantic search: TF-IDF vectors of words and character n-grams, built offline and memory-mapped with NumPy.
+"""
+
+import os
+import json
+import math
+import sqlite3
+from collections import Counter
+
+from rbible.bible_data import get_bible_path, get_read_path, get_book_id, pack_verse_id, unpack_verse_id
+from rbible.concordance import source_signature, format_verse_id
+from rbible.text_utils import strip_markup, tokenize
+from rbible.verse_operations import iter_all_verses, get_raw_verse
+
+SEMANTIC_DIR = os.path.join(os.path.expanduser("~"), ".rbible", "cache", "semantic")
+
+# Character n-grams catch shared stems ("temas", "temor") that whole words miss
+NGRAM_SIZE = 4
+# Weight of n-gram features relative to whole words
+NGRAM_WEIGHT = 0.5
+
+# Arrays of the index, each memory-mapped from its own .npy file
+ARRAYS = ("vocabulary", "idf", "indptr", "rows", "weights", "verse_ids")
+
+def require_numpy():
+    """Import NumPy, which semantic search needs but the rest of rbible doesn't."""
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("Semantic search needs NumPy: pip install 'rbible[semantic]' (or pip install numpy)")
+    return numpy
+
+def extract_features(text):
+    """Count the features of a raw verse text: its words ("w:amor") and their character n-grams ("g:amor")."""
+    features = Counter()
+    for word in tokenize(text):
+        features["w:" + word] += 1
+        padded = f" {word} "
+        for i in range(len(padded) - NGRAM_SIZE + 1):
+            features["g:" + padded[i:i + NGRAM_SIZE]] += NGRAM_WEIGHT
+    return features
+
+def get_index_dir(version):
+    """Get the directory of a version's semantic index."""
+    return os.path.join(SEMANTIC_DIR, version)
+
+def build_index(bible_conn, index_dir, signature=""):
+    """Build the TF-IDF index of a Bible, stored by feature (like a concordance) so queries only read their features.
+
+    Returns the number of verses indexed.
+    """
+    np = require_numpy()
+
+    verse_ids = []
+    verse_features = []
+    document_frequency = Counter()
+    for book_id, chapter, verse, text in iter_all_verses(bible_conn):
+        features = extract_features(text)
+        if features:
+            verse_ids.append(pack_verse_id(book_id, chapter, verse))
+            verse_features.append(features)
+            document_frequency.update(features.keys())
+
+    vocabulary = sorted(document_frequency)
+    feature_index = {feature: i for i, feature in enumerate(vocabulary)}
+    verse_count = len(verse_ids)
+    idf = np.array([math.log((verse_count + 1) / (document_frequency[f] + 1)) + 1 for f in vocabulary], dtype=np.float32)
+
+    # Sublinear, L2-normalized TF-IDF per verse, as (feature, row, weight) triples
+    features, rows, weights = [], [], []
+    for row, counts in enumerate(verse_features):
+        indexes = [feature_index[f] for f in counts]
+        values = np.array([1 + math.log(c) for c in counts.values()], dtype=np.float32) * idf[indexes]
+        values /= np.linalg.norm(values)
+        features.extend(indexes)
+        rows.extend([row] * len(indexes))
+        weights.append(values)
+
+    # Sort by feature: the rows of a feature are then one contiguous slice (CSC layout)
+    features = np.array(features, dtype=np.int32)
+    order = np.argsort(features, kind="stable")
+    arrays = {
+        "vocabulary": np.array(vocabulary),
+        "idf": idf,
+        "indptr": np.concatenate(([0], np.cumsum(np.bincount(features, minlength=len(vocabulary))))).astype(np.int64),
+        "rows": np.array(rows, dtype=np.int32)[order],
+        "weights": np.concatenate(weights)[order] if weights else np.zeros(0, dtype=np.float32),
+        "verse_ids": np.array(verse_ids, dtype=np.int64),
+    }
+
+    temp_dir = index_dir + ".tmp"
+    os.makedirs(temp_dir, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(temp_dir, f"{name}.npy"), array)
+    with open(os.path.join(temp_dir, "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump({"source": signature, "verses": verse_count}, f)
+
+    # Replace the old index only once the new one is complete
+    if os.path.exists(index_dir):
+        for name in os.listdir(index_dir):
+            os.remove(os.path.join(index_dir, name))
+        os.rmdir(index_dir)
+    os.replace(temp_dir, index_dir)
+    return verse_count
+
+def build_semantic_index(version, quiet=False):
+    """Build (or rebuild) the semantic index of a version."""
+    bible_path = get_bible_path(version)
+    if not bible_path:
+        print(f"Error: Bible version '{version}' not found.")
+        return False
+
+    if not quiet:
+        print(f"Building semantic index for {version}...")
+    bible_conn = sqlite3.connect(bible_path)
+    try:
+        verse_count = build_index(bible_conn, get_index_dir(version), source_signature(bible_path))
+    finally:
+        bible_conn.close()
+
+    if not quiet:
+        print(f"Indexed {verse_count} verses of {version}.")
+    return True
+
+def is_index_current(version):
+    """Check that a version's semantic index exists and matches its Bible file."""
+    bible_path = get_bible_path(version)
+    try:
+        with open(os.path.join(get_index_dir(version), "meta.json"), 'r', encoding='utf-8') as f:
+            return bool(bible_path) and json.load(f)["source"] == source_signature(bible_path)
+    except (OSError, ValueError, KeyError):
+        return False
+
+def load_index(index_dir):
+    """Memory-map the arrays of a semantic index."""
+    np = require_numpy()
+    return {name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+
+def query_vector(index, text):
+    """Get the (feature indexes, weights) of a text's normalized TF-IDF vector, ignoring unknown features."""
+    np = require_numpy()
+    counts = extract_features(text)
+    if not counts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    features = list(counts)
+    vocabulary = index["vocabulary"]
+    positions = np.searchsorted(vocabulary, features)
+    known = [i for i, p in enumerate(positions) if p < len(vocabulary) and vocabulary[p] == features[i]]
+    positions = positions[known].astype(np.int64)
+    values = np.array([1 + math.log(counts[features[i]]) for i in known], dtype=np.float32) * index["idf"][positions]
+    norm = np.linalg.norm(values)
+    return positions, (values / norm if norm else values)
+
+def score(index, positions, values):
+    """Get the cosine similarity of every verse to a query vector."""
+    np = require_numpy()
+    indptr, rows, weights = index["indptr"], index["rows"], index["weights"]
+    if not len(positions):
+        return np.zeros(len(index["verse_ids"]), dtype=np.float32)
+
+    # Only the postings of the query's features are read, then summed per verse in one pass
+    slices = [slice(indptr[p], indptr[p + 1]) for p in positions]
+    hit_rows = np.concatenate([rows[s] for s in slices])
+    hit_weights = np.concatenate([weights[s] * v for s, v in zip(slices, values)])
+    return np.bincount(hit_rows, weights=hit_weights, minlength=len(index["verse_ids"]))
+
+def top_matches(index, scores, limit=10, exclude=()):
+    """Get the (verse id, score) of the best scores, best first."""
+    np = require_numpy()
+    verse_ids = index["verse_ids"]
+    if exclude:
+        scores = scores.copy()
+        scores[np.isin(verse_ids, list(exclude))] = 0
+    limit = min(limit, len(scores))
+    if limit <= 0:
+        return []
+    best = np.argpartition(-scores, limit - 1)[:limit]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return [(int(verse_ids[i]), float(scores[i])) for i in best if scores[i] > 0]
+
+def _open_index(version, quiet=False):
+    """Load a version's semantic index, building it first if needed (None if the version is missing)."""
+    if not is_index_current(version):
+        if not build_semantic_index(version, quiet):
+            return None
+    return load_index(get_index_dir(version))
+
+def _results(bible_conn, matches):
+    """Turn (verse id, score) matches into results with their reference and text."""
+    return [
+        {"reference": format_verse_id(verse_id), "score": round(similarity, 4),
+         "text": strip_markup(get_raw_verse(bible_conn, *unpack_verse_id(verse_id)) or "")}
+        for verse_id, similarity in matches
+    ]
+
+def semantic_search(version, query, limit=10, quiet=False):
+    """Find the verses most similar to a text. Returns a list of {"reference", "score", "text"} or None."""
+    index = _open_index(version, quiet)
+    if index is None:
+        return None
+
+    positions, values = query_vector(index, query)
+    matches = top_matches(index, score(index, positions, values), limit)
+    bible_conn = sqlite3.connect(get_read_path(version, get_bible_path(version)))
+    try:
+        return _results(bible_conn, matches)
+    finally:
+        bible_conn.close()
+
+def similar_verses(version, book, chapter, verse, limit=10, quiet=False):
+    """Find the verses most similar to a verse (excluding itself). Returns a list of results or None.
+
+    Raises ValueError if the verse doesn't exist.
+    """
+    bible_path = get_bible_path(version)
+    if not bible_path:
+        print(f"Error: Bible version '{version}' not found.")
+        return None
+
+    book_id = get_book_id(book)
+    bible_conn = sqlite3.connect(get_read_path(version, bible_path))
+    try:
+        text = get_raw_verse(bible_conn, book_id, chapter, verse) if book_id else None
+        if text is None:
+            raise ValueError(f"Verse not found: {book} {chapter}:{verse}")
+
+        index = _open_index(version, quiet)
+        if index is None:
+            return None
+        positions, values = query_vector(index, text)
+        matches = top_matches(index, score(index, positions, values), limit, exclude={pack_verse_id(book_id, chapter, verse)})
+        return _results(bible_conn, matches)
+    finally:
+        bible_conn.close()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+import os
+import re
+import sqlite3
+from collections import defaultdict, Counter
+
+from rbible.bible_data import get_bible_path, get_read_path, pack_verse_id, unpack_verse_id
+from rbible.concordance import (
+    encode_postings, decode_postings, source_signature, index_matches_source,
+    format_verse_id, NEW_TESTAMENT_START
+)
+from rbible.text_utils import strip_markup
+from rbible.verse_operations import iter_all_verses, get_raw_verse
+
+STRONGS_DIR = os.path.join(os.path.expanduser("~"), ".rbible", "cache", "strongs")
+
+# A word followed by its Strong's tag(s), e.g. "misericordia<S>2617</S>" or "amor<S>G26</S>"
+STRONGS_TAG = re.compile(r'<S>([HG]?)(\d+)</S>', re.IGNORECASE)
+TAGGED_WORD = re.compile(r'([^\W\d_]+)((?:\s*<S>[HG]?\d+</S>)+)', re.IGNORECASE)
+STRONGS_NUMBER = re.compile(r'^([HG]?)0*(\d+)$', re.IGNORECASE)
+
+def normalize_strongs(number, book_id=None):
+    """Normalize a Strong's number like "h02617" to "H2617".
+
+    Untagged numbers take their prefix from the testament of book_id; without
+    one, the bare number is returned.
+    """
+    match = STRONGS_NUMBER.match(number.strip())
+    if not match:
+        raise ValueError(f"Invalid Strong's number '{number}'. Use e.g. H2617 or G26.")
+
+    prefix, digits = match.group(1).upper(), match.group(2)
+    if not prefix and book_id is not None:
+        prefix = 'H' if book_id < NEW_TESTAMENT_START else 'G'
+    return prefix + digits
+
+def extract_strongs(book_id, text):
+    """Get the (Strong's number, tagged word) pairs of a raw verse text, in order."""
+    pairs = []
+    for match in TAGGED_WORD.finditer(text):
+        word = match.group(1).lower()
+        for prefix, digits in STRONGS_TAG.findall(match.group(2)):
+            pairs.append((normalize_strongs(prefix + digits, book_id), word))
+    return pairs
+
+def get_index_path(version):
+    """Get the path of a version's Strong's index."""
+    return os.path.join(STRONGS_DIR, f"{version}.db")
+
+def build_index(bible_conn, index_path, signature=""):
+    """Build the Strong's index of a Bible: every number mapped to the verses it tags.
+
+    A number tagging two words of a verse is listed twice. Returns the number
+    of distinct Strong's numbers, 0 for versions without tags.
+    """
+    postings = defaultdict(list)
+    renderings = defaultdict(Counter)
+    for book_id, chapter, verse, text in iter_all_verses(bible_conn):
+        # Most versions have no tags at all
+        if '<S>' not in text and '<s>' not in text:
+            continue
+        verse_id = pack_verse_id(book_id, chapter, verse)
+        for number, word in extract_strongs(book_id, text):
+            postings[number].append(verse_id)
+            renderings[number][word] += 1
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    temp_path = index_path + ".tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    index_conn = sqlite3.connect(temp_path)
+    try:
+        index_conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        index_conn.execute("""
+            CREATE TABLE strongs (
+                number TEXT PRIMARY KEY,
+                occurrences INTEGER NOT NULL,
+                postings BLOB NOT NULL
+            ) WITHOUT ROWID
+        """)
+        index_conn.execute("""
+            CREATE TABLE renderings (
+                number TEXT NOT NULL,
+                word TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (number, word)
+            ) WITHOUT ROWID
+        """)
+        index_conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ('source', signature),
+            ('numbers', str(len(postings))),
+        ])
+        index_conn.executemany(
+            "INSERT INTO strongs VALUES (?, ?, ?)",
+            ((number, len(verse_ids), encode_postings(verse_ids)) for number, verse_ids in postings.items())
+        )
+        index_conn.executemany(
+            "INSERT INTO renderings VALUES (?, ?, ?)",
+            ((number, word, count) for number, words in renderings.items() for word, count in words.items())
+        )
+        index_conn.commit()
+    finally:
+        index_conn.close()
+
+    # Replace the old index only once the new one is complete
+    os.replace(temp_path, index_path)
+    return len(postings)
+
+def build_strongs_index(version, quiet=False):
+    """Build (or rebuild) the Strong's index of a version."""
+    bible_path = get_bible_path(version)
+    if not bible_path:
+        print(f"Error: Bible version '{version}' not found.")
+        return False
+
+    if not quiet:
+        print(f"Building Strong's index for {version}...")
+    bible_conn = sqlite3.connect(bible_path)
+    try:
+        number_count = build_index(bible_conn, get_index_path(version), source_signature(bible_path))
+    finally:
+        bible_conn.close()
+
+    if not quiet:
+        if number_count:
+            print(f"Indexed {number_count} Strong's numbers in {version}.")
+        else:
+            print(f"{version} has no Strong's numbers.")
+    return True
+
+def is_tagged(version, quiet=False):
+    """Check whether a version has Strong's numbers, building its index first if needed."""
+    index_path = get_index_path(version)
+    if not index_matches_source(index_path, get_bible_path(version)):
+        if not build_strongs_index(version, quiet):
+            return False
+
+    conn = sqlite3.connect(index_path)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'numbers'").fetchone()
+    finally:
+        conn.close()
+    return row is not None and int(row[0]) > 0
+
+def lookup_strongs(index_conn, number):
+    """Get the packed verse ids (one per occurrence) and renderings of a Strong's number.
+
+    Bare numbers match both the Hebrew and the Greek number.
+    """
+    if number[0] in 'HG':
+        numbers = [number]
+    else:
+        numbers = ['H' + number, 'G' + number]
+
+    verse_ids = []
+    renderings = Counter()
+    for candidate in numbers:
+        row = index_conn.execute("SELECT postings FROM strongs WHERE number = ?", (candidate,)).fetchone()
+        if row:
+            verse_ids.extend(decode_postings(row[0]))
+            for word, count in index_conn.execute("SELECT word, count FROM renderings WHERE number = ?", (candidate,)):
+                renderings[word] += count
+    return sorted(verse_ids), renderings
+
+def highlight_tagged_words(book_id, text, number):
+    """Strip the markup of a raw verse, putting the words tagged with a Strong's number in [brackets]."""
+    def mark(match):
+        for prefix, digits in STRONGS_TAG.findall(match.group(2)):
+            tag = normalize_strongs(prefix + digits, book_id)
+            # A bare query number matches both Hebrew and Greek tags
+            if tag == number or tag[1:] == number:
+                return f"[{match.group(1)}]"
+        return match.group(1)
+
+    return strip_markup(TAGGED_WORD.sub(mark, text))
+
+def strongs(version, number, limit=20, quiet=False):
+    """Find the occurrences of a Strong's number in a version.
+
+    Returns a dict with the occurrence and verse counts, how the number is
+    rendered and the first `limit` verses (with the tagged words in brackets),
+    or None if the version has no Strong's numbers.
+    """
+    if not is_tagged(version, quiet):
+        return None
+
+    index_conn = sqlite3.connect(get_index_path(version))
+    try:
+        occurrence_ids, renderings = lookup_strongs(index_conn, number)
+    finally:
+        index_conn.close()
+
+    verse_ids = sorted(set(occurrence_ids))
+    shown_ids = verse_ids[:limit] if limit else verse_ids
+
+    # Only the verses shown are read, by primary key
+    verses = []
+    bible_conn = sqlite3.connect(get_read_path(version, get_bible_path(version)))
+    try:
+        for verse_id in shown_ids:
+            book_id, chapter, verse = unpack_verse_id(verse_id)
+            text = get_raw_verse(bible_conn, book_id, chapter, verse) or ""
+            verses.append({"reference": format_verse_id(verse_id), "text": highlight_tagged_words(book_id, text, number)})
+    finally:
+        bible_conn.close()
+
+    return {
+        "number": number,
+        "version": version,
+        "occurrences": len(occurrence_ids),
+        "verses": len(verse_ids),
+        "renderings": dict(renderings.most_common()),
+        "results": verses,
+    }
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+import re
+
+from rbible.bible_data import fold_accents
+
+# MyBible tags whose content is not verse text: Strong's numbers, morphology, footnotes, notes, headings
+NON_TEXT_TAGS = re.compile(r'<(S|m|f|n|h)>.*?</\1>', re.DOTALL)
+# MySword/GBF footnotes (<RF>...<Rf>)
+GBF_NOTES = re.compile(r'<RF>.*?<Rf>', re.DOTALL)
+# Tags that separate words
+BREAK_TAGS = re.compile(r'<(br|pb|CM|CL)\s*/?>', re.IGNORECASE)
+ANY_TAG = re.compile(r'<[^>]*>')
+WORD = re.compile(r'[^\W\d_]+')
+
+def strip_markup(text):
+    """Remove Strong's numbers, notes and formatting tags from raw verse text."""
+    text = NON_TEXT_TAGS.sub('', text)
+    text = GBF_NOTES.sub('', text)
+    text = BREAK_TAGS.sub(' ', text)
+    text = ANY_TAG.sub('', text)
+    return ' '.join(text.split())
+
+def tokenize(text):
+    """Split raw verse text into normalized (lowercase, accent-folded) words."""
+    return WORD.findall(fold_accents(strip_markup(text)))
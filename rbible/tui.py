@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Full-screen reader (rbible tui): chapters loaded as they scroll into view, parallel panes and search as you type.
+"""
+
+import time
+import queue
+import sqlite3
+import functools
+import threading
+from contextlib import ExitStack
+
+try:
+    import curses
+except ImportError:
+    # Windows without windows-curses: rbible tui reports it, everything else works
+    curses = None
+
+from rbible.bible_data import BOOK_BY_ID, pack_verse_id, unpack_verse_id
+from rbible.catalog import get_versification, get_chapter_count, get_verse_count
+from rbible.concordance import get_index_path, is_index_current, build_concordance, query_concordance, format_verse_id
+from rbible.formatters import display_width, wrap_text
+from rbible.pool import ConnectionPool
+from rbible.references import parse_reference_expression, format_verse_group, LAST
+from rbible.user_data import save_many_to_history
+from rbible.verse_operations import iter_parallel_rows, get_verses_in_ranges
+
+# Lines kept loaded past each edge of the screen, so scrolling never waits at a chapter boundary
+PRELOAD_LINES = 40
+# Chapters kept laid out at once (more only while they are all near the screen)
+MAX_LOADED_CHAPTERS = 5
+# Chapters read before history is written
+HISTORY_BATCH_SIZE = 10
+# Search results kept per query
+SEARCH_LIMIT = 500
+# How often the screen checks for finished searches (milliseconds)
+POLL_INTERVAL = 100
+
+PANE_SEPARATOR = " │ "
+MIN_PANE_WIDTH = 20
+
+def next_chapter(versification, book_id, chapter):
+    """Get the (book id, chapter) after a chapter, going on to the next book (None after the last one)."""
+    if chapter < get_chapter_count(versification, book_id):
+        return book_id, chapter + 1
+    for following in range(book_id + 1, max(versification, default=0) + 1):
+        if get_chapter_count(versification, following):
+            return following, 1
+    return None
+
+def previous_chapter(versification, book_id, chapter):
+    """Get the (book id, chapter) before a chapter, going back to the previous book (None before the first one)."""
+    if chapter > 1:
+        return book_id, chapter - 1
+    for preceding in range(book_id - 1, 0, -1):
+        count = get_chapter_count(versification, preceding)
+        if count:
+            return preceding, count
+    return None
+
+def render_lines(title, versions, rows, width):
+    """Lay out a chapter's (verse id, [text per version]) rows as (line, verse id) tuples, one pane per version.
+
+    Title and blank lines have no verse id.
+    """
+    panes = len(versions)
+    pane_width = max((width - display_width(PANE_SEPARATOR) * (panes - 1)) // panes, MIN_PANE_WIDTH)
+
+    def join(cells):
+        cells = list(cells)
+        padded = [cell + " " * (pane_width - display_width(cell)) for cell in cells[:-1]]
+        return PANE_SEPARATOR.join(padded + cells[-1:])
+
+    lines = [(title, None)]
+    if panes > 1:
+        lines.append((join(versions), None))
+    for verse_id, texts in rows:
+        label = f"{verse_id % 1000}. "
+        columns = [wrap_text(text if text is not None else "—", max(pane_width - len(label), 1)) for text in texts]
+        for row in range(max(len(column) for column in columns)):
+            prefix = label if row == 0 else " " * len(label)
+            lines.append((join(prefix + column[row] if row < len(column) else "" for column in columns), verse_id))
+    lines.append(("", None))
+    return lines
+
+def load_rows(pool, versions, book_id, chapter):
+    """Read the (verse id, [text per version]) rows of a chapter through pooled connections."""
+    with ExitStack() as stack:
+        conns = [stack.enter_context(pool.connection(version)) for version in versions]
+        ranges = [(pack_verse_id(book_id, chapter, 1), pack_verse_id(book_id, chapter, LAST))]
+        return list(iter_parallel_rows(conns, ranges))
+
+def load_verses(pool, version, verse_ids):
+    """Get the texts of some sorted verse ids as {verse id: text}."""
+    with pool.connection(version) as conn:
+        return dict(get_verses_in_ranges(conn, [(verse_id, verse_id) for verse_id in verse_ids]))
+
+class ChapterDocument:
+    """Consecutive chapters laid out as lines, loaded as they scroll into view and dropped far from it."""
+
+    def __init__(self, load_rows, versions, versification, width=80):
+        self.load_rows = load_rows
+        self.versions = versions
+        self.versification = versification
+        self.width = width
+        self.chapters = []  # (book id, chapter, lines, (reference, text)), in order
+        self.lines = []
+
+    def _layout(self, book_id, chapter):
+        rows = self.load_rows(book_id, chapter)
+        lines = render_lines(f"{BOOK_BY_ID[book_id]} {chapter}", self.versions, rows, self.width)
+        verses = [(verse_id, texts[0]) for verse_id, texts in rows if texts[0] is not None]
+        return book_id, chapter, lines, format_verse_group(verses) if verses else None
+
+    def _join(self):
+        self.lines = [line for chapter in self.chapters for line in chapter[2]]
+
+    def open(self, book_id, chapter):
+        """Start over at a chapter."""
+        self.chapters = [self._layout(book_id, chapter)]
+        self._join()
+
+    def chapter_at(self, line):
+        """Get the loaded chapter (book id, chapter, lines, reference and text) shown at a line."""
+        for chapter in self.chapters:
+            if line < len(chapter[2]):
+                return chapter
+            line -= len(chapter[2])
+        return self.chapters[-1]
+
+    def chapter_start(self, book_id, chapter):
+        """Get the first line of a chapter, opening it if it isn't loaded."""
+        line = 0
+        for loaded in self.chapters:
+            if loaded[:2] == (book_id, chapter):
+                return line
+            line += len(loaded[2])
+        self.open(book_id, chapter)
+        return 0
+
+    def verse_line(self, verse_id):
+        """Get the first line of a verse, opening its chapter if it isn't loaded."""
+        book_id, chapter, _ = unpack_verse_id(verse_id)
+        start = self.chapter_start(book_id, chapter)
+        for line in range(start, len(self.lines)):
+            if self.lines[line][1] is not None and self.lines[line][1] >= verse_id:
+                return line
+        return start
+
+    def fill(self, top, height):
+        """Load the chapters around a screen (top line, height) and drop distant ones.
+
+        Returns the top line, shifted by the lines added or dropped before it.
+        """
+        while top + height + PRELOAD_LINES > len(self.lines):
+            following = next_chapter(self.versification, *self.chapters[-1][:2])
+            if following is None:
+                break
+            self.chapters.append(self._layout(*following))
+            self._join()
+        while top < PRELOAD_LINES:
+            preceding = previous_chapter(self.versification, *self.chapters[0][:2])
+            if preceding is None:
+                break
+            self.chapters.insert(0, self._layout(*preceding))
+            top += len(self.chapters[0][2])
+            self._join()
+
+        # Drop chapters that are entirely outside the preloaded lines
+        while len(self.chapters) > MAX_LOADED_CHAPTERS:
+            if top - len(self.chapters[0][2]) >= PRELOAD_LINES:
+                top -= len(self.chapters.pop(0)[2])
+            elif len(self.lines) - len(self.chapters[-1][2]) >= top + height + PRELOAD_LINES:
+                self.chapters.pop()
+            else:
+                break
+            self._join()
+        return max(0, min(top, len(self.lines) - 1))
+
+def open_search_index(version):
+    """Open a version's concordance index for a search thread, building it first if it's missing or stale."""
+    if not is_index_current(version) and not build_concordance(version, quiet=True):
+        raise LookupError(f"Bible version '{version}' not found")
+    return sqlite3.connect(get_index_path(version), check_same_thread=False)
+
+def as_you_type(query):
+    """Match the word still being typed as a prefix ("gra" finds "gracia"); a trailing space ends it."""
+    if not query.strip() or query.endswith(" "):
+        return query
+    return query + "*"
+
+class IncrementalSearch:
+    """Concordance searches run in a background thread; a new query interrupts the one still running."""
+
+    def __init__(self, open_index, limit=SEARCH_LIMIT):
+        self.limit = limit
+        self.error = None
+        self._open_index = open_index
+        self._conn = None
+        self._queries = queue.Queue()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._results = None  # (generation, query, verse ids, total) of the latest finished search
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, query):
+        """Search for a query, cancelling the previous one if it's still running."""
+        with self._lock:
+            self._generation += 1
+            self._queries.put((self._generation, query))
+            if self._conn is not None:
+                # Makes the running SQLite statement fail with "interrupted" (a no-op between queries)
+                self._conn.interrupt()
+
+    def latest(self):
+        """Get (query, verse ids, total matches) of the last submitted query, or None while it runs."""
+        results = self._results
+        if results is None or results[0] != self._generation:
+            return None
+        return results[1:]
+
+    def _run(self):
+        try:
+            conn = self._open_index()
+        except Exception as e:
+            self.error = str(e)
+            return
+        with self._lock:
+            self._conn = conn
+        try:
+            while True:
+                generation, query = self._queries.get()
+                if generation is None:
+                    break
+                # Skip queries replaced while they waited
+                if generation != self._generation:
+                    continue
+                self.error = None
+                try:
+                    _, verse_ids = query_concordance(conn, as_you_type(query))
+                except Exception as e:
+                    # Interrupted by a newer query, or failed: keep serving the next ones either way
+                    if not (isinstance(e, sqlite3.OperationalError) and generation != self._generation):
+                        self.error = str(e)
+                    continue
+                self._results = (generation, query, verse_ids[:self.limit], len(verse_ids))
+        finally:
+            with self._lock:
+                self._conn = None
+            conn.close()
+
+    def close(self):
+        """Stop the search thread."""
+        self.submit("")
+        self._queries.put((None, None))
+        self._thread.join(timeout=1)
+
+class HistoryBatch:
+    """Chapters read, written to history a batch at a time instead of on every move."""
+
+    def __init__(self, version, size=HISTORY_BATCH_SIZE):
+        self.version = version
+        self.size = size
+        self.pending = []
+        self._last = None
+
+    def add(self, reference, text):
+        """Record a chapter, unless it's the one recorded last. Writes the batch once it's full."""
+        if reference == self._last:
+            return
+        self._last = reference
+        self.pending.append({"reference": reference, "text": text, "version": self.version,
+                             "timestamp": time.time()})
+        if len(self.pending) >= self.size:
+            self.flush()
+
+    def flush(self):
+        """Write the pending chapters to history."""
+        if self.pending:
+            save_many_to_history(self.pending)
+            self.pending = []
+
+class Reader:
+    """Screen state and key handling of the reader."""
+
+    def __init__(self, document, search, history, fetch_verses):
+        self.document = document
+        self.search = search
+        self.history = history
+        self.fetch_verses = fetch_verses
+        self.top = 0
+        self.height = 1
+        self.mode = "read"  # "read", "search" or "goto"
+        self.prompt = ""
+        self.selected = 0
+        self.mark = None  # Verse jumped to, shown highlighted
+        self.message = ""
+        self._texts = {}
+
+    def resize(self, width, height):
+        """Adapt to the screen size, laying out the loaded chapters again if the width changed."""
+        self.height = max(height, 1)
+        if width != self.document.width:
+            verse_id = next((v for _, v in self.document.lines[self.top:] if v is not None), None)
+            book_id, chapter = self.document.chapter_at(self.top)[:2]
+            self.document.width = width
+            self.document.open(book_id, chapter)
+            self.top = self.document.verse_line(verse_id) if verse_id else 0
+
+    def scroll(self, lines):
+        self.top = self.document.fill(max(self.top + lines, 0), self.height)
+        self.top = min(self.top, max(len(self.document.lines) - self.height, 0))
+        if self.history is not None:
+            chapter = self.document.chapter_at(self.top)
+            if chapter[3]:
+                self.history.add(*chapter[3])
+
+    def jump(self, verse_id):
+        self.top = self.document.verse_line(verse_id)
+        self.mark = verse_id
+        self.scroll(0)
+
+    def go_to_chapter(self, target):
+        if target is None:
+            return
+        self.top = self.document.chapter_start(*target)
+        self.scroll(0)
+
+    def go_to_reference(self, reference):
+        try:
+            start = parse_reference_expression(reference, self.document.versification)[0][0]
+        except ValueError as e:
+            self.message = str(e)
+            return
+        self.jump(start)
+
+    def results(self):
+        """Get the (query, verse ids, total) of the current search, or None while it runs."""
+        return self.search.latest()
+
+    def handle_key(self, key):
+        """Handle a key (a str for characters, an int for special keys). Returns False to quit."""
+        self.message = ""
+        if self.mode == "read":
+            return self._read_key(key)
+
+        if key in ("\x1b",):
+            self.mode = "read"
+        elif key in ("\n", "\r", curses.KEY_ENTER):
+            self._accept()
+        elif key in ("\x7f", "\b", curses.KEY_BACKSPACE):
+            self._type(self.prompt[:-1])
+        elif self.mode == "search" and key in (curses.KEY_DOWN, curses.KEY_UP):
+            results = self.results()
+            count = len(results[1]) if results else 0
+            self.selected = max(0, min(self.selected + (1 if key == curses.KEY_DOWN else -1), count - 1))
+        elif isinstance(key, str) and key.isprintable():
+            self._type(self.prompt + key)
+        return True
+
+    def _read_key(self, key):
+        versification = self.document.versification
+        book_id, chapter = self.document.chapter_at(self.top)[:2]
+        if key in ("q", "Q"):
+            return False
+        if key in ("j", curses.KEY_DOWN):
+            self.scroll(1)
+        elif key in ("k", curses.KEY_UP):
+            self.scroll(-1)
+        elif key in (" ", curses.KEY_NPAGE):
+            self.scroll(self.height - 1)
+        elif key in ("b", curses.KEY_PPAGE):
+            self.scroll(1 - self.height)
+        elif key in ("n", "]"):
+            self.go_to_chapter(next_chapter(versification, book_id, chapter))
+        elif key in ("p", "["):
+            self.go_to_chapter(previous_chapter(versification, book_id, chapter))
+        elif key in ("/", "g"):
+            self.mode = "search" if key == "/" else "goto"
+            self.prompt = ""
+            self.selected = 0
+        return True
+
+    def _type(self, prompt):
+        self.prompt = prompt
+        if self.mode == "search":
+            self.selected = 0
+            self.search.submit(prompt)
+
+    def _accept(self):
+        mode, self.mode = self.mode, "read"
+        if mode == "goto":
+            if self.prompt.strip():
+                self.go_to_reference(self.prompt)
+            return
+        results = self.results()
+        if results and results[1]:
+            self.jump(results[1][self.selected])
+
+    def _result_lines(self, width):
+        """Lines of the visible search results, reading only their verses."""
+        results = self.results()
+        if results is None:
+            return [("Searching…" if not self.search.error else f"Error: {self.search.error}", 0)]
+        _, verse_ids, total = results
+        if not verse_ids:
+            return [("No matches" if self.prompt.strip() else "Type to search", 0)]
+        first = max(0, self.selected - self.height + 2)
+        visible = verse_ids[first:first + self.height - 1]
+        missing = [verse_id for verse_id in visible if verse_id not in self._texts]
+        if missing:
+            self._texts.update(self.fetch_verses(missing))
+        shown = f"{len(verse_ids)} of {total}" if total > len(verse_ids) else str(total)
+        lines = [(f"{shown} verses", 0)]
+        for index, verse_id in enumerate(visible, first):
+            line = f"{format_verse_id(verse_id)}  {self._texts.get(verse_id, '')}"
+            lines.append((line, curses.A_REVERSE if index == self.selected else 0))
+        return lines
+
+    def draw(self, screen):
+        height, width = screen.getmaxyx()
+        screen.erase()
+        if self.mode == "search":
+            body = self._result_lines(width)
+        else:
+            body = []
+            for line, verse_id in self.document.lines[self.top:self.top + self.height]:
+                attribute = curses.A_BOLD if verse_id is None else curses.A_REVERSE if verse_id == self.mark else 0
+                body.append((line, attribute))
+        for row, (line, attribute) in enumerate(body[:height - 1]):
+            _put(screen, row, line, width, attribute)
+
+        if self.mode == "search":
+            status = f"/{self.prompt}"
+        elif self.mode == "goto":
+            status = f"Go to: {self.prompt}"
+        else:
+            reference = self.document.chapter_at(self.top)
+            status = self.message or (
+                f"{BOOK_BY_ID[reference[0]]} {reference[1]} ({', '.join(self.document.versions)})"
+                "   j/k scroll  space/b page  n/p chapter  g go to  / search  q quit"
+            )
+        _put(screen, height - 1, status, width, curses.A_REVERSE)
+        screen.refresh()
+
+def _put(screen, row, text, width, attribute=0):
+    """Write a line, cut to the screen width (curses fails on writes reaching the last cell)."""
+    try:
+        screen.addnstr(row, 0, text, width - 1, attribute)
+    except curses.error:
+        pass
+
+def run(screen, reader):
+    """Main loop: redraw, then wait for a key (waking up to show finished searches)."""
+    try:
+        curses.curs_set(0)
+    except curses.error:
+        pass
+    screen.timeout(POLL_INTERVAL)
+    while True:
+        height, width = screen.getmaxyx()
+        reader.resize(width, height - 1)
+        reader.scroll(0)
+        reader.draw(screen)
+        try:
+            key = screen.get_wch()
+        except curses.error:
+            continue  # No key before the timeout
+        if key == curses.KEY_RESIZE:
+            continue
+        if not reader.handle_key(key):
+            break
+
+def read(versions, reference, record_history=True):
+    """Open the reader at a reference until it's closed. Raises ValueError for invalid references."""
+    versification = get_versification(versions[0]) or {}
+    start = parse_reference_expression(reference, versification)[0][0]
+    book_id, chapter, _ = unpack_verse_id(start)
+    if not get_verse_count(versification, book_id, chapter):
+        raise ValueError(f"{BOOK_BY_ID[book_id]} {chapter} is not in {versions[0]}")
+
+    pool = ConnectionPool(max_connections_per_version=2)
+    document = ChapterDocument(functools.partial(load_rows, pool, versions), versions, versification)
+    # Lay out the first chapter before the screen is taken over, so warnings (like a missing index) are seen
+    document.open(book_id, chapter)
+    search = IncrementalSearch(functools.partial(open_search_index, versions[0]))
+    history = HistoryBatch(versions[0]) if record_history else None
+    reader = Reader(document, search, history, functools.partial(load_verses, pool, versions[0]))
+    if start % 1000 == 1:
+        reader.top = document.chapter_start(book_id, chapter)
+    else:
+        reader.top = document.verse_line(start)
+        reader.mark = start
+    try:
+        curses.wrapper(run, reader)
+    finally:
+        search.close()
+        if history is not None:
+            history.flush()
+        pool.close()
+    return 0
@@ -1,10 +1,20 @@
 #!/usr/bin/env python3
 import os
+import sys
 import json
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: writes are still atomic, but concurrent updates aren't serialized
+    fcntl = None
 
 # Constants for history and favorites
 HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".rbible", "history.json")
 FAVORITES_FILE = os.path.join(os.path.expanduser("~"), ".rbible", "favorites.json")
+PLANS_FILE = os.path.join(os.path.expanduser("~"), ".rbible", "plans.json")
 MAX_HISTORY_ITEMS = 50  # Maximum number of items to keep in history
 
 def import_time_module():
@@ -12,34 +22,82 @@ def import_time_module():
     import time
     return time
 
+@contextmanager
+def locked(path):
+    """Hold an exclusive advisory lock on a data file while updating it.
+
+    The lock is taken on a separate .lock file, since the data file itself is replaced on every write.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".lock", 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def write_json_atomic(path, data, indent=None):
+    """Write JSON to a temporary file next to path and rename it over path, so a crash never leaves a partial file."""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def update_json(path, update, default, indent=2):
+    """Apply update(data) to the current contents of a JSON file and save what it returns.
+
+    The file is re-read under its lock, so concurrent updates (e.g. several rbible
+    processes started by an editor) are applied one after the other and none is lost.
+    """
+    with locked(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = default()
+        except ValueError as e:
+            # Keep the unreadable file for the user instead of overwriting it
+            os.replace(path, path + ".corrupt")
+            print(f"Warning: Could not read {os.path.basename(path)} (moved to {os.path.basename(path)}.corrupt), starting over: {e}",
+                  file=sys.stderr)
+            data = default()
+        data = update(data)
+        write_json_atomic(path, data, indent)
+    return data
+
 def save_to_history(reference, text, version):
     """Save a verse reference to history."""
-    history = load_history()
-    
-    # Add new entry at the beginning
     new_entry = {
         "reference": reference,
         "text": text,
         "version": version,
         "timestamp": import_time_module().time()  # Current timestamp
     }
+    save_many_to_history([new_entry])
+
+def save_many_to_history(entries):
+    """Save several history entries (oldest first) with a single locked write."""
+    def add(history):
+        for new_entry in entries:
+            # Remove this reference if it already exists to avoid duplicates
+            history = [h for h in history if h["reference"] != new_entry["reference"]]
+            
+            # Add new entry at the beginning
+            history.insert(0, new_entry)
+        
+        # Trim history to maximum size
+        return history[:MAX_HISTORY_ITEMS]
     
-    # Remove this reference if it already exists to avoid duplicates
-    history = [h for h in history if h["reference"] != reference]
-    
-    # Add new entry at the beginning
-    history.insert(0, new_entry)
-    
-    # Trim history to maximum size
-    if len(history) > MAX_HISTORY_ITEMS:
-        history = history[:MAX_HISTORY_ITEMS]
-    
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
-    
-    # Save to file
-    with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+    update_json(HISTORY_FILE, add, list)
 
 def load_history():
     """Load verse history."""
@@ -77,8 +135,6 @@ def show_history(count=10):
 
 def save_to_favorites(reference, text, version, name=None):
     """Save a verse reference to favorites with optional name."""
-    favorites = load_favorites()
-    
     # Create new entry
     new_entry = {
         "reference": reference,
@@ -88,22 +144,19 @@ def save_to_favorites(reference, text, version, name=None):
         "added": import_time_module().time()  # Current timestamp
     }
     
-    # Check if this reference already exists
-    for i, fav in enumerate(favorites):
-        if fav["reference"] == reference:
-            # Update existing entry
-            favorites[i] = new_entry
-            break
-    else:
-        # Add new entry if not found
-        favorites.append(new_entry)
-    
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(FAVORITES_FILE), exist_ok=True)
+    def add(favorites):
+        # Check if this reference already exists
+        for i, fav in enumerate(favorites):
+            if fav["reference"] == reference:
+                # Update existing entry
+                favorites[i] = new_entry
+                break
+        else:
+            # Add new entry if not found
+            favorites.append(new_entry)
+        return favorites
     
-    # Save to file
-    with open(FAVORITES_FILE, 'w', encoding='utf-8') as f:
-        json.dump(favorites, f, ensure_ascii=False, indent=2)
+    update_json(FAVORITES_FILE, add, list)
     
     print(f"Added to favorites: {reference}")
 
@@ -156,25 +209,13 @@ def show_favorites(index=None):
     
     return None
 
-def remove_favorite(index_or_reference):
-    """Remove a verse from favorites by index or reference."""
-    favorites = load_favorites()
-    
-    if not favorites:
-        print("No favorites found.")
-        return False
-    
+def find_favorite(favorites, index_or_reference):
+    """Find the position of a favorite by 1-based index or reference, or None."""
     # Try to interpret as index (1-based)
     try:
         index = int(index_or_reference) - 1
         if 0 <= index < len(favorites):
-            removed = favorites.pop(index)
-            print(f"Removed from favorites: {removed['reference']}")
-            
-            # Save updated favorites
-            with open(FAVORITES_FILE, 'w', encoding='utf-8') as f:
-                json.dump(favorites, f, ensure_ascii=False, indent=2)
-            return True
+            return index
     except ValueError:
         # Not an integer, try as reference
         pass
@@ -182,13 +223,47 @@ def remove_favorite(index_or_reference):
     # Try to find by reference
     for i, fav in enumerate(favorites):
         if fav["reference"].lower() == index_or_reference.lower():
-            removed = favorites.pop(i)
-            print(f"Removed from favorites: {removed['reference']}")
-            
-            # Save updated favorites
-            with open(FAVORITES_FILE, 'w', encoding='utf-8') as f:
-                json.dump(favorites, f, ensure_ascii=False, indent=2)
-            return True
+            return i
+    return None
+
+def remove_favorite(index_or_reference):
+    """Remove a verse from favorites by index or reference."""
+    if not load_favorites():
+        print("No favorites found.")
+        return False
+    
+    # Looked up again under the lock, in case another process changed the favorites
+    removed = []
+    def remove(favorites):
+        index = find_favorite(favorites, index_or_reference)
+        if index is not None:
+            removed.append(favorites.pop(index))
+        return favorites
+    
+    update_json(FAVORITES_FILE, remove, list)
+    if removed:
+        print(f"Removed from favorites: {removed[0]['reference']}")
+        return True
     
     print(f"No favorite found with index or reference: {index_or_reference}")
-    return False
\ No newline at end of file
+    return False
+
+def new_plans():
+    """Get an empty store of reading plans."""
+    return {"active": None, "plans": {}}
+
+def load_plans():
+    """Load reading plans and their progress."""
+    if not os.path.exists(PLANS_FILE):
+        return new_plans()
+    
+    try:
+        with open(PLANS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Warning: Could not load reading plans: {e}")
+        return new_plans()
+
+def update_plans(update):
+    """Apply update(plans) to the reading plans under their lock and save what it returns."""
+    return update_json(PLANS_FILE, update, new_plans, indent=None)
@@ -1,23 +1,26 @@
 #!/usr/bin/env python3
 import sys
-import sqlite3
+import heapq
+from itertools import groupby
 from rbible.bible_data import get_book_id, BOOK_BY_ID
+from rbible.schema import get_adapter
 
-def parse_reference(reference):
-    """Parse a Bible reference like 'Juan 3:16' or 'Juan 3:16-20' into book, chapter, verse(s)."""
+def split_reference(reference):
+    """Split a Bible reference like 'Juan 3:16' or 'Juan 3:16-20' into book, chapter, verse(s).
+    
+    Raises ValueError for malformed references.
+    """
     parts = reference.split()
     if len(parts) < 2:
-        print(f"Error: Invalid reference format. Use 'Book Chapter:Verse' or 'Book Chapter:Verse-Verse' format.")
-        sys.exit(1)
+        raise ValueError("Invalid reference format. Use 'Book Chapter:Verse' or 'Book Chapter:Verse-Verse' format.")
     
     book = ' '.join(parts[:-1])
     chapter_verse = parts[-1]
     
     if ':' not in chapter_verse:
-        print(f"Error: Invalid chapter:verse format. Use 'Book Chapter:Verse' format.")
-        sys.exit(1)
+        raise ValueError("Invalid chapter:verse format. Use 'Book Chapter:Verse' format.")
     
-    chapter, verse_range = chapter_verse.split(':')
+    chapter, verse_range = chapter_verse.split(':', 1)
     
     try:
         chapter = int(chapter)
@@ -32,9 +35,23 @@ def parse_reference(reference):
             verse = int(verse_range)
             return book, chapter, verse
     except ValueError:
-        print(f"Error: Chapter and verse must be numbers.")
+        raise ValueError("Chapter and verse must be numbers.")
+
+def parse_reference(reference):
+    """Parse a Bible reference like 'Juan 3:16' or 'Juan 3:16-20' into book, chapter, verse(s)."""
+    try:
+        return split_reference(reference)
+    except ValueError as e:
+        print(f"Error: {e}")
         sys.exit(1)
 
+def format_reference(book, chapter, verse):
+    """Format book, chapter and verse (or (start, end) range) as a reference string."""
+    if isinstance(verse, tuple):
+        start_verse, end_verse = verse
+        return f"{book} {chapter}:{start_verse}-{end_verse}"
+    return f"{book} {chapter}:{verse}"
+
 def format_strongs(text):
     """Format Strong's numbers in a cleaner way."""
     import re
@@ -57,70 +74,84 @@ def format_strongs(text):
 def get_verse(bible_conn, book, chapter, verse):
     """Get the specified verse or verse range from the Bible database."""
     try:
-        cursor = bible_conn.cursor()
-        
-        # Check which table structure we have
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [t[0] for t in cursor.fetchall()]
+        book_id = get_book_id(book)
+        if book_id is None:
+            raise ValueError(f"Book '{book}' not found")
         
-        if 'verses' in tables:
-            cursor.execute("""
-                SELECT text 
-                FROM verses v
-                JOIN books b ON v.book_number = b.book_number
-                WHERE (b.short_name LIKE ? OR b.long_name LIKE ?)
-                AND v.chapter = ? AND v.verse = ?
-            """, (f"%{book}%", f"%{book}%", chapter, verse))
+        # A verse range is fetched with a single ranged query
+        if isinstance(verse, tuple):
+            start_verse, end_verse = verse
+            rows = get_adapter(bible_conn).fetch_chapter(book_id, chapter, start_verse, end_verse)
+            if not rows:
+                raise ValueError(f"Verses not found: {book} {chapter}:{start_verse}-{end_verse}")
             
-        else:
-            book_id = get_book_id(book)
-            cursor.execute("""
-                SELECT Scripture 
-                FROM Bible 
-                WHERE Book = ? AND Chapter = ? AND Verse = ?
-            """, (book_id, chapter, verse))
+            # Number each verse of the range on its own line
+            return '\n'.join(f"{number}. {format_strongs(text.strip())}" for number, text in rows)
         
-        row = cursor.fetchone()
-        if not row:
+        text = get_adapter(bible_conn).fetch_verse(book_id, chapter, verse)
+        if text is None:
             raise ValueError(f"Verse not found: {book} {chapter}:{verse}")
             
         # Format Strong's numbers in the verse text
-        return format_strongs(row[0].strip())
+        return format_strongs(text.strip())
         
     except Exception as e:
         raise Exception(f"Error retrieving verse: {e}")
-    finally:
-        if 'cursor' in locals():
-            cursor.close()
+
+def get_verses(bible_conn, book, chapter, start_verse, end_verse):
+    """Get the verses of a range as a list of (verse number, text) tuples."""
+    rows = get_adapter(bible_conn).fetch_chapter(get_book_id(book), chapter, start_verse, end_verse)
+    return [(number, format_strongs(text.strip())) for number, text in rows]
+
+def iter_verses_in_ranges(bible_conn, ranges):
+    """Yield the (verse id, text) tuples of sorted (start id, end id) ranges, in order.
+
+    All the ranges of a book are fetched with a single query, read row by row.
+    """
+    for verse_id, text in get_adapter(bible_conn).fetch_ranges(ranges):
+        yield verse_id, format_strongs(text.strip())
+
+def get_verses_in_ranges(bible_conn, ranges):
+    """Get the verses of sorted (start id, end id) ranges as a list of (verse id, text) tuples.
+
+    All the ranges of a book are fetched with a single query.
+    """
+    return list(iter_verses_in_ranges(bible_conn, ranges))
+
+def iter_parallel_rows(bible_conns, ranges):
+    """Yield one (verse id, [text per version]) row per verse of the ranges, merging several open Bibles.
+
+    Verses missing in a version get None. Every version is read as a stream, so only one row is in memory.
+    """
+    ranges = sorted(ranges)
+
+    def stream(index, conn):
+        for verse_id, text in iter_verses_in_ranges(conn, ranges):
+            yield verse_id, index, text
+
+    streams = [stream(index, conn) for index, conn in enumerate(bible_conns)]
+    for verse_id, verses in groupby(heapq.merge(*streams), key=lambda verse: verse[0]):
+        texts = [None] * len(bible_conns)
+        for _, index, text in verses:
+            texts[index] = text
+        yield verse_id, texts
+
+def get_raw_verse(bible_conn, book_id, chapter, verse):
+    """Get the unformatted text of a verse by book id, or None if it doesn't exist."""
+    return get_adapter(bible_conn).fetch_verse(book_id, chapter, verse)
+
+def iter_all_verses(bible_conn):
+    """Iterate over every verse as (book_id, chapter, verse, raw text), in biblical order."""
+    return get_adapter(bible_conn).iter_all()
 
 def search_bible(bible_conn, query, limit=20):
     """Search the Bible for verses containing the query text."""
     try:
-        cursor = bible_conn.cursor()
-        
-        # Use SQLite FTS if available, otherwise fall back to LIKE
-        try:
-            # Try using FTS (Full Text Search)
-            cursor.execute(
-                "SELECT Book, Chapter, Verse, Scripture FROM Bible WHERE Scripture MATCH ? LIMIT ?",
-                (query, limit)
-            )
-        except sqlite3.OperationalError:
-            # Fall back to LIKE search
-            cursor.execute(
-                "SELECT Book, Chapter, Verse, Scripture FROM Bible WHERE Scripture LIKE ? LIMIT ?",
-                (f"%{query}%", limit)
-            )
-        
-        results = cursor.fetchall()
-        
-        if not results:
-            print(f"No verses found containing '{query}'.")
-            return []
+        # Full-text tables are searched with MATCH, others with LIKE
+        results = get_adapter(bible_conn).search(query, limit)
         
         formatted_results = []
-        for row in results:
-            book_id, chapter, verse, text = row
+        for book_id, chapter, verse, text in results:
             book_name = BOOK_BY_ID.get(book_id, f"Book {book_id}")
             reference = f"{book_name} {chapter}:{verse}"
             
@@ -138,15 +169,13 @@ def search_bible(bible_conn, query, limit=20):
     except Exception as e:
         print(f"Error searching Bible: {e}")
         return []
-    finally:
-        if 'cursor' in locals():
-            cursor.close()
 
 def get_parallel_verses(verse_ref, versions):
     """Get the same verse in multiple translations."""
     # Fix the imports to use the rbible package prefix
     from rbible.bible_data import load_bible_version
     from rbible.user_data import save_to_history
+    from rbible.catalog import get_versification, check_reference, clamp_verse_range
     
     results = []
     
@@ -156,14 +185,22 @@ def get_parallel_verses(verse_ref, versions):
         for version in versions:
             try:
                 bible_conn = load_bible_version(version)
-                verse_text = get_verse(bible_conn, book, chapter, verse)
+                
+                # Reject references outside this version's versification before querying
+                versification = get_versification(version, bible_conn)
+                version_verse = verse
+                if versification:
+                    check_reference(versification, book, chapter, verse)
+                    version_verse = clamp_verse_range(versification, book, chapter, verse)
+                
+                verse_text = get_verse(bible_conn, book, chapter, version_verse)
                 
                 # Format the reference string
-                if isinstance(verse, tuple):
-                    start_verse, end_verse = verse
+                if isinstance(version_verse, tuple):
+                    start_verse, end_verse = version_verse
                     verse_str = f"{start_verse}-{end_verse}"
                 else:
-                    verse_str = str(verse)
+                    verse_str = str(version_verse)
                 
                 ref_str = f"{book} {chapter}:{verse_str}"
                 
@@ -191,9 +228,15 @@ def get_parallel_verses(verse_ref, versions):
     
     return results
 
-def complete_reference(partial_ref):
-    """Provide tab completion suggestions for Bible references."""
-    from rbible.bible_data import BIBLE_BOOKS, BOOK_BY_SHORT, get_book_id
+def complete_reference(partial_ref, versification=None):
+    """Provide tab completion suggestions for Bible references.
+    
+    With a versification table (see rbible.catalog) chapters and verses are
+    suggested exactly; without one, common numbers are suggested.
+    """
+    from rbible.bible_data import get_book_id
+    from rbible.book_index import complete_book
+    from rbible.catalog import get_chapter_count, get_verse_count
     
     suggestions = []
     
@@ -204,31 +247,27 @@ def complete_reference(partial_ref):
     # Split into parts
     parts = partial_ref.split()
     
-    # If only one part, it's likely a book name
-    if len(parts) == 1:
-        book_part = parts[0].lower()
-        
-        # Suggest books that start with the given prefix
-        for book_name in BIBLE_BOOKS.keys():
-            if book_name.lower().startswith(book_part):
-                suggestions.append(book_name)
-        
-        # Also check short codes
-        for short_code, book_name in BOOK_BY_SHORT.items():
-            if short_code.lower().startswith(book_part):
-                suggestions.append(book_name)
+    # A trailing number is a chapter unless it is all we have so far (e.g. the "1" of "1 Juan")
+    has_chapter = len(parts) >= 2 and parts[-1].isdigit()
+    
+    # If there is no chapter yet, it's a (possibly partial) book name
+    if ':' not in parts[-1] and not has_chapter:
+        suggestions = complete_book(' '.join(parts))
     
     # If we have a book and possibly chapter
-    elif len(parts) == 2 and ':' not in parts[1]:
+    elif has_chapter:
         book = ' '.join(parts[:-1])
         chapter_prefix = parts[-1]
         
         # Get book ID
         book_id = get_book_id(book)
         if book_id is not None:
-            # This would require database access to get available chapters
-            # For simplicity, suggest some common chapter numbers
-            for i in range(1, 11):
+            if versification:
+                chapter_count = get_chapter_count(versification, book_id)
+            else:
+                # Without versification data, suggest some common chapter numbers
+                chapter_count = 10
+            for i in range(1, chapter_count + 1):
                 if str(i).startswith(chapter_prefix):
                     suggestions.append(f"{book} {i}:1")
     
@@ -238,67 +277,16 @@ def complete_reference(partial_ref):
         chapter_verse = parts[-1]
         
         if ':' in chapter_verse:
-            chapter, verse_prefix = chapter_verse.split(':')
+            chapter, verse_prefix = chapter_verse.split(':', 1)
             
-            # For simplicity, suggest some verse numbers
-            for i in range(1, 31):
+            book_id = get_book_id(book)
+            if versification and book_id is not None and chapter.isdigit():
+                verse_count = get_verse_count(versification, book_id, int(chapter))
+            else:
+                # Without versification data, suggest some verse numbers
+                verse_count = 30
+            for i in range(1, verse_count + 1):
                 if str(i).startswith(verse_prefix):
                     suggestions.append(f"{book} {chapter}:{i}")
     
     return suggestions
-
-def format_as_markdown(reference, text, version=None):
-    """Format verse text as markdown with proper quote formatting."""
-    # Create the header with reference and version
-    if version:
-        header = f"> **{reference}({version})**"
-    else:
-        header = f"> **{reference}**"
-    
-    # Format the text with proper markdown quote formatting
-    # Split the text into lines and add > to each line
-    lines = text.split('\n')
-    formatted_lines = []
-    
-    # Add the header
-    formatted_lines.append(header)
-    formatted_lines.append(">")  # Empty line after header
-    
-    # Add each line of the verse text with > prefix
-    for line in lines:
-        formatted_lines.append(f"> {line}")
-    
-    # Join all lines with newlines
-    return '\n'.join(formatted_lines)
-
-def format_parallel_verses(results, use_markdown=False):
-    """Format parallel verses for display."""
-    if not results:
-        return "No verses found."
-    
-    output_lines = []
-    
-    for result in results:
-        version = result.get("version", "Unknown")
-        reference = result.get("reference", "Unknown")
-        
-        if "error" in result:
-            output_lines.append(f"## {version}")
-            output_lines.append(f"Error: {result['error']}")
-        else:
-            if use_markdown:
-                # For markdown, format with proper headers and quote formatting
-                output_lines.append(f"## {version}")
-                output_lines.append(f"> **{reference}({version})**")
-                output_lines.append(">")  # Empty line
-                
-                # Add each line of text with > prefix
-                for line in result["text"].split('\n'):
-                    output_lines.append(f"> {line}")
-            else:
-                output_lines.append(f"{reference} ({version})")
-                output_lines.append(result["text"])
-        
-        output_lines.append("")  # Empty line between versions
-    
-    return '\n'.join(output_lines)
\ No newline at end of file
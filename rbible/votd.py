@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Verse of the day: a deterministic pick per date, pre-rendered into a small cache file.
+"""
+
+import os
+import json
+import bisect
+import hashlib
+import datetime
+
+from rbible.bible_data import load_bible_version, pack_verse_id
+from rbible.catalog import get_versification
+from rbible.references import (
+    parse_reference_expression, group_verses_by_range, format_verse_group, format_verse_range
+)
+from rbible.user_data import load_favorites
+from rbible.verse_operations import get_verses_in_ranges
+
+VOTD_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".rbible", "cache", "votd.json")
+
+SOURCES = ("curated", "favorites", "bible")
+
+# Well-known verses for the curated pool
+CURATED_VERSES = [
+    "Génesis 1:1", "Josué 1:9", "Números 6:24-26", "Deuteronomio 31:8", "1 Samuel 16:7",
+    "Salmos 1:1-2", "Salmos 16:11", "Salmos 23:1", "Salmos 27:1", "Salmos 34:8",
+    "Salmos 37:4", "Salmos 46:1", "Salmos 46:10", "Salmos 91:1-2", "Salmos 103:1-2",
+    "Salmos 118:24", "Salmos 119:105", "Salmos 121:1-2", "Salmos 139:14", "Proverbios 3:5-6",
+    "Proverbios 16:3", "Proverbios 18:10", "Eclesiastés 3:1", "Isaías 26:3", "Isaías 40:31",
+    "Isaías 41:10", "Isaías 43:2", "Jeremías 29:11", "Lamentaciones 3:22-23", "Miqueas 6:8",
+    "Sofonías 3:17", "Mateo 5:14-16", "Mateo 6:33", "Mateo 11:28-30", "Mateo 28:19-20",
+    "Marcos 10:27", "Lucas 1:37", "Juan 1:1", "Juan 3:16", "Juan 8:12",
+    "Juan 14:6", "Juan 14:27", "Juan 15:5", "Juan 16:33", "Hechos 1:8",
+    "Romanos 5:8", "Romanos 8:28", "Romanos 8:38-39", "Romanos 12:2", "Romanos 15:13",
+    "1 Corintios 10:13", "1 Corintios 13:4-7", "2 Corintios 5:17", "2 Corintios 12:9", "Gálatas 2:20",
+    "Gálatas 5:22-23", "Efesios 2:8-9", "Efesios 3:20", "Filipenses 4:6-7", "Filipenses 4:13",
+    "Filipenses 4:19", "Colosenses 3:23", "2 Timoteo 1:7", "Hebreos 11:1", "Hebreos 13:8",
+    "Santiago 1:5", "1 Pedro 5:7", "1 Juan 1:9", "1 Juan 4:19", "Apocalipsis 21:4",
+]
+
+# Relative weight of a verse of each book in the whole-Bible pool (1 otherwise)
+BOOK_WEIGHTS = {
+    19: 4, 20: 3, 23: 2,                # Salmos, Proverbios, Isaías
+    40: 3, 41: 3, 42: 3, 43: 3,         # Gospels
+    **{book_id: 3 for book_id in range(45, 66)},  # Epistles
+    4: 0.2, 13: 0.2,                    # Números, 1 Crónicas (census lists and genealogies)
+}
+
+def _seed(date, source):
+    """Get a number that is the same for a date and source on every machine."""
+    return int(hashlib.sha256(f"{date.isoformat()}:{source}".encode()).hexdigest()[:16], 16)
+
+def pick_weighted_verse(versification, seed):
+    """Pick a verse from the whole Bible, with BOOK_WEIGHTS, as a reference."""
+    # Cumulative weights per chapter, so the pick is a bisect instead of a walk over verses
+    chapters = []
+    totals = []
+    total = 0
+    for book_id in sorted(versification):
+        weight = BOOK_WEIGHTS.get(book_id, 1)
+        for chapter, verse_count in enumerate(versification[book_id], 1):
+            if verse_count:
+                total += verse_count * weight
+                chapters.append((book_id, chapter, weight))
+                totals.append(total)
+
+    point = (seed % 10**9) / 10**9 * total
+    i = min(bisect.bisect_right(totals, point), len(chapters) - 1)
+    book_id, chapter, weight = chapters[i]
+    verse = int((point - (totals[i - 1] if i else 0)) / weight) + 1
+    verse = min(verse, versification[book_id][chapter - 1])
+
+    verse_id = pack_verse_id(book_id, chapter, verse)
+    return format_verse_range(verse_id, verse_id)
+
+def pick_reference(date, source="curated", versification=None, favorites=None):
+    """Pick the reference of the verse of the day for a date.
+
+    Returns None if the source has nothing to pick from.
+    """
+    seed = _seed(date, source)
+    if source == "favorites":
+        favorites = load_favorites() if favorites is None else favorites
+        if not favorites:
+            return None
+        return favorites[seed % len(favorites)]["reference"]
+    if source == "bible":
+        if not versification:
+            return None
+        return pick_weighted_verse(versification, seed)
+    return CURATED_VERSES[seed % len(CURATED_VERSES)]
+
+def render_reference(bible_conn, reference, versification=None):
+    """Get a reference's display reference and text from an open Bible."""
+    ranges = parse_reference_expression(reference, versification)
+    groups = group_verses_by_range(ranges, get_verses_in_ranges(bible_conn, ranges))
+    if not groups:
+        raise ValueError(f"Verses not found: {reference}")
+
+    rendered = [format_verse_group(group) for group in groups]
+    return "; ".join(ref for ref, _ in rendered), "\n".join(text for _, text in rendered)
+
+def build_days(start, days, versions, source="curated"):
+    """Pick and render the verse of the day of several days in several versions.
+
+    Returns {date: {"reference": ..., "texts": {version: text}}}; dates with nothing to pick are skipped.
+    """
+    connections = {version: load_bible_version(version) for version in versions}
+    versifications = {version: get_versification(version) for version in versions}
+    favorites = load_favorites() if source == "favorites" else None
+    try:
+        rendered = {}
+        for offset in range(days):
+            date = start + datetime.timedelta(days=offset)
+            reference = pick_reference(date, source, versifications[versions[0]], favorites)
+            if reference is None:
+                continue
+
+            entry = {"reference": reference, "texts": {}}
+            for version in versions:
+                if not connections[version]:
+                    continue
+                try:
+                    entry["reference"], entry["texts"][version] = render_reference(connections[version], reference, versifications[version])
+                except Exception as e:
+                    entry.setdefault("errors", {})[version] = str(e)
+            rendered[date.isoformat()] = entry
+        return rendered
+    finally:
+        for conn in connections.values():
+            if conn:
+                conn.close()
+
+def load_votd_cache():
+    """Load the pre-rendered verses of the day."""
+    try:
+        with open(VOTD_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_votd_cache(cache):
+    """Save the pre-rendered verses of the day."""
+    os.makedirs(os.path.dirname(VOTD_CACHE_FILE), exist_ok=True)
+    temp_path = VOTD_CACHE_FILE + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(temp_path, VOTD_CACHE_FILE)
+
+def render_cache(start, days, versions, source="curated"):
+    """Pre-render the next days into the cache, dropping the days that already passed."""
+    cache = load_votd_cache()
+    if cache.get("source") != source or cache.get("versions") != versions:
+        cache = {"source": source, "versions": versions, "days": {}}
+
+    today = start.isoformat()
+    cache["days"] = {date: entry for date, entry in cache.get("days", {}).items() if date >= today}
+    cache["days"].update(build_days(start, days, versions, source))
+    save_votd_cache(cache)
+    return cache
+
+def get_verse_of_the_day(date, version=None, source=None):
+    """Get the verse of the day as {"date", "reference", "version", "text"}, from the cache if possible.
+
+    The version's error replaces the text when it can't show the verse; returns None if there is no verse to pick.
+    """
+    cache = load_votd_cache()
+    source = source or cache.get("source", "curated")
+    version = version or (cache.get("versions") or [None])[0]
+
+    entry = cache.get("days", {}).get(date.isoformat()) if cache.get("source") == source else None
+    if not entry or version not in entry.get("texts", {}) and version not in entry.get("errors", {}):
+        if not version:
+            return None
+        entry = build_days(date, 1, [version], source).get(date.isoformat())
+        if not entry:
+            return None
+
+    result = {"date": date.isoformat(), "reference": entry["reference"], "version": version}
+    if version in entry["texts"]:
+        result["text"] = entry["texts"][version]
+    else:
+        result["error"] = entry["errors"][version]
+    return result
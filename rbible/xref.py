@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+import os
+import bisect
+import sqlite3
+from collections import defaultdict
+
+from rbible.bible_data import pack_verse_id, BOOK_ID_BY_OSIS_CODE, BOOK_ID_BY_MYBIBLE_NUMBER
+
+XREF_FILE = os.path.join(os.path.expanduser("~"), ".rbible", "crossreferences.db")
+
+# Each step away from the looked up verses counts half as much
+DEPTH_DECAY = 0.5
+
+# Ranges per query when expanding many verses at once (SQLite allows 999 parameters)
+BATCH_SIZE = 400
+
+def parse_osis_verse(text):
+    """Parse an OSIS verse like "Gen.1.1" into a packed verse id."""
+    book, chapter, verse = text.strip().split('.')
+    return pack_verse_id(BOOK_ID_BY_OSIS_CODE[book], int(chapter), int(verse))
+
+def parse_osis_range(text):
+    """Parse an OSIS verse or range like "Prov.8.22-Prov.8.30" into (start id, end id)."""
+    start, _, end = text.partition('-')
+    start_id = parse_osis_verse(start)
+    return start_id, parse_osis_verse(end) if end else start_id
+
+def iter_tsv_edges(path):
+    """Iterate over the (source id, target start id, target end id, votes) of an OpenBible.info style TSV."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 2:
+                continue
+            try:
+                # Source ranges are expanded to each of their verses
+                source_start, source_end = parse_osis_range(fields[0])
+                target_start, target_end = parse_osis_range(fields[1])
+                votes = int(fields[2]) if len(fields) > 2 and fields[2].lstrip('-').isdigit() else 1
+            except (KeyError, ValueError):
+                # Header and malformed lines
+                continue
+            # Packed ids are only consecutive within a chapter
+            if source_end // 1000 != source_start // 1000:
+                source_end = source_start
+            for source in range(source_start, source_end + 1):
+                yield source, target_start, target_end, votes
+
+def iter_mybible_edges(conn):
+    """Iterate over the edges of a MyBible .crossreferences module, like iter_tsv_edges()."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(cross_references)")]
+    votes_column = "votes" if "votes" in columns else "1"
+    cursor = conn.execute(f"""
+        SELECT book, chapter, verse, verse_end, book_to, chapter_to, verse_to_start, verse_to_end, {votes_column}
+        FROM cross_references
+    """)
+    for book, chapter, verse, verse_end, book_to, chapter_to, verse_to_start, verse_to_end, votes in cursor:
+        book_id = BOOK_ID_BY_MYBIBLE_NUMBER.get(book)
+        book_to_id = BOOK_ID_BY_MYBIBLE_NUMBER.get(book_to)
+        if book_id is None or book_to_id is None:
+            continue
+        target_start = pack_verse_id(book_to_id, chapter_to, verse_to_start)
+        target_end = pack_verse_id(book_to_id, chapter_to, max(verse_to_end or 0, verse_to_start))
+        for source_verse in range(verse, max(verse_end or 0, verse) + 1):
+            yield pack_verse_id(book_id, chapter, source_verse), target_start, target_end, votes or 1
+
+def import_crossreferences(path, xref_file=None):
+    """Import a cross-reference dataset (MyBible module or TSV) as the adjacency table, replacing any previous one.
+
+    Returns the number of edges imported.
+    """
+    xref_file = xref_file or XREF_FILE
+
+    # Keep the best vote count of duplicate edges
+    edges = {}
+    with open(path, 'rb') as f:
+        is_sqlite = f.read(16) == b"SQLite format 3\x00"
+    if is_sqlite:
+        source_conn = sqlite3.connect(path)
+        try:
+            for source, target_start, target_end, votes in iter_mybible_edges(source_conn):
+                key = (source, target_start, target_end)
+                edges[key] = max(edges.get(key, votes), votes)
+        finally:
+            source_conn.close()
+    else:
+        for source, target_start, target_end, votes in iter_tsv_edges(path):
+            key = (source, target_start, target_end)
+            edges[key] = max(edges.get(key, votes), votes)
+
+    os.makedirs(os.path.dirname(xref_file), exist_ok=True)
+    temp_path = xref_file + ".tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    conn = sqlite3.connect(temp_path)
+    try:
+        # Clustered by source, so the neighbors of a verse are one contiguous range of the table
+        conn.execute("""
+            CREATE TABLE edges (
+                source INTEGER NOT NULL,
+                target_start INTEGER NOT NULL,
+                target_end INTEGER NOT NULL,
+                votes INTEGER NOT NULL,
+                PRIMARY KEY (source, target_start, target_end)
+            ) WITHOUT ROWID
+        """)
+        conn.executemany(
+            "INSERT INTO edges VALUES (?, ?, ?, ?)",
+            ((source, target_start, target_end, votes) for (source, target_start, target_end), votes in sorted(edges.items()))
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(temp_path, xref_file)
+    return len(edges)
+
+def get_neighbors(conn, ranges):
+    """Get the cross-references of many verse ranges at once.
+
+    ranges is a list of (start id, end id); returns {range: [(target start id, target end id, votes)]}.
+    """
+    ranges = sorted(set(ranges))
+    rows = []
+    for i in range(0, len(ranges), BATCH_SIZE):
+        batch = ranges[i:i + BATCH_SIZE]
+        where = " OR ".join(["source BETWEEN ? AND ?"] * len(batch))
+        params = [value for verse_range in batch for value in verse_range]
+        rows.extend(conn.execute(f"SELECT source, target_start, target_end, votes FROM edges WHERE {where}", params))
+    rows.sort()
+
+    # Ranges may overlap, so hand each one the rows of its own span
+    sources = [row[0] for row in rows]
+    neighbors = {}
+    for start, end in ranges:
+        first = bisect.bisect_left(sources, start)
+        last = bisect.bisect_right(sources, end)
+        neighbors[(start, end)] = [row[1:] for row in rows[first:last]]
+    return neighbors
+
+def related_verses(conn, ranges, depth=1, limit=20):
+    """Rank the verses related to some verse ranges by following cross-references up to depth steps.
+
+    Returns a list of dicts with the target range, its score and the depth it was first reached at.
+    """
+    roots = set(ranges)
+    scores = defaultdict(float)
+    depths = {}
+
+    frontier = roots
+    for level in range(1, depth + 1):
+        neighbors = get_neighbors(conn, list(frontier))
+        next_frontier = set()
+        for verse_range in frontier:
+            for target_start, target_end, votes in neighbors[verse_range]:
+                target = (target_start, target_end)
+                # Skip links back into the looked up verses
+                if any(start <= target_start and target_end <= end for start, end in roots):
+                    continue
+                # Weighted by votes: negative ones mean people disagreed with the link, so disputed links rank last
+                scores[target] += votes * DEPTH_DECAY ** (level - 1)
+                if target not in depths:
+                    depths[target] = level
+                    next_frontier.add(target)
+        frontier = next_frontier
+        if not frontier:
+            break
+
+    ranked = sorted(scores, key=lambda target: (-scores[target], depths[target], target))
+    if limit:
+        ranked = ranked[:limit]
+    return [{"start": start, "end": end, "score": round(scores[(start, end)], 2), "depth": depths[(start, end)]} for start, end in ranked]
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the test modules: test Bible databases and patches.
+"""
+
+import sqlite3
+
+def create_test_bible(path, rows):
+    """Create a Bible database using the Bible/Scripture schema from (book, chapter, verse, text) rows."""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Bible (Book INTEGER, Chapter INTEGER, Verse INTEGER, Scripture TEXT)")
+    conn.executemany("INSERT INTO Bible VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+def start_patches(test_case, patches):
+    """Start patches for a test, stopping them when it ends."""
+    for p in patches:
+        p.start()
+        test_case.addCleanup(p.stop)
@@ -11,6 +11,26 @@ from tests.test_bible_data import TestBibleData
 from tests.test_verse_operations import TestVerseOperations
 from tests.test_user_data import TestUserData
 from tests.test_formatters import TestFormatters
+from tests.test_catalog import TestCatalog
+from tests.test_book_index import TestBookIndex
+from tests.test_http_server import TestHTTPServer
+from tests.test_concordance import TestConcordance
+from tests.test_strongs import TestStrongs
+from tests.test_xref import TestXref
+from tests.test_references import TestReferences
+from tests.test_plans import TestPlans
+from tests.test_votd import TestVotd
+from tests.test_clipboard import TestClipboard
+from tests.test_schema import TestSchema
+from tests.test_optimize import TestOptimize
+from tests.test_semantic import TestSemantic
+from tests.test_diff import TestDiff
+from tests.test_annotations import TestAnnotations
+from tests.test_config import TestConfig
+from tests.test_render_cache import TestRenderCache
+from tests.test_tui import TestTui
+from tests.test_completions import TestCompletions
+from tests.test_rbible import TestRbible
 
 if __name__ == '__main__':
     # Create a test suite
@@ -21,6 +41,26 @@ if __name__ == '__main__':
     test_suite.addTest(unittest.makeSuite(TestVerseOperations))
     test_suite.addTest(unittest.makeSuite(TestUserData))
     test_suite.addTest(unittest.makeSuite(TestFormatters))
+    test_suite.addTest(unittest.makeSuite(TestCatalog))
+    test_suite.addTest(unittest.makeSuite(TestBookIndex))
+    test_suite.addTest(unittest.makeSuite(TestHTTPServer))
+    test_suite.addTest(unittest.makeSuite(TestConcordance))
+    test_suite.addTest(unittest.makeSuite(TestStrongs))
+    test_suite.addTest(unittest.makeSuite(TestXref))
+    test_suite.addTest(unittest.makeSuite(TestReferences))
+    test_suite.addTest(unittest.makeSuite(TestPlans))
+    test_suite.addTest(unittest.makeSuite(TestVotd))
+    test_suite.addTest(unittest.makeSuite(TestClipboard))
+    test_suite.addTest(unittest.makeSuite(TestSchema))
+    test_suite.addTest(unittest.makeSuite(TestOptimize))
+    test_suite.addTest(unittest.makeSuite(TestSemantic))
+    test_suite.addTest(unittest.makeSuite(TestDiff))
+    test_suite.addTest(unittest.makeSuite(TestAnnotations))
+    test_suite.addTest(unittest.makeSuite(TestConfig))
+    test_suite.addTest(unittest.makeSuite(TestRenderCache))
+    test_suite.addTest(unittest.makeSuite(TestTui))
+    test_suite.addTest(unittest.makeSuite(TestCompletions))
+    test_suite.addTest(unittest.makeSuite(TestRbible))
     
     # Run the tests
     runner = unittest.TextTestRunner(verbosity=2)
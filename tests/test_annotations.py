@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import unittest
+import io
+import json
+import os
+import tempfile
+
+from rbible import annotations
+from rbible.bible_data import pack_verse_id
+
+def rom(chapter, verse):
+    return pack_verse_id(45, chapter, verse)
+
+class TestAnnotations(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.conn = annotations.connect_annotations(os.path.join(self.temp_dir.name, "annotations.db"))
+        self.chapter_note = annotations.add_annotation(self.conn, rom(8, 1), rom(8, 39), "note", "Vida en el Espíritu")
+        self.highlight = annotations.add_annotation(self.conn, rom(8, 28), rom(8, 28), "highlight", color="yellow")
+        self.cross_note = annotations.add_annotation(self.conn, rom(7, 24), rom(8, 2), "note", "¿Quién me librará?")
+        self.other = annotations.add_annotation(self.conn, rom(12, 1), rom(12, 2), "note", "Sacrificio vivo")
+
+    def tearDown(self):
+        self.conn.close()
+        self.temp_dir.cleanup()
+
+    def test_overlap_queries(self):
+        """Test finding the annotations overlapping ranges, sorted by start"""
+        found = annotations.get_annotations(self.conn, [(rom(8, 1), rom(8, 39))])
+        self.assertEqual([a["id"] for a in found], [self.cross_note, self.chapter_note, self.highlight])
+
+        found = annotations.get_annotations(self.conn, [(rom(8, 28), rom(8, 28)), (rom(12, 2), rom(12, 5))])
+        self.assertEqual([a["id"] for a in found], [self.chapter_note, self.highlight, self.other])
+        self.assertEqual(annotations.get_annotations(self.conn, [(rom(9, 1), rom(11, 36))]), [])
+        self.assertEqual(len(annotations.get_annotations(self.conn)), 4)
+
+        # The packed ids are stored exactly
+        self.assertEqual(found[0]["end"], rom(8, 39))
+
+        with self.assertRaises(ValueError):
+            annotations.add_annotation(self.conn, rom(8, 2), rom(8, 1), "note", "x")
+        self.assertTrue(annotations.remove_annotation(self.conn, self.other))
+        self.assertFalse(annotations.remove_annotation(self.conn, self.other))
+        self.assertEqual(annotations.get_annotations(self.conn, [(rom(12, 1), rom(12, 1))]), [])
+
+    def test_merge_annotations(self):
+        """Test pairing verses with the annotations covering them in one pass"""
+        verses = [(rom(8, verse), f"v{verse}") for verse in (2, 3, 28)]
+        found = annotations.get_annotations(self.conn, [(rom(8, 2), rom(8, 28))])
+        merged = [(verse_id, [a["id"] for a in covering]) for verse_id, _, covering in annotations.merge_annotations(verses, found)]
+        self.assertEqual(merged, [
+            (rom(8, 2), [self.cross_note, self.chapter_note]),
+            (rom(8, 3), [self.chapter_note]),
+            (rom(8, 28), [self.chapter_note, self.highlight]),
+        ])
+
+        # Notes of ranges starting earlier show at the first verse
+        self.assertEqual(annotations.annotate_verses(verses, found), [
+            (rom(8, 2), "v2 [Note: ¿Quién me librará?] [Note: Vida en el Espíritu]"),
+            (rom(8, 3), "v3"),
+            (rom(8, 28), "==v28=="),
+        ])
+
+    def test_export_import_round_trip(self):
+        """Test that exported annotations import back the same, once"""
+        out = io.StringIO()
+        self.assertEqual(annotations.export_annotations(self.conn, out), 4)
+        exported = json.loads(out.getvalue())
+
+        other = annotations.connect_annotations(os.path.join(self.temp_dir.name, "other.db"))
+        try:
+            self.assertEqual(annotations.import_annotations(other, exported), 4)
+            self.assertEqual(annotations.import_annotations(other, exported), 0)
+            again = io.StringIO()
+            annotations.export_annotations(other, again)
+            self.assertEqual(json.loads(again.getvalue()), exported)
+
+            with self.assertRaises(ValueError):
+                annotations.import_annotations(other, [{"kind": "note"}])
+        finally:
+            other.close()
+
+if __name__ == '__main__':
+    unittest.main()
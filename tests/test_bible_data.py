@@ -7,7 +7,7 @@ from unittest.mock import patch, MagicMock
 
 from rbible.bible_data import (
     get_book_id, BIBLE_BOOKS, BOOK_BY_SHORT, BOOK_BY_ID,
-    get_available_versions, load_bible_version
+    get_available_versions, load_bible_version, read_only_uri
 )
 
 class TestBibleData(unittest.TestCase):
@@ -40,6 +40,12 @@ class TestBibleData(unittest.TestCase):
         self.assertEqual(get_book_id("génesis"), 1)
         self.assertEqual(get_book_id("GEN"), 1)
         
+        # Test accent insensitivity and aliases
+        self.assertEqual(get_book_id("Genesis"), 1)
+        self.assertEqual(get_book_id("exodo"), 2)
+        self.assertEqual(get_book_id("Jn"), 43)
+        self.assertEqual(get_book_id("1  Juan"), 62)
+        
         # Test non-existent book
         self.assertIsNone(get_book_id("NonExistentBook"))
     
@@ -76,5 +82,23 @@ class TestBibleData(unittest.TestCase):
         mock_connect.assert_called_once()
         self.assertTrue('RVR.mybible' in mock_connect.call_args[0][0])
 
+    def test_read_only_uri(self):
+        """Test opening files whose path has URI characters, without write access"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "a#b?c%20d", "TEST.mybible")
+            os.makedirs(os.path.dirname(path))
+            conn = sqlite3.connect(path)
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.commit()
+            conn.close()
+
+            conn = sqlite3.connect(read_only_uri(path), uri=True)
+            try:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+                with self.assertRaises(sqlite3.OperationalError):
+                    conn.execute("INSERT INTO t VALUES (1)")
+            finally:
+                conn.close()
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
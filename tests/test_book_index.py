@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import unittest
+
+from rbible.book_index import complete_book, edit_distance
+
+class TestBookIndex(unittest.TestCase):
+    def test_edit_distance(self):
+        """Test bounded edit distance"""
+        self.assertEqual(edit_distance("isaias", "isaias", 2), 0)
+        self.assertEqual(edit_distance("isiaas", "isaias", 2), 2)
+        self.assertEqual(edit_distance("juan", "jueces", 1), 2)  # Exceeded, capped at max + 1
+    
+    def test_accent_insensitive_prefix(self):
+        """Test completing unaccented input"""
+        self.assertEqual(complete_book("Genesis")[0], "Génesis")
+        self.assertEqual(complete_book("Exodo")[0], "Éxodo")
+        self.assertEqual(complete_book("isaias")[0], "Isaías")
+        self.assertIn("Éxodo", complete_book("éx"))
+    
+    def test_ranking_and_duplicates(self):
+        """Test that exact matches rank first and books are not repeated"""
+        suggestions = complete_book("Jua")
+        self.assertEqual(suggestions[0], "Juan")
+        self.assertEqual(len(suggestions), len(set(suggestions)))
+        
+        # Short codes and aliases resolve to their book
+        self.assertEqual(complete_book("Jn")[0], "Juan")
+        self.assertEqual(complete_book("Hch")[0], "Hechos")
+        
+        # Numbered books
+        self.assertEqual(complete_book("1 Co"), ["1 Corintios"])
+    
+    def test_typos(self):
+        """Test typo-tolerant matching"""
+        self.assertEqual(complete_book("Isiaas")[0], "Isaías")
+        self.assertEqual(complete_book("Romnaos")[0], "Romanos")
+        self.assertEqual(complete_book("Apocalpsis")[0], "Apocalipsis")
+        self.assertEqual(complete_book("xyzzy"), [])
+    
+    def test_limit(self):
+        """Test limiting the number of suggestions"""
+        self.assertEqual(len(complete_book("1", limit=3)), 3)
+        self.assertGreater(len(complete_book("1", limit=None)), 3)
+
+if __name__ == '__main__':
+    unittest.main()
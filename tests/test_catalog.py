@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+from rbible import catalog
+from rbible.catalog import (
+    build_versification, get_versification, get_chapter_count, get_verse_count,
+    check_reference, clamp_verse_range
+)
+
+from tests.bible_fixtures import create_test_bible, start_patches
+
+ROWS = [(43, 1, v, f"Juan 1:{v}") for v in range(1, 52)]
+ROWS += [(43, 3, v, f"Juan 3:{v}") for v in range(1, 37)]
+ROWS += [(19, 23, v, f"Salmos 23:{v}") for v in range(1, 7)]
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.bible_path = os.path.join(self.temp_dir.name, "TEST.mybible")
+        create_test_bible(self.bible_path, ROWS)
+
+        # Isolate the catalog file and the in-process caches
+        start_patches(self, [
+            patch('rbible.catalog.CATALOG_FILE', os.path.join(self.temp_dir.name, "catalog.json")),
+            patch('rbible.catalog.get_bible_path', return_value=self.bible_path),
+            patch('rbible.catalog._catalog', None),
+            patch('rbible.catalog._versifications', {}),
+        ])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_build_versification(self):
+        """Test building the versification table from the Bible table"""
+        conn = sqlite3.connect(self.bible_path)
+        versification = build_versification(conn)
+        conn.close()
+
+        self.assertEqual(get_chapter_count(versification, 43), 3)
+        self.assertEqual(get_verse_count(versification, 43, 1), 51)
+        self.assertEqual(get_verse_count(versification, 43, 2), 0)  # Missing chapter
+        self.assertEqual(get_verse_count(versification, 43, 3), 36)
+        self.assertEqual(get_verse_count(versification, 19, 23), 6)
+
+    def test_build_versification_mybible_schema(self):
+        """Test building the versification table from the verses table"""
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE verses (book_number INTEGER, chapter INTEGER, verse INTEGER, text TEXT)")
+        conn.executemany("INSERT INTO verses VALUES (500, 3, ?, 'x')", [(v,) for v in range(1, 37)])
+        versification = build_versification(conn)
+        conn.close()
+
+        self.assertEqual(get_verse_count(versification, 43, 3), 36)
+
+    def test_get_versification_is_cached(self):
+        """Test that the versification is stored in the catalog and reused"""
+        versification = get_versification("TEST")
+        self.assertEqual(get_verse_count(versification, 43, 3), 36)
+        self.assertTrue(os.path.exists(catalog.CATALOG_FILE))
+
+        # A fresh process reads it back from the catalog without opening the Bible
+        with patch('rbible.catalog._catalog', None), patch('rbible.catalog._versifications', {}):
+            with patch('rbible.catalog.build_versification') as mock_build:
+                self.assertEqual(get_versification("TEST"), versification)
+                mock_build.assert_not_called()
+
+    def test_check_reference(self):
+        """Test rejecting references outside the versification"""
+        versification = get_versification("TEST")
+
+        check_reference(versification, "Juan", 3, 16)
+        check_reference(versification, "Juan", 3, (16, 40))
+        check_reference(versification, "Unknown", 99, 1)  # Left to the database
+
+        with self.assertRaises(ValueError):
+            check_reference(versification, "Juan", 30, 1)
+        with self.assertRaises(ValueError):
+            check_reference(versification, "Juan", 3, 37)
+        with self.assertRaises(ValueError):
+            check_reference(versification, "Juan", 3, (18, 16))
+
+    def test_clamp_verse_range(self):
+        """Test clamping verse ranges to the end of the chapter"""
+        versification = get_versification("TEST")
+
+        self.assertEqual(clamp_verse_range(versification, "Juan", 3, (16, 99)), (16, 36))
+        self.assertEqual(clamp_verse_range(versification, "Juan", 3, (16, 18)), (16, 18))
+        self.assertEqual(clamp_verse_range(versification, "Juan", 3, 16), 16)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import base64
+import tempfile
+from unittest.mock import patch
+
+from rbible import clipboard
+
+class TestClipboard(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_patch = patch.object(clipboard, "CLIPBOARD_CACHE_FILE", os.path.join(self.temp_dir.name, "clipboard.json"))
+        self.cache_patch.start()
+
+    def tearDown(self):
+        self.cache_patch.stop()
+        self.temp_dir.cleanup()
+
+    def test_detect_backend(self):
+        """Test picking a backend from the environment"""
+        with patch.dict(os.environ, {"SSH_TTY": "/dev/pts/1", "DISPLAY": "", "WAYLAND_DISPLAY": ""}):
+            self.assertEqual(clipboard.detect_backend(), "osc52")
+
+        with patch.dict(os.environ, {"SSH_TTY": "", "SSH_CONNECTION": "", "DISPLAY": ":0", "WAYLAND_DISPLAY": ""}), \
+                patch.object(clipboard.sys, "platform", "linux"), \
+                patch.object(clipboard.shutil, "which", side_effect=lambda name: "/usr/bin/xsel" if name == "xsel" else None):
+            self.assertEqual(clipboard.detect_backend(), "xsel")
+
+    def test_detection_is_cached(self):
+        """Test that detection runs once per environment"""
+        with patch.dict(os.environ, {"RBIBLE_CLIPBOARD": ""}), \
+                patch.object(clipboard, "detect_backend", return_value="xclip") as detect:
+            self.assertEqual(clipboard.get_backend(), "xclip")
+            self.assertEqual(clipboard.get_backend(), "xclip")
+            self.assertEqual(detect.call_count, 1)
+
+            # A different environment detects again
+            with patch.dict(os.environ, {"DISPLAY": "other:1"}):
+                clipboard.get_backend()
+            self.assertEqual(detect.call_count, 2)
+
+        with patch.dict(os.environ, {"RBIBLE_CLIPBOARD": "stdout"}):
+            self.assertEqual(clipboard.get_backend(), "stdout")
+
+    def test_osc52_sequence(self):
+        """Test the OSC 52 escape sequence, plain and wrapped for tmux"""
+        with patch.dict(os.environ, {"TMUX": ""}):
+            sequence = clipboard.osc52_sequence("Juan 3:16 amó")
+        self.assertTrue(sequence.startswith("\033]52;c;") and sequence.endswith("\a"))
+        self.assertEqual(base64.b64decode(sequence[7:-1]).decode("utf-8"), "Juan 3:16 amó")
+
+        with patch.dict(os.environ, {"TMUX": "/tmp/tmux-0/default,1,0"}):
+            self.assertTrue(clipboard.osc52_sequence("x").startswith("\033Ptmux;\033\033]52;"))
+
+    def test_copy_backends(self):
+        """Test copying to a file, and failing without a clipboard"""
+        path = os.path.join(self.temp_dir.name, "copied.txt")
+        clipboard.copy("Juan 3:16", f"file:{path}")
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), "Juan 3:16")
+
+        with self.assertRaises(clipboard.ClipboardError):
+            clipboard.copy("Juan 3:16", "none")
+
+        # Commands are started without waiting for them
+        with patch.object(clipboard.subprocess, "Popen") as popen:
+            clipboard.copy("Juan 3:16", "xclip")
+        self.assertEqual(popen.call_args[0][0], ["xclip", "-selection", "clipboard"])
+        popen.return_value.stdin.write.assert_called_once_with(b"Juan 3:16")
+        popen.return_value.wait.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
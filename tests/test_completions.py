@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import json
+import shutil
+import tempfile
+import subprocess
+from unittest.mock import patch
+
+from rbible import completions
+
+from tests.bible_fixtures import start_patches
+
+VERSIFICATIONS = {"RVR": {1: [31, 25], 43: [51, 25, 36]}, "LBLA": {43: [51, 25, 36]}}
+OPTIONS = [
+    (["-b", "--bible"], "Bible version to use", True, None),
+    (["-v", "--verse"], "Bible verse reference", True, None),
+    (["--format"], "Output format", True, ["plain", "json"]),
+    (["-j", "--json"], "Output JSON", False, None),
+]
+COMMANDS = ["concordance", "tui", "xref"]
+
+class TestCompletions(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+        self.entries = {version: {"mtime": 1000.0, "size": 4096} for version in VERSIFICATIONS}
+        start_patches(self, [
+            patch.object(completions, "get_catalog_entry", side_effect=lambda version: self.entries.get(version)),
+            patch.object(completions, "get_versification", side_effect=lambda version: VERSIFICATIONS.get(version)),
+        ])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def generate(self, force=False):
+        return completions.generate(list(VERSIFICATIONS), "RVR", OPTIONS, COMMANDS, self.directory, force)
+
+    def test_book_keys(self):
+        """Test matching names, codes and aliases in lowercase, with and without accents"""
+        keys = completions.book_keys()
+        self.assertEqual(keys["génesis"], "Génesis")
+        self.assertEqual(keys["genesis"], "Génesis")
+        self.assertEqual(keys["gen"], "Génesis")
+        self.assertEqual(keys["1 juan"], "1 Juan")
+        self.assertEqual(keys["cantar de los cantares"], "Cantares")
+
+    def test_generate_data(self):
+        """Test the JSON data for the Neovim plugin"""
+        self.assertTrue(self.generate())
+        for name in completions.SCRIPTS.values():
+            self.assertTrue(os.path.exists(os.path.join(self.directory, name)))
+
+        with open(completions.get_data_path(self.directory), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(data["default_version"], "RVR")
+        self.assertEqual(data["books"][42]["name"], "Juan")
+        self.assertEqual(data["keys"]["jn"], 43)
+        self.assertEqual(data["versions"]["LBLA"]["versification"], {"43": [51, 25, 36]})
+
+    def test_regenerates_only_when_versions_change(self):
+        """Test skipping generation while the installed versions are unchanged"""
+        self.assertTrue(self.generate())
+        self.assertFalse(self.generate())
+        self.assertTrue(self.generate(force=True))
+
+        # A version downloaded again
+        self.entries["LBLA"] = {"mtime": 2000.0, "size": 8192}
+        self.assertTrue(self.generate())
+        self.assertFalse(self.generate())
+
+        # A missing script is written again
+        os.remove(os.path.join(self.directory, completions.SCRIPTS["fish"]))
+        self.assertTrue(self.generate())
+
+    def test_fish_options(self):
+        """Test describing options, their values and choices for fish"""
+        self.generate()
+        with open(os.path.join(self.directory, completions.SCRIPTS["fish"]), 'r', encoding='utf-8') as f:
+            script = f.read()
+        self.assertIn("complete -c rbible -s b -l bible -x -a 'LBLA RVR' -d 'Bible version to use'", script)
+        self.assertIn("complete -c rbible -s v -l verse -x -a '(__rbible_references)'", script)
+        self.assertIn("complete -c rbible -l format -x -a 'plain json'", script)
+        self.assertIn("complete -c rbible -s j -l json -d 'Output JSON'", script)
+
+    @unittest.skipUnless(shutil.which("bash"), "bash is not installed")
+    def test_bash_completion(self):
+        """Test completing books, chapters, verses, versions and options with the bash script"""
+        self.generate()
+        script = os.path.join(self.directory, completions.SCRIPTS["bash"])
+        cases = {
+            'rbible -v "Ju': ["Jueces", "Juan", "Judas"],
+            'rbible -v "exo': ["Éxodo"],
+            'rbible -v "jn 2': ["jn 2"],
+            'rbible -v "Juan 3:3': ["Juan 3:3", "Juan 3:30", "Juan 3:31", "Juan 3:32", "Juan 3:33", "Juan 3:34", "Juan 3:35", "Juan 3:36"],
+            'rbible -v "Gen 3:': [],
+            'rbible -b L': ["LBLA"],
+            'rbible --js': ["--json"],
+            'rbible t': ["tui"],
+            'rbible tui "1 Ju': ["1 Juan"],
+        }
+        for line, expected in cases.items():
+            with self.subTest(line):
+                output = subprocess.run(
+                    ["bash", "-c", f'source "$0"; COMP_LINE=$1; COMP_POINT=${{#1}}; _rbible; printf "%s\\n" "${{COMPREPLY[@]}}"', script, line],
+                    capture_output=True, text=True, check=True
+                ).stdout
+                self.assertEqual([item for item in output.split("\n") if item], expected)
+
+if __name__ == '__main__':
+    unittest.main()
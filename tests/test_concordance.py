@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+from rbible.bible_data import pack_verse_id
+from rbible.concordance import (
+    encode_postings, decode_postings, build_index, lookup_word, query_concordance,
+    count_by_book, count_by_testament, concordance
+)
+
+from tests.bible_fixtures import create_test_bible
+
+# Verses with Strong's and footnote markup
+ROWS = [
+    (1, 1, 1, "En el principio creó<S>1254</S> Dios los cielos y la tierra."),
+    (19, 23, 1, "Jehová es mi pastor; nada me faltará."),
+    (43, 3, 16, "Porque de tal manera amó Dios al mundo<RF>Gr. cosmos<Rf>, que ha dado a su Hijo."),
+    (62, 4, 8, "El que no ama, no ha conocido a Dios; porque Dios es amor<S>26</S>."),
+]
+
+class TestConcordance(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.bible_path = os.path.join(self.temp_dir.name, "TEST.mybible")
+        self.index_path = os.path.join(self.temp_dir.name, "index", "TEST.db")
+        create_test_bible(self.bible_path, ROWS)
+
+        bible_conn = sqlite3.connect(self.bible_path)
+        build_index(bible_conn, self.index_path)
+        bible_conn.close()
+        self.index_conn = sqlite3.connect(self.index_path)
+
+    def tearDown(self):
+        self.index_conn.close()
+        self.temp_dir.cleanup()
+
+    def test_postings_roundtrip(self):
+        """Test encoding and decoding verse id postings"""
+        verse_ids = [pack_verse_id(1, 1, 1), pack_verse_id(1, 1, 1), pack_verse_id(43, 3, 16), pack_verse_id(66, 22, 21)]
+        self.assertEqual(decode_postings(encode_postings(verse_ids)), verse_ids)
+        self.assertEqual(decode_postings(encode_postings([])), [])
+
+    def test_lookup_word(self):
+        """Test looking up words, ignoring case, accents and markup"""
+        self.assertEqual(lookup_word(self.index_conn, "Creo"), [pack_verse_id(1, 1, 1)])
+        self.assertEqual(lookup_word(self.index_conn, "amor"), [pack_verse_id(62, 4, 8)])
+        self.assertEqual(lookup_word(self.index_conn, "1254"), [])
+        self.assertEqual(lookup_word(self.index_conn, "cosmos"), [])
+        self.assertEqual(len(lookup_word(self.index_conn, "am*")), 3)
+
+    def test_query_concordance(self):
+        """Test counting the occurrences of one or more words"""
+        occurrence_ids, verse_ids = query_concordance(self.index_conn, "dios")
+        self.assertEqual(len(occurrence_ids), 4)
+        self.assertEqual(len(verse_ids), 3)
+
+        occurrence_ids, verse_ids = query_concordance(self.index_conn, "Dios mundo")
+        self.assertEqual(verse_ids, [pack_verse_id(43, 3, 16)])
+        self.assertEqual(len(occurrence_ids), 2)
+
+        self.assertEqual(query_concordance(self.index_conn, "!?"), ([], []))
+
+    def test_counts(self):
+        """Test counting occurrences per book and testament"""
+        occurrence_ids, _ = query_concordance(self.index_conn, "dios")
+        book_counts = count_by_book(occurrence_ids)
+        self.assertEqual(book_counts, {1: 1, 43: 1, 62: 2})
+        self.assertEqual(count_by_testament(book_counts), {"Antiguo Testamento": 1, "Nuevo Testamento": 3})
+
+    def test_concordance_builds_index(self):
+        """Test that a query builds a missing index"""
+        index_dir = os.path.join(self.temp_dir.name, "auto")
+        with patch('rbible.concordance.get_bible_path', return_value=self.bible_path), \
+             patch('rbible.concordance.CONCORDANCE_DIR', index_dir):
+            result = concordance("TEST", "dios", by_book=True, quiet=True)
+
+        self.assertTrue(os.path.exists(os.path.join(index_dir, "TEST.db")))
+        self.assertEqual(result["occurrences"], 4)
+        self.assertEqual(result["references"], ["Génesis 1:1", "Juan 3:16", "1 Juan 4:8"])
+        self.assertEqual(result["by_book"]["1 Juan"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
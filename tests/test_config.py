@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+import unittest
+import io
+import os
+import tempfile
+from unittest.mock import patch
+
+from rbible import config
+
+from tests.bible_fixtures import start_patches
+
+CONFIG = b"""
+version = "RVR1960"
+format = "markdown"
+parallel = ["RVR1960", "NVI"]
+
+[cache]
+lookups = 100
+
+[daemon]
+socket = "~/.rbible/rbible.sock"
+"""
+
+class TestConfig(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.temp_dir.name, "config.toml")
+        start_patches(self, [
+            patch.object(config, "CONFIG_FILE", self.config_file),
+            patch.object(config, "SNAPSHOT_FILE", os.path.join(self.temp_dir.name, "cache", "config.pickle")),
+            patch.object(config, "_config", None),
+        ])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_config(self, data, mtime):
+        with open(self.config_file, 'wb') as f:
+            f.write(data)
+        os.utime(self.config_file, (mtime, mtime))
+
+    def test_compile_config(self):
+        """Test merging settings over the defaults and rejecting invalid ones"""
+        compiled = config.compile_config(config.parse_toml(CONFIG))
+        self.assertEqual((compiled["version"], compiled["format"]), ("RVR1960", "markdown"))
+        self.assertEqual(compiled["cache"], {"lookups": 100, "connections": 4})
+        self.assertEqual(compiled["daemon"]["socket"], os.path.expanduser("~/.rbible/rbible.sock"))
+        self.assertTrue(compiled["copy"])
+
+        for settings in ({"colour": "red"}, {"copy": "yes"}, {"cache": {"lookups": True}}, {"format": "pdf"}, {"parallel": [1]}):
+            with self.subTest(settings), self.assertRaises(ValueError):
+                config.compile_config(settings)
+        with self.assertRaises(ValueError):
+            config.parse_toml(b"version = ")
+
+    def test_defaults_without_file(self):
+        """Test using the defaults when there is no config.toml"""
+        self.assertEqual(config.load_config(), config.DEFAULTS)
+        self.assertIsNot(config.load_config(reload=True)["cache"], config.DEFAULTS["cache"])
+
+    def test_snapshot(self):
+        """Test parsing config.toml once and again only after it changes"""
+        self.write_config(CONFIG, 1000)
+        with patch.object(config, "parse_toml", wraps=config.parse_toml) as parse:
+            self.assertEqual(config.load_config()["version"], "RVR1960")
+            self.assertEqual(config.load_config(reload=True)["version"], "RVR1960")
+            self.assertEqual(parse.call_count, 1)
+
+            self.write_config(CONFIG.replace(b"RVR1960", b"NVI"), 2000)
+            self.assertEqual(config.load_config(reload=True)["version"], "NVI")
+            self.assertEqual(parse.call_count, 2)
+
+    def test_invalid_file(self):
+        """Test warning about an invalid config.toml and using the defaults"""
+        self.write_config(b'format = "pdf"', 1000)
+        with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            self.assertEqual(config.load_config(), config.DEFAULTS)
+        self.assertIn("'format' must be one of", stderr.getvalue())
+        self.assertFalse(os.path.exists(config.SNAPSHOT_FILE))
+
+if __name__ == '__main__':
+    unittest.main()
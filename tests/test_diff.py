@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+
+from rbible import diff
+from rbible.bible_data import pack_verse_id
+from rbible.formatters import format_passages
+
+from tests.bible_fixtures import create_test_bible, start_patches
+
+OLD = {(45, 8, 28): "Y sabemos que á los que á Dios aman, todas las cosas les ayudan á bien",
+       (45, 8, 29): "Porque á los que antes conoció",
+       (45, 9, 1): "Verdad digo en Cristo"}
+NEW = {(45, 8, 28): "Y sabemos que a los que aman a Dios, todas las cosas les ayudan a bien",
+       (45, 8, 29): "Porque a los que antes conoció",
+       (45, 9, 2): "que tengo gran tristeza"}
+
+class TestDiff(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.paths = {version: os.path.join(self.temp_dir.name, f"{version}.mybible") for version in ("OLD", "NEW")}
+        create_test_bible(self.paths["OLD"], [key + (text,) for key, text in OLD.items()])
+        create_test_bible(self.paths["NEW"], [key + (text,) for key, text in NEW.items()])
+        start_patches(self, [
+            patch.object(diff, "get_bible_path", side_effect=self.paths.get),
+            patch.object(diff, "get_read_path", side_effect=lambda version, path: path),
+        ])
+        self.ranges = [(pack_verse_id(45, 8, 1), pack_verse_id(45, 9, 999))]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_word_changes(self):
+        """Test diffing the words of two texts, ignoring markup"""
+        changes, matched, total = diff.word_changes("En el <S>7225</S>principio era el Verbo", "En el principio existía el Verbo")
+        self.assertEqual(changes, [["equal", "En el principio"], ["delete", "era"], ["insert", "existía"], ["equal", "el Verbo"]])
+        self.assertEqual((matched, total), (5, 12))
+        self.assertEqual(diff.similarity(*diff.word_changes("a b", "a b")[1:]), 1.0)
+
+    def test_split_by_chapter(self):
+        """Test splitting ranges at chapter boundaries"""
+        self.assertEqual(diff.split_by_chapter([(pack_verse_id(45, 8, 28), pack_verse_id(45, 9, 2))]), [
+            (45, 8, [(pack_verse_id(45, 8, 28), pack_verse_id(45, 8, 999))]),
+            (45, 9, [(pack_verse_id(45, 9, 1), pack_verse_id(45, 9, 2))]),
+        ])
+
+    def test_diff_chapters(self):
+        """Test that the process pool gives the same chapters, in order, as diffing in process"""
+        serial = list(diff.diff_chapters("OLD", "NEW", self.ranges, jobs=1))
+        self.assertEqual(list(diff.diff_chapters("OLD", "NEW", self.ranges, jobs=2)), serial)
+        self.assertEqual([(book_id, chapter) for book_id, chapter, _ in serial], [(45, 8), (45, 9)])
+
+        summaries = list(diff.chapter_summaries(serial))
+        self.assertEqual([s["reference"] for s in summaries], ["Romanos 8", "Romanos 9"])
+        self.assertEqual((summaries[0]["verses"], summaries[0]["changed"]), (2, 2))
+        self.assertLess(summaries[0]["similarity"], 1)
+        self.assertEqual((summaries[1]["verses"], summaries[1]["missing"]), (0, 2))
+
+        with self.assertRaises(ValueError):
+            list(diff.diff_chapters("OLD", "MISSING", self.ranges))
+
+    def test_render_through_formatters(self):
+        """Test rendering verse diffs with each format's markup"""
+        passages = list(diff.verse_passages(diff.diff_chapters("OLD", "NEW", self.ranges), "OLD", "NEW"))
+        self.assertEqual([p["reference"] for p in passages], ["Romanos 8:28", "Romanos 8:29", "Romanos 9:1", "Romanos 9:2"])
+        self.assertEqual(passages[1]["text"], "Porque [-á-] {+a+} los que antes conoció")
+        self.assertEqual((passages[2]["error"], passages[3]["error"]), ("Only in OLD", "Only in NEW"))
+
+        self.assertIn("Porque <del>á</del> <ins>a</ins> los", format_passages("html", passages[1:2]))
+        self.assertIn("Porque ~~á~~ **a** los", format_passages("markdown", passages[1:2]))
+        self.assertIn('"similarity"', format_passages("json", passages[1:2]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 import unittest
 
-from rbible.formatters import format_as_markdown, format_parallel_verses
+import io
+import json
+
+from rbible.formatters import (
+    format_as_markdown, format_parallel_verses, format_as_json, format_passages, write_passages,
+    register_formatter, FORMATTERS, display_width, wrap_text, write_parallel_columns, write_parallel_table
+)
 
 class TestFormatters(unittest.TestCase):
     def test_format_as_markdown(self):
@@ -46,6 +52,96 @@ class TestFormatters(unittest.TestCase):
         parallel_results.append({"version": "NIV", "reference": "Juan 3:16", "error": "Version not found"})
         formatted = format_parallel_verses(parallel_results, markdown=True)
         self.assertTrue("> *NIV*: Error" in formatted)
+    
+    def test_format_as_json(self):
+        """Test formatting verses as JSON"""
+        verses = [{"reference": "Génesis 1:1", "version": "RVR", "text": "En el principio..."}]
+        formatted = format_as_json(verses)
+        
+        # Accents are kept as-is and the output round-trips
+        self.assertTrue("Génesis" in formatted)
+        self.assertEqual(json.loads(formatted), verses)
+    
+    def test_formatter_registry(self):
+        """Test the built-in output formats"""
+        passages = [
+            {"reference": "Génesis 1:1", "version": "RVR", "text": "En el principio..."},
+            {"reference": "Foo 1:1", "version": "RVR", "error": "Book not found"},
+        ]
+        self.assertEqual(set(FORMATTERS), {"plain", "markdown", "json", "html", "latex", "ansi"})
+        self.assertEqual(format_passages("plain", passages[:1]), "\nGénesis 1:1(RVR)\nEn el principio...\n")
+        self.assertEqual(format_passages("markdown", passages[:1]), format_as_markdown("Génesis 1:1", "En el principio...", version="RVR") + "\n")
+        self.assertIn("Error: Book not found", format_passages("plain", passages))
+        self.assertIn("<strong>Génesis 1:1(RVR)</strong>", format_passages("html", passages))
+        self.assertIn(r"100\%", format_passages("latex", [{"reference": "Juan 1:1", "text": "100%"}]))
+        
+        # Streamed JSON is the same as formatting the whole list at once
+        self.assertEqual(format_passages("json", passages), format_as_json(passages) + "\n")
+        self.assertEqual(format_passages("json", []), format_as_json([]) + "\n")
+        
+        with self.assertRaises(ValueError):
+            format_passages("docx", passages)
+    
+    def test_streaming_writers(self):
+        """Test that writers consume passages one at a time and custom formats can be registered"""
+        written = []
+        
+        class Sink:
+            def write(self, text):
+                written.append(text)
+        
+        def passages():
+            for verse in range(1, 4):
+                # Everything before this passage was already written
+                self.assertEqual(len(written), verse - 1)
+                yield {"reference": f"Juan 1:{verse}", "text": "..."}
+        
+        @register_formatter("refs")
+        def write_refs(passages, out):
+            for passage in passages:
+                out.write(passage["reference"] + "\n")
+        
+        try:
+            write_passages("refs", passages(), Sink())
+        finally:
+            del FORMATTERS["refs"]
+        self.assertEqual(written, ["Juan 1:1\n", "Juan 1:2\n", "Juan 1:3\n"])
+    
+    def test_wrap_text(self):
+        """Test wrapping by terminal cells rather than characters"""
+        self.assertEqual(display_width("amó"), 3)
+        self.assertEqual(display_width("ame\u0301"), 3)
+        self.assertEqual(display_width("世界"), 4)
+        self.assertEqual(wrap_text("Porque de tal manera amó", 10), ["Porque de", "tal manera", "amó"])
+        self.assertEqual(wrap_text("世界世界 a", 5), ["世界", "世界", "a"])
+        self.assertEqual(wrap_text("abcdefghijkl", 5), ["abcde", "fghij", "kl"])
+        self.assertEqual(wrap_text("", 5), [""])
+    
+    def test_parallel_columns(self):
+        """Test side-by-side columns and markdown tables, with verses missing in a version"""
+        rows = [
+            (43003016, ["Porque de tal manera amó Dios al mundo", "For God so loved the world"]),
+            (43003017, [None, "For God sent not his Son"]),
+        ]
+        out = io.StringIO()
+        write_parallel_columns(iter(rows), ["RVR", "KJV"], out, width=50)
+        lines = out.getvalue().split("\n")
+        self.assertTrue(all(display_width(line) <= 50 for line in lines))
+        self.assertIn("Juan", lines)
+        self.assertEqual(lines[4:9], [
+            "3:16     Porque de tal        For God so loved",
+            "         manera amó Dios al   the world",
+            "         mundo",
+            "3:17                          For God sent not",
+            "                              his Son",
+        ])
+        
+        out = io.StringIO()
+        write_parallel_table(iter(rows), ["RVR", "KJV"], out)
+        self.assertEqual(out.getvalue().split("\n")[2:4], [
+            "| **Juan 3:16** | Porque de tal manera amó Dios al mundo | For God so loved the world |",
+            "| **3:17** | — | For God sent not his Son |",
+        ])
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from rbible.http_server import BibleAPI, start_server
+
+from tests.bible_fixtures import create_test_bible, start_patches
+
+ROWS = [(43, 3, v, f"Juan 3:{v} amor") for v in range(1, 37)]
+
+class TestHTTPServer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        bible_path = os.path.join(self.temp_dir.name, "TEST.mybible")
+        create_test_bible(bible_path, ROWS)
+
+        start_patches(self, [
+            patch('rbible.http_server.get_available_versions', return_value=["TEST"]),
+            patch('rbible.pool.get_bible_path', return_value=bible_path),
+            patch('rbible.catalog.get_bible_path', return_value=bible_path),
+            patch('rbible.catalog.CATALOG_FILE', os.path.join(self.temp_dir.name, "catalog.json")),
+            patch('rbible.catalog._catalog', None),
+            patch('rbible.catalog._versifications', {}),
+        ])
+        self.api = BibleAPI()
+
+    def tearDown(self):
+        self.api.close()
+        self.temp_dir.cleanup()
+
+    def get(self, target, headers=None):
+        status, response_headers, body = asyncio.run(self.api.dispatch("GET", target, headers or {}))
+        return status, response_headers, body
+
+    def test_lookup(self):
+        """Test looking up a verse and a verse range"""
+        status, headers, body = self.get("/lookup?ref=Juan%203:16")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {"reference": "Juan 3:16", "version": "TEST", "text": "Juan 3:16 amor"})
+        self.assertIn("max-age", headers["Cache-Control"])
+
+        status, _, body = self.get("/lookup?ref=Juan%203:35-99")
+        self.assertEqual(json.loads(body)["reference"], "Juan 3:35-36")
+
+    def test_etag(self):
+        """Test revalidating an immutable response with its ETag"""
+        _, headers, _ = self.get("/lookup?ref=Juan%203:16")
+        status, _, body = self.get("/lookup?ref=Juan%203:16", {"if-none-match": headers["ETag"]})
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b"")
+
+    def test_range_and_parallel(self):
+        """Test the range and parallel endpoints"""
+        status, _, body = self.get("/range?book=Juan&chapter=3&start=16&end=17")
+        self.assertEqual(status, 200)
+        self.assertEqual([v["verse"] for v in json.loads(body)["verses"]], [16, 17])
+
+        status, headers, body = self.get("/parallel?ref=Juan%203:16&versions=TEST,NOPE")
+        results = json.loads(body)
+        self.assertEqual(results[0]["text"], "Juan 3:16 amor")
+        self.assertIn("error", results[1])
+        self.assertEqual(headers["Cache-Control"], "no-cache")
+
+    def test_search_complete_export(self):
+        """Test the search, completion and export endpoints"""
+        _, _, body = self.get("/search?q=amor&limit=2")
+        self.assertEqual(len(json.loads(body)), 2)
+
+        _, _, body = self.get("/complete?q=Juan%203:3")
+        self.assertIn("Juan 3:36", json.loads(body))
+
+        status, headers, body = self.get("/export?ref=Juan%203:16&format=markdown")
+        self.assertEqual(status, 200)
+        self.assertTrue(headers["Content-Type"].startswith("text/markdown"))
+        self.assertTrue(body.decode("utf-8").startswith("> **Juan 3:16(TEST)**"))
+
+    def test_errors(self):
+        """Test error responses"""
+        self.assertEqual(self.get("/lookup")[0], 400)
+        self.assertEqual(self.get("/lookup?ref=Juan")[0], 400)
+        self.assertEqual(self.get("/lookup?ref=Juan%2030:1")[0], 404)
+        self.assertEqual(self.get("/lookup?ref=Juan%203:16&version=NOPE")[0], 404)
+        self.assertEqual(self.get("/unknown")[0], 404)
+        status, _, _ = asyncio.run(self.api.dispatch("POST", "/lookup", {}))
+        self.assertEqual(status, 405)
+
+    def test_keep_alive_connection(self):
+        """Test serving several requests over one connection"""
+        async def run():
+            server = await start_server(self.api, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+            responses = []
+            for ref in ("Juan%203:16", "Juan%203:17"):
+                writer.write(f"GET /lookup?ref={ref} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+                await writer.drain()
+                status_line = await reader.readline()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line == b"\r\n":
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.lower()] = value.strip()
+                body = await reader.readexactly(int(headers["content-length"]))
+                responses.append((status_line, json.loads(body)))
+
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return responses
+
+        responses = asyncio.run(run())
+        self.assertTrue(responses[0][0].startswith(b"HTTP/1.1 200"))
+        self.assertEqual(responses[1][1]["reference"], "Juan 3:17")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import stat
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+from rbible import bible_data, optimize
+from rbible.bible_data import read_only_uri
+from rbible.schema import introspect_schema
+
+from tests.bible_fixtures import create_test_bible, start_patches
+
+class TestOptimize(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.bible_path = os.path.join(self.temp_dir.name, "TEST.mybible")
+        create_test_bible(self.bible_path, [
+            (book_id, chapter, verse, f"{book_id} {chapter}:{verse}")
+            for book_id in range(1, 67) for chapter in range(1, 6) for verse in range(1, 21)
+        ])
+        # The source is older than anything built from it
+        os.utime(self.bible_path, (1, 1))
+
+        start_patches(self, [
+            patch.object(bible_data, "OPTIMIZED_DIR", os.path.join(self.temp_dir.name, "optimized")),
+            patch.object(optimize, "get_bible_path", return_value=self.bible_path),
+        ])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_optimize_version(self):
+        """Test building an indexed, read-only copy with the same verses"""
+        self.assertEqual(bible_data.get_read_path("TEST", self.bible_path), self.bible_path)
+        before, after = optimize.optimize_version("TEST", page_size=8192, quiet=True)
+        self.assertGreater(before, 0)
+        self.assertGreater(after, 0)
+
+        optimized_path = bible_data.get_optimized_path("TEST")
+        self.assertFalse(os.stat(optimized_path).st_mode & stat.S_IWUSR)
+        conn = sqlite3.connect(read_only_uri(optimized_path), uri=True)
+        self.assertTrue(introspect_schema(conn).indexed)
+        self.assertEqual(conn.execute("PRAGMA page_size").fetchone()[0], 8192)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM Bible").fetchone()[0], 66 * 5 * 20)
+        self.assertTrue(conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0])
+        plan = " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN SELECT Scripture FROM Bible WHERE Book = 1 AND Chapter = 2 AND Verse = 3"))
+        self.assertIn("COVERING INDEX", plan)
+        conn.close()
+
+        # The source file itself is untouched
+        self.assertEqual(os.path.getmtime(self.bible_path), 1)
+
+    def test_read_path_freshness(self):
+        """Test preferring the optimized copy only while it is newer than the source"""
+        optimize.optimize_version("TEST", quiet=True)
+        self.assertEqual(bible_data.get_read_path("TEST", self.bible_path), bible_data.get_optimized_path("TEST"))
+
+        # A newly downloaded source wins over the old copy
+        os.utime(self.bible_path, None)
+        os.utime(bible_data.get_optimized_path("TEST"), (1, 1))
+        self.assertEqual(bible_data.get_read_path("TEST", self.bible_path), self.bible_path)
+
+        self.assertTrue(optimize.remove_optimized_copy("TEST"))
+        self.assertFalse(optimize.remove_optimized_copy("TEST"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+import unittest
+import datetime
+
+from rbible.bible_data import pack_verse_id
+from rbible.plans import partition, generate_plan, format_day, get_plan_day, PLAN_TYPES
+
+# Every book with 10 chapters of 20 verses, Psalms with 150 and Proverbs with 31
+VERSIFICATION = {book_id: [20] * 10 for book_id in range(1, 67)}
+VERSIFICATION[19] = [10] * 150
+VERSIFICATION[20] = [30] * 31
+
+class TestPlans(unittest.TestCase):
+    def test_partition(self):
+        """Test splitting weights into balanced, non-empty days"""
+        self.assertEqual(partition([1] * 10, 5), [0, 2, 4, 6, 8])
+        self.assertEqual(partition([10, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1], 2), [0, 1])
+        self.assertEqual(partition([10, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1], 2), [0, 2])
+        # A heavy unit can't be split, but every day still gets one
+        self.assertEqual(partition([100, 1, 1], 3), [0, 1, 2])
+        with self.assertRaises(ValueError):
+            partition([1, 1], 3)
+
+    def test_generate_plan(self):
+        """Test that a plan reads every chapter once, in order"""
+        segments = generate_plan("nt", 30, VERSIFICATION)
+        self.assertEqual(len(segments), 30)
+        self.assertEqual(segments[0][0][0], pack_verse_id(40, 1, 1))
+        self.assertEqual(segments[-1][-1][1], pack_verse_id(66, 10, 20))
+
+        chapters = [
+            (start // 1000, end // 1000)
+            for day in segments
+            for start, end in day
+        ]
+        read = [chapter for start, end in chapters for chapter in range(start, end + 1) if chapter % 1000]
+        expected = [book_id * 1000 + chapter for book_id in range(40, 67) for chapter in range(1, 11)]
+        self.assertEqual(read, expected)
+
+        # 270 chapters over 30 days
+        self.assertTrue(all(sum(end // 1000 - start // 1000 + 1 for start, end in day) == 9 for day in segments))
+
+    def test_parallel_tracks(self):
+        """Test that Psalms and Proverbs are both spread over the whole plan"""
+        segments = generate_plan("psalms-proverbs", 31, VERSIFICATION)
+        self.assertEqual(format_day(segments[0], VERSIFICATION), "Salmos 1-5; Proverbios 1")
+        self.assertEqual(format_day(segments[30], VERSIFICATION), "Salmos 146-150; Proverbios 31")
+
+    def test_short_tracks_use_verses(self):
+        """Test splitting by verses when a track has fewer chapters than days"""
+        segments = generate_plan("psalms-proverbs", 62, VERSIFICATION)
+        self.assertEqual(format_day(segments[0], VERSIFICATION), "Salmos 1-2; Proverbios 1:1-15")
+
+    def test_word_balance(self):
+        """Test balancing days by word count"""
+        word_counts = {book_id: [100] * 10 for book_id in range(40, 67)}
+        word_counts[40] = [1000] + [100] * 9
+        segments = generate_plan("nt", 27, VERSIFICATION, word_counts)
+        self.assertEqual(format_day(segments[0], VERSIFICATION), "Mateo 1")
+
+    def test_chronological_order(self):
+        """Test that the chronological plan keeps its order within a day"""
+        segments = generate_plan("chronological", 66, {book_id: [20] for book_id in range(1, 67)})
+        self.assertEqual([format_day(day, None) for day in segments[:2]], ["Génesis 1:1-20", "Job 1:1-20"])
+        self.assertEqual(len(PLAN_TYPES["chronological"][0]), 66)
+
+    def test_get_plan_day(self):
+        """Test finding the day of a plan"""
+        plan = {"start": "2026-01-01"}
+        self.assertEqual(get_plan_day(plan, datetime.date(2026, 1, 1)), 1)
+        self.assertEqual(get_plan_day(plan, datetime.date(2026, 2, 1)), 32)
+        self.assertEqual(get_plan_day(plan, datetime.date(2025, 12, 31)), 0)
+
+if __name__ == '__main__':
+    unittest.main()
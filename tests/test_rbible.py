@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+from tests.bible_fixtures import create_test_bible
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ROWS = [(43, 3, v, f"texto {v}") for v in range(1, 37)]
+
+class TestRbible(unittest.TestCase):
+    def setUp(self):
+        # A home and working directory of its own, with one version in ./bibles
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.home = self.temp_dir.name
+        os.makedirs(os.path.join(self.home, "bibles"))
+        create_test_bible(os.path.join(self.home, "bibles", "TEST.mybible"), ROWS)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def start(self, *args):
+        """Start the command line in the temporary home."""
+        env = dict(os.environ, HOME=self.home, PYTHONPATH=ROOT)
+        return subprocess.Popen(
+            [sys.executable, "-c", "from rbible.rbible import main; main()", *args],
+            cwd=self.home, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+
+    def rbible(self, *args):
+        """Run the command line in the temporary home, returning (exit code, stdout)."""
+        process = self.start(*args)
+        output, _ = process.communicate(timeout=60)
+        return process.returncode, output
+
+    def test_json_reports_malformed_references(self):
+        """Test that a malformed reference is an error entry in --json mode, not the end of the output"""
+        code, output = self.rbible("-v", "Juan 3:16", "-v", "Juan 3:16-", "--json")
+        self.assertEqual(code, 0)
+        passages = json.loads(output)
+        self.assertEqual(passages[0]["text"], "texto 16")
+        self.assertEqual(passages[1]["reference"], "Juan 3:16-")
+        self.assertEqual(passages[1]["error"], "Chapter and verse must be numbers.")
+
+    def test_json_keeps_markdown(self):
+        """Test that -m with --json formats each passage's "formatted" text as markdown"""
+        code, output = self.rbible("-v", "Juan 3:16", "-m", "--json")
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(output)[0]["formatted"], "> **Juan 3:16(TEST)**\n>\n> texto 16")
+
+        code, output = self.rbible("-v", "Juan 3:16", "--json")
+        self.assertEqual(json.loads(output)[0]["formatted"], "\nJuan 3:16(TEST)\ntexto 16")
+
+    def test_json_echoes_each_reference(self):
+        """Test that every passage names the -v reference it came from"""
+        code, output = self.rbible("-v", "Juan 3:16, 18", "-v", "Juan 3:20", "--json")
+        self.assertEqual(code, 0)
+        passages = json.loads(output)
+        self.assertEqual([passage["reference"] for passage in passages], ["Juan 3:16", "Juan 3:18", "Juan 3:20"])
+        self.assertEqual([passage["query"] for passage in passages], ["Juan 3:16, 18", "Juan 3:16, 18", "Juan 3:20"])
+
+    def test_json_chapter(self):
+        """Test that a whole chapter has the same JSON fields as any other lookup"""
+        for attempt in range(2):
+            with self.subTest(attempt=attempt):
+                code, output = self.rbible("-v", "Juan 3", "-m", "--json")
+                self.assertEqual(code, 0)
+                passage = json.loads(output)[0]
+                self.assertEqual(passage["reference"], "Juan 3:1-36")
+                self.assertEqual(passage["query"], "Juan 3")
+                self.assertTrue(passage["formatted"].startswith("> **Juan 3:1-36(TEST)**"))
+
+    def test_concurrent_plan_updates(self):
+        """Test that days marked as read at the same time are all kept"""
+        self.assertEqual(self.rbible("plan", "new", "bible", "--days", "6")[0], 0)
+        processes = [self.start("plan", "done", str(day)) for day in range(1, 7)]
+        for process in processes:
+            process.communicate(timeout=60)
+            self.assertEqual(process.returncode, 0)
+
+        code, output = self.rbible("plan", "status", "--json")
+        self.assertEqual(json.loads(output)[0]["completed"], 6)
+        self.assertEqual(self.rbible("plan", "use", "nada")[0], 1)
+
+    def test_default_version(self):
+        """Test falling back to the first installed version when the configured one isn't installed"""
+        create_test_bible(os.path.join(self.home, "bibles", "ABC.mybible"), [(43, 3, 16, "abc 16")])
+        os.makedirs(os.path.join(self.home, ".rbible"))
+        for configured, expected in (("NINGUNA", "ABC"), ("TEST", "TEST")):
+            with self.subTest(configured):
+                with open(os.path.join(self.home, ".rbible", "config.toml"), 'w', encoding='utf-8') as f:
+                    f.write(f'version = "{configured}"\n')
+                code, output = self.rbible("-v", "Juan 3:16", "--json")
+                self.assertEqual(code, 0)
+                self.assertEqual(json.loads(output)[0]["version"], expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sqlite3
+import tempfile
+
+from rbible.bible_data import pack_verse_id
+from rbible.references import (
+    is_reference_expression, parse_reference_expression, merge_ranges,
+    group_verses_by_range, format_verse_group, LAST
+)
+from rbible.verse_operations import get_verses_in_ranges
+
+from tests.bible_fixtures import create_test_bible
+
+# Juan has 3 chapters of 51, 25 and 36 verses, Romanos 16 chapters
+VERSIFICATION = {
+    43: [51, 25, 36],
+    45: [32, 29, 31, 25, 21, 23, 25, 39, 33, 21, 36, 21, 14, 23, 33, 27],
+    62: [10, 29, 24, 21, 21],
+}
+
+def verse_range(book_id, chapter, start_verse, end_chapter, end_verse):
+    return pack_verse_id(book_id, chapter, start_verse), pack_verse_id(book_id, end_chapter, end_verse)
+
+class TestReferences(unittest.TestCase):
+    def test_is_reference_expression(self):
+        """Test telling single references from expressions"""
+        self.assertFalse(is_reference_expression("Juan 3:16"))
+        self.assertFalse(is_reference_expression("Juan 3:16-18"))
+        self.assertTrue(is_reference_expression("Juan 3:16, 18"))
+        self.assertTrue(is_reference_expression("Juan 3:16; Rom 8:1"))
+        self.assertTrue(is_reference_expression("Romanos 8"))
+
+    def test_parse_expression(self):
+        """Test parsing lists of references"""
+        self.assertEqual(
+            parse_reference_expression("Juan 3:16-18, 20; 1 Juan 4:7-12; Rom 8", VERSIFICATION),
+            [
+                verse_range(43, 3, 16, 3, 18),
+                verse_range(43, 3, 20, 3, 20),
+                verse_range(45, 8, 1, 8, 39),
+                verse_range(62, 4, 7, 4, 12),
+            ]
+        )
+
+        # Parts without a book continue the previous book
+        self.assertEqual(
+            parse_reference_expression("Juan 1:1; 2:1-3", VERSIFICATION),
+            [verse_range(43, 1, 1, 1, 1), verse_range(43, 2, 1, 2, 3)]
+        )
+
+        # Chapter lists and ranges across chapters
+        self.assertEqual(parse_reference_expression("Rom 8, 10", VERSIFICATION), [verse_range(45, 8, 1, 8, 39), verse_range(45, 10, 1, 10, 21)])
+        self.assertEqual(parse_reference_expression("Juan 1:50-2:3", VERSIFICATION), [verse_range(43, 1, 50, 2, 3)])
+
+        # Whole books, with and without versification
+        self.assertEqual(parse_reference_expression("1 Juan", VERSIFICATION), [verse_range(62, 1, 1, 5, 21)])
+        self.assertEqual(parse_reference_expression("Rom 8"), [verse_range(45, 8, 1, 8, LAST)])
+
+    def test_merge(self):
+        """Test merging duplicate, overlapping and adjacent ranges"""
+        self.assertEqual(
+            parse_reference_expression("Juan 3:18-20, 16-17, 19; Juan 3:16", VERSIFICATION),
+            [verse_range(43, 3, 16, 3, 20)]
+        )
+
+        # The last verse of a chapter touches the first of the next one
+        self.assertEqual(
+            merge_ranges([verse_range(43, 2, 1, 2, 3), verse_range(43, 1, 40, 1, 51)], VERSIFICATION),
+            [verse_range(43, 1, 40, 2, 3)]
+        )
+        self.assertEqual(
+            merge_ranges([verse_range(43, 2, 1, 2, 3), verse_range(43, 1, 40, 1, 50)], VERSIFICATION),
+            [verse_range(43, 1, 40, 1, 50), verse_range(43, 2, 1, 2, 3)]
+        )
+
+    def test_invalid_expressions(self):
+        """Test rejecting invalid expressions"""
+        for expression in ("", "Foo 3:16", "3:16", "Juan 3:x", "Juan 3:18-16", "Juan 3:16,, 18"):
+            with self.assertRaises(ValueError):
+                parse_reference_expression(expression, VERSIFICATION)
+
+        with self.assertRaises(ValueError):
+            parse_reference_expression("Juan 4", VERSIFICATION)
+
+    def test_fetch_and_format(self):
+        """Test fetching merged ranges with one query per book and formatting them"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        bible_path = os.path.join(temp_dir.name, "TEST.mybible")
+        create_test_bible(bible_path, [
+            (book_id, chapter, verse, f"{book_id} {chapter}:{verse}")
+            for book_id, chapters in VERSIFICATION.items()
+            for chapter, verse_count in enumerate(chapters, 1)
+            for verse in range(1, verse_count + 1)
+        ])
+        conn = sqlite3.connect(bible_path)
+
+        ranges = parse_reference_expression("Juan 3:16, 18-19; Juan 1:51-2:1; 1 Juan 4:8", VERSIFICATION)
+        verses = get_verses_in_ranges(conn, ranges)
+        self.assertEqual(len(verses), 6)
+
+        groups = [format_verse_group(group) for group in group_verses_by_range(ranges, verses)]
+        self.assertEqual(groups, [
+            ("Juan 1:51-2:1", "1:51. 43 1:51\n2:1. 43 2:1"),
+            ("Juan 3:16", "43 3:16"),
+            ("Juan 3:18-19", "18. 43 3:18\n19. 43 3:19"),
+            ("1 Juan 4:8", "62 4:8"),
+        ])
+        conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import zlib
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+from rbible import render_cache
+from rbible.formatters import wrap_verses
+
+from tests.bible_fixtures import create_test_bible, start_patches
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.bible_path = os.path.join(self.temp_dir.name, "TEST.mybible")
+        create_test_bible(self.bible_path, [
+            (43, chapter, verse, f"Texto de Juan {chapter}:{verse} con algunas palabras más") for chapter in (1, 2, 3) for verse in (1, 2, 3)
+        ])
+        os.utime(self.bible_path, (1000, 1000))
+
+        start_patches(self, [
+            patch.object(render_cache, "RENDER_DIR", os.path.join(self.temp_dir.name, "render")),
+            patch.object(render_cache, "get_bible_path", return_value=self.bible_path),
+            patch.object(render_cache, "get_read_path", side_effect=lambda version, path: path),
+        ])
+        self.conn = sqlite3.connect(self.bible_path)
+
+    def tearDown(self):
+        self.conn.close()
+        self.temp_dir.cleanup()
+
+    def test_whole_chapter(self):
+        """Test recognizing references to exactly one whole chapter"""
+        self.assertEqual(render_cache.whole_chapter("Juan 3"), (43, 3))
+        self.assertEqual(render_cache.whole_chapter("1 Juan 4"), (62, 4))
+        for reference in ("Juan 3:16", "Juan 3-4", "Juan 3; Rom 8", "Juan", "Nada 3"):
+            with self.subTest(reference):
+                self.assertIsNone(render_cache.whole_chapter(reference))
+
+    def test_get_chapter(self):
+        """Test rendering a chapter once, storing it compressed and reusing it"""
+        with patch.object(render_cache, "render_chapter", wraps=render_cache.render_chapter) as render:
+            entry = render_cache.get_chapter(self.conn, "TEST", 43, 2, "markdown", 30)
+            self.assertEqual(render_cache.get_chapter(self.conn, "TEST", 43, 2, "markdown", 30), entry)
+            self.assertEqual(render.call_count, 1)
+
+            # Another format or width is another entry
+            render_cache.get_chapter(self.conn, "TEST", 43, 2, "plain")
+            self.assertEqual(render.call_count, 2)
+
+        self.assertEqual(entry["reference"], "Juan 2:1-3")
+        self.assertTrue(entry["rendered"].startswith("> **Juan 2:1-3(TEST)**"))
+        self.assertTrue(all(len(line) <= 30 for line in entry["text"].split("\n")))
+        with open(render_cache.get_entry_path("TEST", 43, 2, "markdown", 30), 'rb') as f:
+            self.assertIn(b"Juan 2:1-3", zlib.decompress(f.read()))
+
+        self.assertIsNone(render_cache.get_chapter(self.conn, "TEST", 43, 9, "plain"))
+
+    def test_invalidation(self):
+        """Test dropping rendered chapters when the Bible file changes"""
+        render_cache.get_chapter(self.conn, "TEST", 43, 1, "plain")
+        path = render_cache.get_entry_path("TEST", 43, 1, "plain")
+        self.assertTrue(os.path.exists(path))
+
+        os.utime(self.bible_path, (2000, 2000))
+        render_cache.check_source("TEST", self.bible_path)
+        self.assertFalse(os.path.exists(path))
+
+    def test_warm_adjacent(self):
+        """Test rendering the previous and next chapters ahead"""
+        versification = {43: [3, 3, 3]}
+        self.assertEqual(render_cache.adjacent_chapters(43, 1, versification), [(43, 2)])
+        self.assertEqual(render_cache.adjacent_chapters(43, 3, versification), [(43, 2)])
+
+        render_cache.warm_chapters("TEST", render_cache.adjacent_chapters(43, 2, versification), "plain")
+        self.assertIsNotNone(render_cache.load_chapter("TEST", 43, 1, "plain"))
+        self.assertIsNotNone(render_cache.load_chapter("TEST", 43, 3, "plain"))
+
+        # Nothing is started once the neighbours are cached
+        with patch.object(render_cache.subprocess, "Popen") as popen:
+            render_cache.warm_adjacent_in_background("TEST", 43, 2, "plain", None, versification)
+            popen.assert_not_called()
+            render_cache.warm_adjacent_in_background("TEST", 43, 2, "markdown", None, versification)
+            self.assertEqual(popen.call_args[0][0][-5:], ["TEST", "markdown", "0", "43:1", "43:3"])
+
+    def test_wrap_verses(self):
+        """Test wrapping numbered verses under their text"""
+        self.assertEqual(wrap_verses("16. Porque de tal manera amó Dios\n17. Porque", 20),
+                         "16. Porque de tal\n    manera amó Dios\n17. Porque")
+
+if __name__ == '__main__':
+    unittest.main()
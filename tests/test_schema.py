@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+import unittest
+import io
+import os
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+from rbible import schema
+from rbible.bible_data import pack_verse_id
+from rbible.schema import introspect_schema, get_schema, get_adapter
+
+JOHN_3 = [(16, "Porque de tal manera amó Dios al mundo"), (17, "Porque no envió Dios a su Hijo"), (18, "El que en él cree")]
+
+def make_module(conn, create, insert, book):
+    """Create a one-chapter module (John 3) with the given table and book number."""
+    conn.execute(create)
+    conn.executemany(insert, [(book, 3, verse, text) for verse, text in JOHN_3])
+    return conn
+
+class TestSchema(unittest.TestCase):
+    def setUp(self):
+        self.modules = {
+            # MyBible: verses + book numbers 10-730
+            "mybible": make_module(sqlite3.connect(":memory:"),
+                "CREATE TABLE verses (book_number NUMERIC, chapter NUMERIC, verse NUMERIC, text TEXT, PRIMARY KEY (book_number, chapter, verse))",
+                "INSERT INTO verses VALUES (?, ?, ?, ?)", 500),
+            # Bible table with books 1-66 and a Scripture column
+            "bible": make_module(sqlite3.connect(":memory:"),
+                "CREATE TABLE Bible (Book INTEGER, Chapter INTEGER, Verse INTEGER, Scripture TEXT)",
+                "INSERT INTO Bible VALUES (?, ?, ?, ?)", 43),
+            # Lowercase Bible table with a text column and MyBible numbers
+            "variant": make_module(sqlite3.connect(":memory:"),
+                "CREATE TABLE bible (book INTEGER, chapter INTEGER, verse INTEGER, text TEXT)",
+                "INSERT INTO bible VALUES (?, ?, ?, ?)", 500),
+        }
+        self.modules["variant"].execute("CREATE INDEX bible_index ON bible (book, chapter, verse)")
+        self.modules["variant"].execute("CREATE TABLE info (name TEXT, value TEXT)")
+        self.modules["variant"].execute("INSERT INTO info VALUES ('language', 'es')")
+
+    def tearDown(self):
+        for conn in self.modules.values():
+            conn.close()
+
+    def test_introspect(self):
+        """Test finding the table, columns, numbering, index and info of each variant"""
+        mybible = introspect_schema(self.modules["mybible"])
+        self.assertEqual((mybible.table, mybible.book, mybible.text), ("verses", "book_number", "text"))
+        self.assertTrue(mybible.mybible_numbers)
+        self.assertTrue(mybible.indexed)
+
+        bible = introspect_schema(self.modules["bible"])
+        self.assertEqual((bible.table, bible.book, bible.text), ("Bible", "Book", "Scripture"))
+        self.assertFalse(bible.mybible_numbers)
+        self.assertFalse(bible.indexed)
+
+        variant = introspect_schema(self.modules["variant"])
+        self.assertTrue(variant.mybible_numbers)
+        self.assertTrue(variant.indexed)
+        self.assertEqual(variant.info, {"language": "es"})
+
+        with self.assertRaises(ValueError):
+            introspect_schema(sqlite3.connect(":memory:"))
+
+    def test_adapters(self):
+        """Test that every variant reads the same through its adapter"""
+        for name, conn in self.modules.items():
+            with self.subTest(name):
+                adapter = get_adapter(conn)
+                self.assertEqual(adapter.fetch_verse(43, 3, 16), JOHN_3[0][1])
+                self.assertIsNone(adapter.fetch_verse(43, 3, 19))
+                self.assertEqual(adapter.fetch_chapter(43, 3), JOHN_3)
+                self.assertEqual(adapter.fetch_chapter(43, 3, 17, 17), JOHN_3[1:2])
+                self.assertEqual(
+                    list(adapter.fetch_range(pack_verse_id(43, 3, 17), pack_verse_id(43, 3, 18))),
+                    [(pack_verse_id(43, 3, verse), text) for verse, text in JOHN_3[1:]]
+                )
+                self.assertEqual(list(adapter.iter_all()), [(43, 3, verse, text) for verse, text in JOHN_3])
+                self.assertEqual(adapter.search("Dios"), [(43, 3, verse, text) for verse, text in JOHN_3[:2]])
+                self.assertEqual(adapter.verse_counts(), [(43, 3, 18)])
+
+    def test_fts_search(self):
+        """Test searching a full-text table, falling back to plain text for queries with FTS syntax"""
+        conn = make_module(sqlite3.connect(":memory:"),
+            "CREATE VIRTUAL TABLE verses USING fts4 (book_number, chapter, verse, text)",
+            "INSERT INTO verses VALUES (?, ?, ?, ?)", 500)
+        conn.execute("INSERT INTO verses VALUES (500, 3, 19, 'Y esta es la condenación (que la luz vino)')")
+        try:
+            adapter = get_adapter(conn)
+            self.assertTrue(adapter.schema.fts)
+            self.assertEqual(adapter.search("Dios"), [(43, 3, verse, text) for verse, text in JOHN_3[:2]])
+            self.assertEqual(adapter.search("(que la luz"), [(43, 3, 19, "Y esta es la condenación (que la luz vino)")])
+            self.assertEqual(adapter.search('"Dios'), [])
+        finally:
+            conn.close()
+
+    def test_schema_cache_and_warning(self):
+        """Test introspecting a file once and warning once about a missing index"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "TEST.mybible")
+            conn = make_module(sqlite3.connect(path),
+                "CREATE TABLE Bible (Book INTEGER, Chapter INTEGER, Verse INTEGER, Scripture TEXT)",
+                "INSERT INTO Bible VALUES (?, ?, ?, ?)", 43)
+            conn.commit()
+
+            with patch.object(schema, "introspect_schema", wraps=introspect_schema) as introspect, \
+                    patch("sys.stderr", new_callable=io.StringIO) as stderr:
+                get_adapter(conn)
+                get_adapter(conn)
+                self.assertEqual(get_schema(conn).table, "Bible")
+            self.assertEqual(introspect.call_count, 1)
+            self.assertEqual(stderr.getvalue().count("no (Book, Chapter, Verse) index"), 1)
+            conn.close()
+
+    def test_warning_once_per_file(self):
+        """Test remembering the missing index warning between runs until the file changes"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "TEST.mybible")
+            conn = make_module(sqlite3.connect(path),
+                "CREATE TABLE Bible (Book INTEGER, Chapter INTEGER, Verse INTEGER, Scripture TEXT)",
+                "INSERT INTO Bible VALUES (?, ?, ?, ?)", 43)
+            conn.commit()
+
+            def warnings():
+                """Count the warnings of a new run (fresh in-process caches, same catalog file)."""
+                with patch.object(schema, "_warned", set()), patch("rbible.catalog._catalog", None), \
+                        patch("sys.stderr", new_callable=io.StringIO) as stderr:
+                    get_adapter(conn)
+                return stderr.getvalue().count("no (Book, Chapter, Verse) index")
+
+            with patch("rbible.catalog.CATALOG_FILE", os.path.join(temp_dir, "catalog.json")), \
+                    patch("rbible.catalog.get_bible_path", return_value=path), \
+                    patch("rbible.catalog._versifications", {}):
+                self.assertEqual(warnings(), 1)
+                self.assertEqual(warnings(), 0)
+
+                os.utime(path, (1000, 1000))
+                self.assertEqual(warnings(), 1)
+                self.assertEqual(warnings(), 0)
+            conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
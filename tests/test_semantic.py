@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from rbible import semantic
+
+from tests.bible_fixtures import create_test_bible, start_patches
+
+VERSES = [
+    (43, 3, 16, "Porque de tal manera amó Dios al mundo"),
+    (43, 3, 17, "Porque no envió Dios a su Hijo al mundo para condenar al mundo"),
+    (19, 23, 1, "Jehová es mi pastor; nada me faltará"),
+    (19, 23, 4, "No temeré mal alguno, porque tú estarás conmigo"),
+    (6, 1, 9, "No temas ni desmayes, porque Jehová tu Dios estará contigo"),
+]
+
+class TestSemantic(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.bible_path = os.path.join(self.temp_dir.name, "TEST.mybible")
+        create_test_bible(self.bible_path, VERSES)
+
+        start_patches(self, [
+            patch.object(semantic, "SEMANTIC_DIR", os.path.join(self.temp_dir.name, "semantic")),
+            patch.object(semantic, "get_bible_path", return_value=self.bible_path),
+            patch.object(semantic, "get_read_path", side_effect=lambda version, path: path),
+        ])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_extract_features(self):
+        """Test counting words and weighted character n-grams"""
+        features = semantic.extract_features("Amor, amor")
+        self.assertEqual(features["w:amor"], 2)
+        self.assertEqual(features["g: amo"], 2 * semantic.NGRAM_WEIGHT)
+        self.assertEqual(features["g:mor "], 2 * semantic.NGRAM_WEIGHT)
+        self.assertFalse(semantic.extract_features(""))
+
+    @unittest.skipUnless(numpy, "NumPy is not installed")
+    def test_build_and_search(self):
+        """Test building an index once and ranking verses by similar wording"""
+        self.assertFalse(semantic.is_index_current("TEST"))
+        results = semantic.semantic_search("TEST", "no temas", quiet=True)
+        self.assertTrue(semantic.is_index_current("TEST"))
+
+        # "temas" also matches "temeré" through shared n-grams
+        self.assertEqual(results[0]["reference"], "Josué 1:9")
+        self.assertIn("Salmos 23:4", [r["reference"] for r in results])
+        self.assertEqual([r["score"] for r in results], sorted([r["score"] for r in results], reverse=True))
+
+        # Unknown words score nothing
+        self.assertEqual(semantic.semantic_search("TEST", "xyzzy", quiet=True), [])
+
+        # The index is memory-mapped, not read into memory
+        index = semantic.load_index(semantic.get_index_dir("TEST"))
+        self.assertIsInstance(index["weights"], numpy.memmap)
+
+    @unittest.skipUnless(numpy, "NumPy is not installed")
+    def test_similar_verses(self):
+        """Test finding the verses closest to a verse, without the verse itself"""
+        results = semantic.similar_verses("TEST", "Juan", 3, 16, limit=2, quiet=True)
+        self.assertEqual(results[0]["reference"], "Juan 3:17")
+        self.assertNotIn("Juan 3:16", [r["reference"] for r in results])
+        self.assertLessEqual(len(results), 2)
+
+        with self.assertRaises(ValueError):
+            semantic.similar_verses("TEST", "Juan", 3, 99, quiet=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+from rbible.bible_data import pack_verse_id
+from rbible.strongs import (
+    normalize_strongs, extract_strongs, build_index, lookup_strongs, highlight_tagged_words, strongs
+)
+
+from tests.bible_fixtures import create_test_bible
+
+# Verses tagged with Strong's numbers
+ROWS = [
+    (19, 136, 1, "Alabad<S>3034</S> a Jehová, porque él es bueno; porque para siempre es su misericordia<S>2617</S>."),
+    (19, 136, 2, "Alabad al Dios de los dioses, porque para siempre es su misericordia<S>2617</S>."),
+    (62, 4, 8, "El que no ama<S>25</S>, no ha conocido a Dios; porque Dios es amor<S>26</S>."),
+    (62, 4, 16, "Dios es amor<S>G26</S>; y el que permanece en amor<S>26</S>, permanece en Dios."),
+]
+UNTAGGED_ROWS = [(book, chapter, verse, text.replace("<S>", "").replace("</S>", "")) for book, chapter, verse, text in ROWS]
+
+class TestStrongs(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.bible_path = os.path.join(self.temp_dir.name, "TEST.mybible")
+        self.index_path = os.path.join(self.temp_dir.name, "index", "TEST.db")
+        create_test_bible(self.bible_path, ROWS)
+
+        bible_conn = sqlite3.connect(self.bible_path)
+        self.number_count = build_index(bible_conn, self.index_path)
+        bible_conn.close()
+        self.index_conn = sqlite3.connect(self.index_path)
+
+    def tearDown(self):
+        self.index_conn.close()
+        self.temp_dir.cleanup()
+
+    def test_normalize_strongs(self):
+        """Test normalizing Strong's numbers"""
+        self.assertEqual(normalize_strongs("h02617"), "H2617")
+        self.assertEqual(normalize_strongs("26"), "26")
+        self.assertEqual(normalize_strongs("26", book_id=19), "H26")
+        self.assertEqual(normalize_strongs("26", book_id=62), "G26")
+        with self.assertRaises(ValueError):
+            normalize_strongs("X26")
+
+    def test_extract_strongs(self):
+        """Test extracting tagged words, taking the language from the testament"""
+        self.assertEqual(
+            extract_strongs(62, "El que no ama<S>25</S>, es amor<S>26</S>."),
+            [("G25", "ama"), ("G26", "amor")]
+        )
+
+    def test_lookup_strongs(self):
+        """Test looking up the occurrences of a Strong's number"""
+        self.assertEqual(self.number_count, 4)
+
+        verse_ids, renderings = lookup_strongs(self.index_conn, "G26")
+        self.assertEqual(verse_ids, [pack_verse_id(62, 4, 8), pack_verse_id(62, 4, 16), pack_verse_id(62, 4, 16)])
+        self.assertEqual(renderings, {"amor": 3})
+
+        verse_ids, _ = lookup_strongs(self.index_conn, "H2617")
+        self.assertEqual(len(verse_ids), 2)
+        self.assertEqual(lookup_strongs(self.index_conn, "H26"), ([], {}))
+
+        # Bare numbers match both languages
+        verse_ids, _ = lookup_strongs(self.index_conn, "26")
+        self.assertEqual(len(verse_ids), 3)
+
+    def test_highlight_tagged_words(self):
+        """Test marking the words tagged with a Strong's number"""
+        text = "Alabad<S>3034</S> a Jehová, porque para siempre es su misericordia<S>2617</S>."
+        self.assertEqual(highlight_tagged_words(19, text, "H2617"), "Alabad a Jehová, porque para siempre es su [misericordia].")
+        self.assertEqual(highlight_tagged_words(19, text, "G2617"), "Alabad a Jehová, porque para siempre es su misericordia.")
+
+    def test_strongs(self):
+        """Test querying a version, building its index first"""
+        index_dir = os.path.join(self.temp_dir.name, "auto")
+        with patch('rbible.strongs.get_bible_path', return_value=self.bible_path), \
+             patch('rbible.strongs.STRONGS_DIR', index_dir):
+            result = strongs("TEST", "G26", quiet=True)
+
+        self.assertEqual(result["occurrences"], 3)
+        self.assertEqual(result["verses"], 2)
+        self.assertEqual(result["results"][1], {
+            "reference": "1 Juan 4:16",
+            "text": "Dios es [amor]; y el que permanece en [amor], permanece en Dios."
+        })
+
+    def test_untagged_version(self):
+        """Test that versions without Strong's numbers are skipped"""
+        untagged_path = os.path.join(self.temp_dir.name, "PLAIN.mybible")
+        create_test_bible(untagged_path, UNTAGGED_ROWS)
+        with patch('rbible.strongs.get_bible_path', return_value=untagged_path), \
+             patch('rbible.strongs.STRONGS_DIR', os.path.join(self.temp_dir.name, "auto")):
+            self.assertIsNone(strongs("PLAIN", "G26", quiet=True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from unittest.mock import patch
+
+from rbible import tui, user_data
+from rbible.concordance import build_index
+
+from tests.bible_fixtures import create_test_bible
+
+VERSIFICATION = {1: [3, 2], 2: [2], 4: [1]}
+
+def fake_rows(book_id, chapter, versions=1):
+    """Rows of a chapter of VERSIFICATION, with one text per version."""
+    count = VERSIFICATION[book_id][chapter - 1]
+    return [
+        (book_id * 1000000 + chapter * 1000 + verse, [f"texto {book_id} {chapter} {verse}"] * versions)
+        for verse in range(1, count + 1)
+    ]
+
+def wait_for(condition, timeout=5):
+    end = time.time() + timeout
+    while not condition():
+        if time.time() > end:
+            raise AssertionError("Timed out")
+        time.sleep(0.01)
+
+class BlockingIndex:
+    """An index connection whose first query blocks until it's interrupted."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.started = threading.Event()
+        self.interrupted = threading.Event()
+
+    def execute(self, *args):
+        if not self.started.is_set():
+            self.started.set()
+            self.interrupted.wait(5)
+            raise sqlite3.OperationalError("interrupted")
+        return self.conn.execute(*args)
+
+    def interrupt(self):
+        if self.started.is_set():
+            self.interrupted.set()
+
+    def close(self):
+        self.conn.close()
+
+class TestTui(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.loaded = []
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def load_rows(self, book_id, chapter):
+        self.loaded.append((book_id, chapter))
+        return fake_rows(book_id, chapter)
+
+    def build_search_index(self):
+        bible_path = os.path.join(self.temp_dir.name, "TEST.mybible")
+        create_test_bible(bible_path, [
+            (43, 3, 16, "Porque de tal manera amó Dios al mundo"),
+            (62, 4, 8, "Dios es amor"),
+            (45, 8, 28, "a los que aman a Dios"),
+        ])
+        bible_conn = sqlite3.connect(bible_path)
+        index_path = os.path.join(self.temp_dir.name, "index.db")
+        build_index(bible_conn, index_path)
+        bible_conn.close()
+        return index_path
+
+    def test_adjacent_chapters(self):
+        """Test moving between chapters across books, skipping books the version lacks"""
+        self.assertEqual(tui.next_chapter(VERSIFICATION, 1, 1), (1, 2))
+        self.assertEqual(tui.next_chapter(VERSIFICATION, 1, 2), (2, 1))
+        self.assertEqual(tui.next_chapter(VERSIFICATION, 2, 1), (4, 1))
+        self.assertIsNone(tui.next_chapter(VERSIFICATION, 4, 1))
+        self.assertEqual(tui.previous_chapter(VERSIFICATION, 4, 1), (2, 1))
+        self.assertEqual(tui.previous_chapter(VERSIFICATION, 2, 1), (1, 2))
+        self.assertIsNone(tui.previous_chapter(VERSIFICATION, 1, 1))
+
+    def test_render_lines(self):
+        """Test laying out parallel panes verse by verse, with wrapped and missing verses"""
+        rows = [(1001001, ["uno dos tres cuatro cinco seis siete ocho nueve diez", "uno"]), (1001002, [None, "dos"])]
+        lines = tui.render_lines("Génesis 1", ["A", "B"], rows, 50)
+
+        self.assertEqual(lines[0], ("Génesis 1", None))
+        self.assertTrue(lines[1][0].startswith("A ") and lines[1][0].endswith(" B"))
+        self.assertEqual(lines[-1], ("", None))
+        verse_lines = [line for line, verse_id in lines if verse_id == 1001001]
+        self.assertGreater(len(verse_lines), 1)
+        self.assertTrue(all(line.index(tui.PANE_SEPARATOR) == 23 for line in verse_lines))
+        self.assertTrue(verse_lines[0].endswith("1. uno"))
+        self.assertTrue(verse_lines[1].startswith("   "))
+        self.assertIn("2. —", [line for line, verse_id in lines if verse_id == 1001002][0])
+
+    def test_document_loads_lazily(self):
+        """Test loading chapters only as the screen nears them and dropping distant ones"""
+        document = tui.ChapterDocument(self.load_rows, ["A"], VERSIFICATION)
+        document.open(1, 2)
+        self.assertEqual(self.loaded, [(1, 2)])
+
+        with patch.object(tui, "PRELOAD_LINES", 2):
+            top = document.fill(document.chapter_start(1, 2) + 2, 2)
+            self.assertEqual([chapter[:2] for chapter in document.chapters], [(1, 2), (2, 1)])
+            self.assertEqual(self.loaded, [(1, 2), (2, 1)])
+
+            # Scrolling back loads the previous chapter and keeps the same line on screen
+            line = document.lines[top]
+            top = document.fill(top - 1, 2)
+            self.assertEqual(self.loaded[-1], (1, 1))
+            self.assertEqual(document.lines[top + 1], line)
+            self.assertEqual(document.chapter_at(top)[:2], (1, 2))
+
+            with patch.object(tui, "MAX_LOADED_CHAPTERS", 1):
+                top = document.fill(document.chapter_start(2, 1) + 2, 2)
+            self.assertEqual([chapter[:2] for chapter in document.chapters], [(2, 1), (4, 1)])
+            self.assertEqual(document.lines[top][1], 2001002)
+
+        self.assertEqual(document.chapter_at(0)[3], ("Éxodo 1:1-2", "1. texto 2 1 1\n2. texto 2 1 2"))
+        # Jumping to a chapter that isn't loaded opens it
+        line = document.verse_line(1001002)
+        self.assertEqual(document.lines[line][1], 1001002)
+        self.assertEqual(self.loaded[-1], (1, 1))
+
+    def test_as_you_type(self):
+        """Test matching the word being typed as a prefix"""
+        self.assertEqual(tui.as_you_type("Dios am"), "Dios am*")
+        self.assertEqual(tui.as_you_type("amor "), "amor ")
+        self.assertEqual(tui.as_you_type(""), "")
+
+    def test_incremental_search(self):
+        """Test searching in the background and only reporting the latest query"""
+        index_path = self.build_search_index()
+        search = tui.IncrementalSearch(lambda: sqlite3.connect(index_path, check_same_thread=False))
+        try:
+            search.submit("am")
+            search.submit("dios am")
+            wait_for(lambda: search.latest() is not None)
+            self.assertEqual(search.latest(), ("dios am", [43003016, 45008028, 62004008], 3))
+
+            search.submit("amor")
+            wait_for(lambda: search.latest() is not None)
+            self.assertEqual(search.latest(), ("amor", [62004008], 1))
+        finally:
+            search.close()
+
+    def test_search_cancels_stale_queries(self):
+        """Test that a new query interrupts the one still running"""
+        index = BlockingIndex(sqlite3.connect(self.build_search_index(), check_same_thread=False))
+        search = tui.IncrementalSearch(lambda: index)
+        try:
+            search.submit("dios")
+            self.assertTrue(index.started.wait(5))
+            self.assertIsNone(search.latest())
+
+            search.submit("mundo")
+            wait_for(lambda: search.latest() is not None)
+            self.assertTrue(index.interrupted.is_set())
+            self.assertEqual(search.latest(), ("mundo", [43003016], 1))
+        finally:
+            search.close()
+
+    def test_search_index_error(self):
+        """Test reporting an index that can't be opened"""
+        def fail():
+            raise LookupError("Bible version 'NADA' not found")
+        search = tui.IncrementalSearch(fail)
+        search.submit("dios")
+        wait_for(lambda: search.error is not None)
+        self.assertIsNone(search.latest())
+        search.close()
+
+    def test_search_query_error(self):
+        """Test reporting a failed query and going on with the next ones"""
+        index_path = self.build_search_index()
+        search = tui.IncrementalSearch(lambda: sqlite3.connect(index_path, check_same_thread=False))
+        try:
+            with patch.object(tui, "query_concordance", side_effect=[sqlite3.DatabaseError("file is not a database"), (3, [62004008])]):
+                search.submit("amor")
+                wait_for(lambda: search.error is not None)
+                self.assertEqual(search.error, "file is not a database")
+                self.assertIsNone(search.latest())
+
+                search.submit("amor")
+                wait_for(lambda: search.latest() is not None)
+                self.assertIsNone(search.error)
+        finally:
+            search.close()
+
+    def test_history_batch(self):
+        """Test writing the chapters read to history in batches"""
+        history_file = os.path.join(self.temp_dir.name, "history.json")
+        with patch.object(user_data, "HISTORY_FILE", history_file), \
+             patch.object(user_data, "update_json", wraps=user_data.update_json) as update:
+            history = tui.HistoryBatch("RVR", size=2)
+            history.add("Génesis 1:1-31", "1. ...")
+            history.add("Génesis 1:1-31", "1. ...")
+            self.assertEqual(update.call_count, 0)
+
+            history.add("Génesis 2:1-25", "1. ...")
+            self.assertEqual(update.call_count, 1)
+            history.add("Génesis 1:1-31", "1. ...")
+            history.flush()
+            history.flush()
+            self.assertEqual(update.call_count, 2)
+
+        with open(history_file, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        self.assertEqual([entry["reference"] for entry in saved], ["Génesis 1:1-31", "Génesis 2:1-25"])
+        self.assertEqual(saved[0]["version"], "RVR")
+
+if __name__ == '__main__':
+    unittest.main()
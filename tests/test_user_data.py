@@ -1,48 +1,53 @@
 #!/usr/bin/env python3
 import unittest
+import io
 import os
+import sys
 import json
 import tempfile
+import subprocess
 from unittest.mock import patch, mock_open
 
 from rbible.user_data import (
     save_to_history, load_history, show_history,
-    save_to_favorites, load_favorites, show_favorites, remove_favorite
+    save_to_favorites, load_favorites, show_favorites, remove_favorite,
+    MAX_HISTORY_ITEMS, fcntl
 )
 
+from tests.bible_fixtures import start_patches
+
 class TestUserData(unittest.TestCase):
-    @patch('os.makedirs')
-    @patch('json.dump')
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('rbible.user_data.load_history')
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        start_patches(self, [
+            patch('rbible.user_data.HISTORY_FILE', os.path.join(self.temp_dir.name, 'history.json')),
+            patch('rbible.user_data.FAVORITES_FILE', os.path.join(self.temp_dir.name, 'favorites.json')),
+        ])
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
     @patch('rbible.user_data.import_time_module')
-    def test_save_to_history(self, mock_time, mock_load_history, mock_file, mock_json_dump, mock_makedirs):
+    def test_save_to_history(self, mock_time):
         """Test saving verse to history"""
         # Mock time.time() to return a fixed timestamp
         mock_time_module = unittest.mock.MagicMock()
         mock_time_module.time.return_value = 1234567890
         mock_time.return_value = mock_time_module
         
-        # Mock load_history to return an empty list
-        mock_load_history.return_value = []
-        
         # Test saving to history
         save_to_history("Juan 3:16", "For God so loved the world...", "RVR")
         
-        # Verify that makedirs was called
-        mock_makedirs.assert_called_once()
-        
-        # Verify that open was called with the correct file path
-        mock_file.assert_called_once()
-        
-        # Verify that json.dump was called with the correct data
-        args, _ = mock_json_dump.call_args
-        data = args[0]
+        # Verify that the file has the correct data
+        data = load_history()
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]["reference"], "Juan 3:16")
         self.assertEqual(data[0]["text"], "For God so loved the world...")
         self.assertEqual(data[0]["version"], "RVR")
         self.assertEqual(data[0]["timestamp"], 1234567890)
+        
+        # No temporary files are left behind
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ['history.json', 'history.json.lock'])
     
     @patch('os.path.exists')
     @patch('json.load')
@@ -64,33 +69,20 @@ class TestUserData(unittest.TestCase):
         # Verify that the correct data was returned
         self.assertEqual(history, history_data)
     
-    @patch('rbible.user_data.load_favorites')
-    @patch('json.dump')
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('os.makedirs')
     @patch('rbible.user_data.import_time_module')
-    def test_save_to_favorites(self, mock_time, mock_makedirs, mock_file, mock_json_dump, mock_load_favorites):
+    def test_save_to_favorites(self, mock_time):
         """Test saving verse to favorites"""
         # Mock time.time() to return a fixed timestamp
         mock_time_module = unittest.mock.MagicMock()
         mock_time_module.time.return_value = 1234567890
         mock_time.return_value = mock_time_module
         
-        # Mock load_favorites to return an empty list
-        mock_load_favorites.return_value = []
-        
         # Test saving to favorites
-        save_to_favorites("Juan 3:16", "For God so loved the world...", "RVR", "God's Love")
-        
-        # Verify that makedirs was called
-        mock_makedirs.assert_called_once()
-        
-        # Verify that open was called with the correct file path
-        mock_file.assert_called_once()
+        with patch('builtins.print'):
+            save_to_favorites("Juan 3:16", "For God so loved the world...", "RVR", "God's Love")
         
-        # Verify that json.dump was called with the correct data
-        args, _ = mock_json_dump.call_args
-        data = args[0]
+        # Verify that the file has the correct data
+        data = load_favorites()
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]["reference"], "Juan 3:16")
         self.assertEqual(data[0]["text"], "For God so loved the world...")
@@ -98,6 +90,61 @@ class TestUserData(unittest.TestCase):
         self.assertEqual(data[0]["name"], "God's Love")
         self.assertEqual(data[0]["added"], 1234567890)
     
+    def test_remove_favorite(self):
+        """Test removing favorites by index and by reference"""
+        with patch('builtins.print'):
+            save_to_favorites("Juan 3:16", "...", "RVR")
+            save_to_favorites("Salmos 23:1", "...", "RVR")
+            save_to_favorites("Rom 8:28", "...", "RVR")
+            self.assertTrue(remove_favorite("2"))
+            self.assertTrue(remove_favorite("rom 8:28"))
+            self.assertFalse(remove_favorite("Génesis 1:1"))
+        self.assertEqual([f["reference"] for f in load_favorites()], ["Juan 3:16"])
+    
+    def test_corrupt_file(self):
+        """Test moving an unreadable file aside before starting over"""
+        favorites_file = os.path.join(self.temp_dir.name, 'favorites.json')
+        with open(favorites_file, 'w', encoding='utf-8') as f:
+            f.write('[{"reference": ')
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout, patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            save_to_favorites("Juan 3:16", "...", "RVR")
+        self.assertIn("favorites.json.corrupt", stderr.getvalue())
+        self.assertNotIn("Warning", stdout.getvalue())
+        with open(favorites_file + '.corrupt', 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), '[{"reference": ')
+        self.assertEqual([f["reference"] for f in load_favorites()], ["Juan 3:16"])
+    
+    @unittest.skipUnless(fcntl, "fcntl locking is not available")
+    def test_concurrent_writes(self):
+        """Test that many processes writing at once lose no favorites and leave valid history"""
+        processes, saves = 8, 20
+        script = (
+            "import sys\n"
+            "from rbible.user_data import save_to_favorites, save_to_history\n"
+            "for i in range(%d):\n"
+            "    save_to_favorites(f'Salmos {sys.argv[1]}:{i + 1}', 'x', 'RVR')\n"
+            "    save_to_history(f'Salmos {sys.argv[1]}:{i + 1}', 'x', 'RVR')\n"
+        ) % saves
+        # Each process gets its own ~/.rbible through HOME, all pointing at the same files
+        env = dict(os.environ, HOME=self.temp_dir.name, USERPROFILE=self.temp_dir.name,
+                   PYTHONPATH=os.pathsep.join([os.path.dirname(os.path.dirname(os.path.abspath(__file__))), os.environ.get("PYTHONPATH", "")]))
+        children = [
+            subprocess.Popen([sys.executable, "-c", script, str(n + 1)], env=env, stdout=subprocess.DEVNULL)
+            for n in range(processes)
+        ]
+        for child in children:
+            self.assertEqual(child.wait(timeout=60), 0)
+        
+        data_dir = os.path.join(self.temp_dir.name, '.rbible')
+        with patch('rbible.user_data.FAVORITES_FILE', os.path.join(data_dir, 'favorites.json')), \
+                patch('rbible.user_data.HISTORY_FILE', os.path.join(data_dir, 'history.json')):
+            favorites = load_favorites()
+            history = load_history()
+        self.assertEqual(len(favorites), processes * saves)
+        self.assertEqual(len({f["reference"] for f in favorites}), processes * saves)
+        self.assertEqual(len(history), MAX_HISTORY_ITEMS)
+        self.assertFalse([name for name in os.listdir(data_dir) if name.endswith('.tmp')])
+    
     @patch('rbible.user_data.load_favorites')
     def test_show_favorites(self, mock_load_favorites):
         """Test showing favorites"""
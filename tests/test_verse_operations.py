@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import sys
+import sqlite3
 
+from rbible.bible_data import pack_verse_id
 from rbible.verse_operations import (
-    parse_reference, get_verse, search_bible, complete_reference
+    parse_reference, get_verse, search_bible, complete_reference, iter_parallel_rows
 )
 
 class TestVerseOperations(unittest.TestCase):
@@ -44,29 +46,23 @@ class TestVerseOperations(unittest.TestCase):
         # Mock get_book_id to return a valid ID
         mock_get_book_id.return_value = 43  # Juan
         
-        # Create a mock connection and cursor
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
-        mock_conn.cursor.return_value = mock_cursor
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE Bible (Book INTEGER, Chapter INTEGER, Verse INTEGER, Scripture TEXT)")
+        conn.executemany("INSERT INTO Bible VALUES (43, 3, ?, ?)", [
+            (16, "For God so loved the world..."),
+            (17, "For God did not send his Son..."),
+        ])
         
         # Test getting a single verse
-        mock_cursor.fetchall.return_value = [(3,)]  # Available chapters
-        mock_cursor.fetchone.return_value = ("For God so loved the world...",)
-        
-        verse_text = get_verse(mock_conn, "Juan", 3, 16)
+        verse_text = get_verse(conn, "Juan", 3, 16)
         self.assertEqual(verse_text, "For God so loved the world...")
         
         # Test getting a verse range
-        mock_cursor.fetchall.side_effect = [
-            [(23,)],  # Available chapters
-            [
-                (1, "The LORD is my shepherd..."),
-                (2, "He makes me lie down..."),
-            ]
-        ]
-        
-        verse_text = get_verse(mock_conn, "Salmos", 23, (1, 2))
-        self.assertEqual(verse_text, "1. The LORD is my shepherd...\n2. He makes me lie down...")
+        verse_text = get_verse(conn, "Juan", 3, (16, 17))
+        self.assertEqual(verse_text, "16. For God so loved the world...\n17. For God did not send his Son...")
+        
+        with self.assertRaises(Exception):
+            get_verse(conn, "Juan", 3, 18)
     
     @patch('rbible.verse_operations.BOOK_BY_ID')
     def test_search_bible(self, mock_book_by_id):
@@ -74,23 +70,22 @@ class TestVerseOperations(unittest.TestCase):
         # Mock BOOK_BY_ID
         mock_book_by_id.get.return_value = "Juan"
         
-        # Create a mock connection and cursor
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
-        mock_conn.cursor.return_value = mock_cursor
-        
-        # Mock cursor.fetchall to return search results
-        mock_cursor.fetchall.return_value = [
-            (43, 3, 16, "For God so loved the world..."),
-            (43, 3, 17, "For God did not send his Son into the world...")
-        ]
+        # MyBible modules number John 500
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE verses (book_number INTEGER, chapter INTEGER, verse INTEGER, text TEXT)")
+        conn.executemany("INSERT INTO verses VALUES (500, 3, ?, ?)", [
+            (16, "For God so loved the world..."),
+            (17, "For God did not send his Son into the world..."),
+            (18, "He that believeth on him is not condemned..."),
+        ])
         
         # Test searching
-        results = search_bible(mock_conn, "God")
+        results = search_bible(conn, "God")
         
         self.assertEqual(len(results), 2)
         self.assertEqual(results[0]["reference"], "Juan 3:16")
         self.assertEqual(results[0]["text"], "For God so loved the world...")
+        mock_book_by_id.get.assert_called_with(43, "Book 43")
     
     @patch('rbible.verse_operations.get_book_id')
     def test_complete_reference(self, mock_get_book_id):
@@ -113,6 +108,32 @@ class TestVerseOperations(unittest.TestCase):
         # Test verse suggestions
         suggestions = complete_reference("Juan 3:1")
         self.assertTrue(all("Juan 3:1" in suggestion for suggestion in suggestions))
+        
+        # Test exact suggestions from a versification table
+        versification = {43: [51, 25, 36]}
+        suggestions = complete_reference("Juan 2", versification)
+        self.assertEqual(suggestions, ["Juan 2:1"])
+        suggestions = complete_reference("Juan 3:3", versification)
+        self.assertEqual(suggestions, ["Juan 3:3", "Juan 3:30", "Juan 3:31", "Juan 3:32",
+                                       "Juan 3:33", "Juan 3:34", "Juan 3:35", "Juan 3:36"])
+
+    def test_iter_parallel_rows(self):
+        """Test merging versions of both schemas into one row per verse"""
+        bible = sqlite3.connect(":memory:")
+        bible.execute("CREATE TABLE Bible (Book INTEGER, Chapter INTEGER, Verse INTEGER, Scripture TEXT)")
+        bible.executemany("INSERT INTO Bible VALUES (43, 3, ?, ?)", [(verse, f"A{verse}") for verse in (16, 17, 18)])
+        
+        # MyBible numbers John 500, and this version lacks verse 17
+        mybible = sqlite3.connect(":memory:")
+        mybible.execute("CREATE TABLE verses (book_number INTEGER, chapter INTEGER, verse INTEGER, text TEXT)")
+        mybible.executemany("INSERT INTO verses VALUES (500, 3, ?, ?)", [(verse, f"B{verse}") for verse in (16, 18)])
+        
+        ranges = [(pack_verse_id(43, 3, 16), pack_verse_id(43, 3, 18))]
+        self.assertEqual(list(iter_parallel_rows([bible, mybible], ranges)), [
+            (pack_verse_id(43, 3, 16), ["A16", "B16"]),
+            (pack_verse_id(43, 3, 17), ["A17", None]),
+            (pack_verse_id(43, 3, 18), ["A18", "B18"]),
+        ])
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
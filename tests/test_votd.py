@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sqlite3
+import datetime
+import tempfile
+from unittest.mock import patch
+
+from rbible import votd
+from rbible.bible_data import get_book_id
+from rbible.references import parse_reference_expression
+
+from tests.bible_fixtures import create_test_bible, start_patches
+
+VERSIFICATION = {book_id: [30] * 5 for book_id in range(1, 67)}
+# The real list, before the tests patch it with verses that fit VERSIFICATION
+CURATED_VERSES = list(votd.CURATED_VERSES)
+
+# Every verse of VERSIFICATION
+ROWS = [
+    (book_id, chapter, verse, f"{book_id} {chapter}:{verse}")
+    for book_id, chapters in VERSIFICATION.items()
+    for chapter, verse_count in enumerate(chapters, 1)
+    for verse in range(1, verse_count + 1)
+]
+
+class TestVotd(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        bible_path = os.path.join(self.temp_dir.name, "TEST.mybible")
+        create_test_bible(bible_path, ROWS)
+        start_patches(self, [
+            patch.object(votd, "VOTD_CACHE_FILE", os.path.join(self.temp_dir.name, "votd.json")),
+            patch.object(votd, "load_bible_version", side_effect=lambda version: sqlite3.connect(bible_path)),
+            patch.object(votd, "get_versification", return_value=VERSIFICATION),
+            patch.object(votd, "CURATED_VERSES", ["Juan 3:16", "Salmos 23:1-3", "Romanos 5:8"]),
+        ])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_curated_verses(self):
+        """Test that every curated verse is a valid reference"""
+        for reference in CURATED_VERSES:
+            self.assertTrue(parse_reference_expression(reference))
+
+    def test_deterministic_pick(self):
+        """Test that a date always picks the same verse, and days differ"""
+        date = datetime.date(2026, 1, 1)
+        self.assertEqual(votd.pick_reference(date), votd.pick_reference(date))
+        week = {votd.pick_reference(date + datetime.timedelta(days=i)) for i in range(7)}
+        self.assertGreater(len(week), 1)
+
+        favorites = [{"reference": "Juan 3:16"}, {"reference": "Salmos 23:1"}]
+        self.assertIn(votd.pick_reference(date, "favorites", favorites=favorites), ("Juan 3:16", "Salmos 23:1"))
+        self.assertIsNone(votd.pick_reference(date, "favorites", favorites=[]))
+
+    def test_weighted_pick(self):
+        """Test that whole-Bible picks are valid and favour the weighted books"""
+        books = []
+        for seed in range(0, 10**9, 10**9 // 500):
+            reference = votd.pick_weighted_verse(VERSIFICATION, seed)
+            (start, end), = parse_reference_expression(reference, VERSIFICATION)
+            self.assertEqual(start, end)
+            books.append(get_book_id(reference.rsplit(" ", 1)[0]))
+        self.assertGreater(books.count(19), books.count(18))
+        self.assertLess(books.count(13), books.count(12))
+
+    def test_render_and_serve(self):
+        """Test pre-rendering days in several versions and serving them from the cache"""
+        start = datetime.date(2026, 1, 1)
+        cache = votd.render_cache(start, 3, ["A", "B"])
+        self.assertEqual(len(cache["days"]), 3)
+        self.assertEqual(set(cache["days"]["2026-01-02"]["texts"]), {"A", "B"})
+
+        with patch.object(votd, "build_days") as build_days:
+            result = votd.get_verse_of_the_day(datetime.date(2026, 1, 2), "B")
+            build_days.assert_not_called()
+        self.assertEqual(result["reference"], cache["days"]["2026-01-02"]["reference"])
+        self.assertEqual(result["version"], "B")
+
+        # Days outside the cache are computed on the fly
+        result = votd.get_verse_of_the_day(datetime.date(2026, 2, 1))
+        self.assertEqual(result["version"], "A")
+        self.assertEqual(result["reference"], votd.pick_reference(datetime.date(2026, 2, 1)))
+
+        # Days that passed are dropped on the next render
+        cache = votd.render_cache(datetime.date(2026, 1, 3), 2, ["A", "B"])
+        self.assertEqual(sorted(cache["days"]), ["2026-01-03", "2026-01-04"])
+
+if __name__ == '__main__':
+    unittest.main()
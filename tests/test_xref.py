@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+import unittest
+import os
+import sqlite3
+import tempfile
+
+from rbible.bible_data import pack_verse_id
+from rbible.references import format_verse_range
+from rbible.xref import parse_osis_range, import_crossreferences, get_neighbors, related_verses
+
+JOHN_3_16 = pack_verse_id(43, 3, 16)
+ROMANS_5_8 = pack_verse_id(45, 5, 8)
+FIRST_JOHN_4_9 = pack_verse_id(62, 4, 9)
+FIRST_JOHN_4_10 = pack_verse_id(62, 4, 10)
+JOHN_1_14 = pack_verse_id(43, 1, 14)
+JOHN_15_13 = pack_verse_id(43, 15, 13)
+GENESIS_1_1 = pack_verse_id(1, 1, 1)
+
+TSV = """From Verse\tTo Verse\tVotes\t#www.openbible.info CC-BY
+John.3.16\tRom.5.8\t500
+John.3.16\t1John.4.9-1John.4.10\t300
+John.3.16\tJohn.1.14\t100
+John.3.16\tGen.1.1\t-3
+Rom.5.8\t1John.4.10\t50
+Rom.5.8\tJohn.15.13\t80
+1John.4.9\tJohn.1.14\t10
+John.3.17\tJohn.3.16\t20
+Foo.1.1\tJohn.3.16\t5
+"""
+
+class TestXref(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        tsv_path = os.path.join(self.temp_dir.name, "cross_references.txt")
+        with open(tsv_path, 'w', encoding='utf-8') as f:
+            f.write(TSV)
+
+        self.xref_file = os.path.join(self.temp_dir.name, "crossreferences.db")
+        self.edge_count = import_crossreferences(tsv_path, self.xref_file)
+        self.conn = sqlite3.connect(self.xref_file)
+
+    def tearDown(self):
+        self.conn.close()
+        self.temp_dir.cleanup()
+
+    def test_parse_osis_range(self):
+        """Test parsing OSIS verses and ranges"""
+        self.assertEqual(parse_osis_range("John.3.16"), (JOHN_3_16, JOHN_3_16))
+        self.assertEqual(parse_osis_range("1John.4.9-1John.4.10"), (FIRST_JOHN_4_9, FIRST_JOHN_4_10))
+
+    def test_import_tsv(self):
+        """Test importing a TSV, skipping the header and unknown books"""
+        self.assertEqual(self.edge_count, 8)
+
+    def test_import_mybible_module(self):
+        """Test importing a MyBible cross-references module"""
+        module_path = os.path.join(self.temp_dir.name, "TEST.crossreferences")
+        conn = sqlite3.connect(module_path)
+        conn.execute("""
+            CREATE TABLE cross_references (book INTEGER, chapter INTEGER, verse INTEGER, verse_end INTEGER,
+            book_to INTEGER, chapter_to INTEGER, verse_to_start INTEGER, verse_to_end INTEGER, votes INTEGER)
+        """)
+        conn.execute("INSERT INTO cross_references VALUES (500, 3, 16, 17, 520, 5, 8, 0, 12)")
+        conn.commit()
+        conn.close()
+
+        xref_file = os.path.join(self.temp_dir.name, "module.db")
+        self.assertEqual(import_crossreferences(module_path, xref_file), 2)
+        conn = sqlite3.connect(xref_file)
+        neighbors = get_neighbors(conn, [(JOHN_3_16, JOHN_3_16)])
+        conn.close()
+        self.assertEqual(neighbors[(JOHN_3_16, JOHN_3_16)], [(ROMANS_5_8, ROMANS_5_8, 12)])
+
+    def test_get_neighbors(self):
+        """Test expanding several, overlapping ranges with one query"""
+        neighbors = get_neighbors(self.conn, [(JOHN_3_16, JOHN_3_16), (FIRST_JOHN_4_9, FIRST_JOHN_4_10), (FIRST_JOHN_4_9, FIRST_JOHN_4_9)])
+        self.assertEqual(len(neighbors[(JOHN_3_16, JOHN_3_16)]), 4)
+        self.assertEqual(neighbors[(FIRST_JOHN_4_9, FIRST_JOHN_4_10)], [(JOHN_1_14, JOHN_1_14, 10)])
+        self.assertEqual(neighbors[(FIRST_JOHN_4_9, FIRST_JOHN_4_9)], [(JOHN_1_14, JOHN_1_14, 10)])
+
+    def test_related_verses(self):
+        """Test ranking related verses over one and two steps"""
+        related = related_verses(self.conn, [(JOHN_3_16, JOHN_3_16)])
+        # The disputed link (negative votes) ranks last
+        self.assertEqual([entry["start"] for entry in related], [ROMANS_5_8, FIRST_JOHN_4_9, JOHN_1_14, GENESIS_1_1])
+        self.assertEqual(related[-1]["score"], -3)
+
+        related = related_verses(self.conn, [(JOHN_3_16, JOHN_3_16)], depth=2)
+        by_start = {entry["start"]: entry for entry in related}
+        self.assertEqual(by_start[JOHN_15_13]["depth"], 2)
+        self.assertEqual(by_start[JOHN_15_13]["score"], 40)
+        # Reached directly and through 1 Juan 4:9
+        self.assertEqual(by_start[JOHN_1_14]["score"], 105)
+
+        self.assertEqual(len(related_verses(self.conn, [(JOHN_3_16, JOHN_3_16)], depth=2, limit=2)), 2)
+
+    def test_format_verse_range(self):
+        """Test formatting verse ranges"""
+        self.assertEqual(format_verse_range(JOHN_3_16, JOHN_3_16), "Juan 3:16")
+        self.assertEqual(format_verse_range(FIRST_JOHN_4_9, FIRST_JOHN_4_10), "1 Juan 4:9-10")
+        self.assertEqual(format_verse_range(pack_verse_id(20, 8, 22), pack_verse_id(20, 9, 3)), "Proverbios 8:22-9:3")
+
+if __name__ == '__main__':
+    unittest.main()